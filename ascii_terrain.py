@@ -1,6 +1,11 @@
+import argparse
+import random
+import sys
+
 import colorama
 
-from wave_function_collapse.grid import Grid
+from wave_function_collapse.engines import ENGINES
+from wave_function_collapse.renderer import Renderer
 from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
 
 TILESET = [
@@ -100,6 +105,19 @@ TILESET = [
 ]
 
 if __name__ == "__main__":
-    grid = Grid(TILESET, size=(30, 15))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=ENGINES, default="grid")
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--height", type=int, default=15)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    grid = ENGINES[args.engine](
+        TILESET,
+        size=(args.width, args.height),
+        rng=random.Random(args.seed),
+    )
     grid.assign_all_tiles()
-    print(grid)
+    Renderer(grid.compiled_tileset).write(
+        sys.stdout, grid.tile_indices, args.width
+    )
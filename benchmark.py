@@ -0,0 +1,250 @@
+import argparse
+import json
+import pipes
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import ascii_terrain
+from wave_function_collapse.engines import ENGINES
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.tileset import Tileset
+
+
+def synthetic_tileset(n_tiles: int, seed: int = 0):
+    """Creates a tileset of n_tiles tiles, each of which may be placed
+    next to itself and about a fifth of the other tiles with random
+    frequencies. The adjacency is symmetric.
+    """
+    rng = random.Random(seed)
+    neighbors = {i: {i} for i in range(n_tiles)}
+    for i in range(n_tiles):
+        for j in rng.sample(range(n_tiles), max(n_tiles // 10, 2)):
+            neighbors[i].add(j)
+            neighbors[j].add(i)
+
+    return [
+        Tile(
+            f"Tile{i:03d}",
+            rules={
+                RuleDirection.ALL: tuple(
+                    {
+                        "frequency": rng.randint(1, 3),
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": f"tile{j}",
+                    }
+                    for j in sorted(neighbors[i])
+                )
+            },
+            symbol=chr(0x100 + i),
+            tags=(f"tile{i}",),
+        )
+        for i in range(n_tiles)
+    ]
+
+
+TILESETS = {
+    "ascii_terrain": lambda: ascii_terrain.TILESET,
+    "pipes": lambda: pipes.TILESET,
+    "synthetic50": lambda: synthetic_tileset(50),
+    "synthetic200": lambda: synthetic_tileset(200),
+    "synthetic500": lambda: synthetic_tileset(500),
+}
+
+# Engines, tilesets and sizes of the cases of each suite. The reference
+# grid is only run on small grids.
+SUITES = {
+    "quick": [
+        (list(ENGINES), ["ascii_terrain", "pipes", "synthetic50"], [10, 20]),
+    ],
+    "full": [
+        (["grid"], ["ascii_terrain", "pipes", "synthetic50"], [10, 50]),
+        (
+            ["compact", "support", "vectorized"],
+            ["ascii_terrain", "pipes", "synthetic50"],
+            [10, 50, 100, 500],
+        ),
+        (
+            ["compact", "support", "vectorized"],
+            ["synthetic200", "synthetic500"],
+            [10, 50, 100],
+        ),
+    ],
+    # Large maps, where selecting the next space must not scan the grid.
+    "large": [
+        (["compact", "vectorized"], ["ascii_terrain", "synthetic50"], [500]),
+    ],
+}
+
+
+def run_once(engine, tileset, size, seed):
+    """Solves a grid and returns the number of collapses, the number of
+    spaces narrowed by propagation and whether it ended in a
+    contradiction.
+    """
+    grid = engine(tileset, size=size, rng=random.Random(seed))
+    collapses = steps = 0
+    try:
+        for event in grid.iter_solve():
+            collapses += 1
+            steps += len(event.narrowed)
+    except WaveFunctionCollapseException:
+        return collapses, steps, True
+
+    return collapses, steps, False
+
+
+def run_case(
+    engine_name: str,
+    tileset_name: str,
+    tileset: Tileset,
+    size: int,
+    seeds: int,
+    max_time: float,
+) -> dict:
+    """Solves grids of one engine, tileset and size with several seeds.
+
+    Runs that end in a contradiction count towards the contradiction
+    rate and the collapses before it towards the throughput. Further seeds are
+    skipped once the runs took longer than max_time seconds in total.
+    The peak memory is measured in a separate run.
+    """
+    engine = ENGINES[engine_name]
+    collapses = steps = contradictions = runs = 0
+    seconds = 0
+    for seed in range(seeds):
+        start = time.perf_counter()
+        result = run_once(engine, tileset, (size, size), seed)
+        seconds += time.perf_counter() - start
+        runs += 1
+        collapses += result[0]
+        steps += result[1]
+        contradictions += result[2]
+        if seconds > max_time:
+            break
+
+    tracemalloc.start()
+    run_once(engine, tileset, (size, size), 0)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "engine": engine_name,
+        "tileset": tileset_name,
+        "n_tiles": len(tileset),
+        "size": [size, size],
+        "runs": runs,
+        "seconds": seconds,
+        "collapses": collapses,
+        "collapses_per_second": collapses / seconds,
+        "propagation_steps": steps,
+        "contradictions": contradictions,
+        "contradiction_rate": contradictions / runs,
+        "peak_memory": peak_memory,
+    }
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_result(result: dict) -> str:
+    return (
+        f"{result['engine']:>10} {result['tileset']:>13} "
+        f"{result['size'][0]:>4}x{result['size'][1]:<4} "
+        f"{result['collapses_per_second']:>8.0f} collapses/s "
+        f"{result['propagation_steps'] / result['runs']:>9.0f} steps "
+        f"{result['peak_memory'] / 2**20:>7.1f} MiB "
+        f"{result['contradiction_rate']:>4.0%} contradictions"
+    )
+
+
+def compare(results: list, baseline: list):
+    """Prints the change of the throughput of every case compared to the
+    same case in a baseline.
+    """
+    baseline = {
+        (r["engine"], r["tileset"], tuple(r["size"])): r for r in baseline
+    }
+    for result in results:
+        key = (result["engine"], result["tileset"], tuple(result["size"]))
+        if (old := baseline.get(key)) is None:
+            continue
+
+        ratio = result["collapses_per_second"] / old["collapses_per_second"]
+        print(
+            f"{key[0]:>10} {key[1]:>13} {key[2][0]:>4}x{key[2][1]:<4} "
+            f"{old['collapses_per_second']:>10.0f} -> "
+            f"{result['collapses_per_second']:>10.0f} collapses/s "
+            f"({ratio:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suite", choices=SUITES, default="quick")
+    parser.add_argument("--engine", choices=ENGINES, action="append")
+    parser.add_argument("--tileset", choices=TILESETS, action="append")
+    parser.add_argument("--size", type=int, action="append")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--max-time", type=float, default=30)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    tilesets = {}
+    results = []
+    for engine_names, tileset_names, sizes in SUITES[args.suite]:
+        for tileset_name in tileset_names:
+            if args.tileset and tileset_name not in args.tileset:
+                continue
+            if tileset_name not in tilesets:
+                tilesets[tileset_name] = Tileset(TILESETS[tileset_name]())
+
+            for engine_name in engine_names:
+                if args.engine and engine_name not in args.engine:
+                    continue
+
+                for size in args.size or sizes:
+                    result = run_case(
+                        engine_name,
+                        tileset_name,
+                        tilesets[tileset_name],
+                        size,
+                        args.seeds,
+                        args.max_time,
+                    )
+                    results.append(result)
+                    print(format_result(result), file=sys.stderr)
+
+    report = {
+        "commit": get_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "suite": args.suite,
+        "seeds": args.seeds,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file_:
+            json.dump(report, file_, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as file_:
+            compare(results, json.load(file_)["results"])
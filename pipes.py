@@ -1,19 +1,19 @@
-from wave_function_collapse.grid import Grid
+import argparse
+import random
+import sys
+
+from wave_function_collapse.engines import ENGINES
+from wave_function_collapse.renderer import Renderer
 from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
 
+# Names list the directions with a pipe, followed by the symmetry class
+# and the symbols of the rotated variants.
 TILEDATA = [
-    ["B", " "],
-    ["EW", "─"],
-    ["NS", "│"],
-    ["ES", "┌"],
-    ["SW", "┐"],
-    ["NE", "└"],
-    ["NW", "┘"],
-    ["NES", "├"],
-    ["NSW", "┤"],
-    ["ESW", "┬"],
-    ["NEW", "┴"],
-    ["NESW", "┼"],
+    ["B", "X", " "],
+    ["EW", "I", "─│"],
+    ["NE", "L", "└┌┐┘"],
+    ["NES", "T", "├┬┤┴"],
+    ["NESW", "X", "┼"],
 ]
 
 directions = {
@@ -38,8 +38,13 @@ opposites = {
     "W": "E",
 }
 
+directional_tags = {
+    direction: (tags[char][True], tags[char][False])
+    for char, direction in directions.items()
+}
+
 TILESET = []
-for name, symbol in TILEDATA:
+for name, symmetry, symbols in TILEDATA:
     tile_tags = []
     rules = {}
     for char, direction in directions.items():
@@ -53,11 +58,23 @@ for name, symbol in TILEDATA:
             },
         )
 
-    TILESET.append(
-        Tile(name=name, symbol=symbol, tags=tuple(tile_tags), rules=rules)
-    )
+    tile = Tile(name=name, tags=tuple(tile_tags), rules=rules)
+    TILESET.extend(tile.get_variants(symmetry, symbols, directional_tags))
 
 if __name__ == "__main__":
-    grid = Grid(TILESET, size=(60, 30))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=ENGINES, default="grid")
+    parser.add_argument("--width", type=int, default=60)
+    parser.add_argument("--height", type=int, default=30)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    grid = ENGINES[args.engine](
+        TILESET,
+        size=(args.width, args.height),
+        rng=random.Random(args.seed),
+    )
     grid.assign_all_tiles()
-    print(grid)
+    Renderer(grid.compiled_tileset).write(
+        sys.stdout, grid.tile_indices, args.width
+    )
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+import numpy as np
+
+from wave_function_collapse.batch import generate_many
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+
+
+class GenerateManyUnitTests(TestCase):
+    def setUp(self):
+        self.tiles = [
+            Tile(
+                name,
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": tag,
+                        }
+                        for tag in neighbors
+                    )
+                },
+                symbol=name[0],
+                tags=(name.lower(),),
+            )
+            for name, neighbors in [
+                ("Mountain", ("mountain", "hill")),
+                ("Hill", ("mountain", "hill", "grassland")),
+                ("Grassland", ("hill", "grassland", "sea")),
+                ("Sea", ("grassland", "sea")),
+            ]
+        ]
+
+    def assert_valid(self, tile_indices):
+        tileset = sorted(self.tiles, key=lambda t: t.name)
+        height, width = tile_indices.shape
+        for y in range(height):
+            for x in range(width):
+                tile = tileset[tile_indices[y, x]]
+                if x + 1 < width:
+                    self.assertTrue(
+                        tile.get_adjacency_frequency(
+                            tileset[tile_indices[y, x + 1]],
+                            RuleDirection.EAST,
+                        )
+                    )
+                if y + 1 < height:
+                    self.assertTrue(
+                        tile.get_adjacency_frequency(
+                            tileset[tile_indices[y + 1, x]],
+                            RuleDirection.SOUTH,
+                        )
+                    )
+
+    def test_generate_in_process(self):
+        results = list(generate_many(self.tiles, (6, 4), range(3), workers=1))
+
+        self.assertEqual([seed for seed, _ in results], [0, 1, 2])
+        for _, tile_indices in results:
+            self.assertEqual(tile_indices.shape, (4, 6))
+            self.assertEqual(tile_indices.dtype, np.int16)
+            self.assert_valid(tile_indices)
+
+    def test_generate_in_pool(self):
+        results = dict(generate_many(self.tiles, (6, 4), range(5), workers=2))
+        expected = dict(generate_many(self.tiles, (6, 4), range(5), workers=1))
+
+        self.assertEqual(sorted(results), list(range(5)))
+        for seed, tile_indices in results.items():
+            np.testing.assert_array_equal(tile_indices, expected[seed])
+
+    def test_generate_with_other_engine(self):
+        ((seed, tile_indices),) = generate_many(
+            self.tiles, (6, 4), [7], workers=1, engine=Grid
+        )
+
+        self.assertEqual(seed, 7)
+        self.assert_valid(tile_indices)
+
+    def test_raise_for_invalid_options(self):
+        with self.assertRaises(ValueError):
+            next(
+                generate_many(
+                    self.tiles, (6, 4), [0], engine=Grid, strategy="REPAIR"
+                )
+            )
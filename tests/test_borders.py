@@ -0,0 +1,180 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from wave_function_collapse.engines import ENGINES
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.solver import Solver
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.tileset import Tileset
+from wave_function_collapse.wave_cache import WaveCache
+
+
+def get_rules(*tags, border=False):
+    rules = tuple(
+        {
+            "frequency": 1,
+            "matching_type": RuleMatchingType.TAGS,
+            "matching_value": tag,
+        }
+        for tag in tags
+    )
+    if border:
+        rules += (
+            {
+                "frequency": 1,
+                "matching_type": RuleMatchingType.BORDER,
+                "matching_value": "",
+            },
+        )
+
+    return rules
+
+
+class BordersUnitTests(TestCase):
+    def setUp(self):
+        self.island = [
+            Tile(
+                "Coast",
+                rules={RuleDirection.ALL: get_rules("land", "coast", "sea")},
+                tags=("coast",),
+            ),
+            Tile(
+                "Land",
+                rules={RuleDirection.ALL: get_rules("land", "coast")},
+                tags=("land",),
+            ),
+            Tile(
+                "Sea",
+                rules={
+                    RuleDirection.ALL: get_rules("coast", "sea", border=True)
+                },
+                tags=("sea",),
+            ),
+        ]
+        self.stripes = [
+            Tile(
+                name,
+                rules={
+                    RuleDirection.NORTH: get_rules(tag),
+                    RuleDirection.SOUTH: get_rules(tag),
+                    RuleDirection.EAST: get_rules(other_tag),
+                    RuleDirection.WEST: get_rules(other_tag),
+                },
+                tags=(tag,),
+            )
+            for name, tag, other_tag in [("A", "a", "b"), ("B", "b", "a")]
+        ]
+
+    def solve(self, engine, tiles, size, seed=0, **kwargs):
+        grid = ENGINES[engine](
+            tiles, size=size, rng=random.Random(seed), **kwargs
+        )
+        grid.assign_all_tiles()
+        return np.asarray(grid.tile_indices).reshape(size[1], size[0])
+
+    def test_border_masks(self):
+        tileset = Tileset(self.island)
+
+        self.assertTrue(tileset.has_borders)
+        self.assertEqual(
+            tileset.border_masks, dict.fromkeys(tileset.border_masks, 0b100)
+        )
+        self.assertEqual(
+            tileset.get_border_masks((3, 2)),
+            {(x, y): 0b100 for x in range(3) for y in range(2)},
+        )
+        self.assertNotEqual(
+            tileset.fingerprint,
+            Tileset(
+                self.island[:2] + [Tile("Sea", tags=("sea",))]
+            ).fingerprint,
+        )
+        self.assertFalse(Tileset(self.stripes).has_borders)
+        self.assertEqual(Tileset(self.stripes).get_border_masks((3, 2)), {})
+
+    def test_border_masks_by_direction(self):
+        tiles = [
+            Tile("Sea", rules={RuleDirection.NORTH: get_rules(border=True)}),
+            Tile("Land"),
+        ]
+
+        self.assertEqual(
+            Tileset(tiles).get_border_masks((2, 2)),
+            {(0, 0): 0b10, (1, 0): 0b10},
+        )
+
+    def test_borders(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                tile_indices = self.solve(engine, self.island, (7, 6))
+
+                for edge in (
+                    tile_indices[0],
+                    tile_indices[-1],
+                    tile_indices[:, 0],
+                    tile_indices[:, -1],
+                ):
+                    np.testing.assert_array_equal(edge, 2)
+
+    def test_borders_disabled(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                edges = set()
+                for seed in range(5):
+                    tile_indices = self.solve(
+                        engine, self.island, (4, 4), seed, borders=False
+                    )
+                    edges.update(tile_indices[0].tolist())
+
+                self.assertNotEqual(edges, {2})
+
+    def test_periodic(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                tile_indices = self.solve(
+                    engine, self.stripes, (6, 3), periodic=True
+                )
+
+                # Columns alternate, also across the wrapped edge.
+                np.testing.assert_array_equal(
+                    tile_indices, np.roll(tile_indices, 1, axis=0)
+                )
+                np.testing.assert_array_equal(
+                    tile_indices, 1 - np.roll(tile_indices, 1, axis=1)
+                )
+
+    def test_periodic_raise_if_edges_do_not_fit(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.solve(engine, self.stripes, (5, 3))
+
+                with self.assertRaises(WaveFunctionCollapseException):
+                    self.solve(engine, self.stripes, (5, 3), periodic=True)
+
+    def test_periodic_ignores_borders(self):
+        tile_indices = self.solve(
+            "compact", self.island, (5, 5), seed=3, periodic=True
+        )
+
+        self.assertNotEqual(set(tile_indices[0].tolist()), {2})
+
+    def test_solver(self):
+        solver = Solver(self.stripes, size=(6, 4), seed=0, periodic=True)
+        tile_indices = np.asarray(solver.solve().tile_indices).reshape(4, 6)
+
+        np.testing.assert_array_equal(
+            tile_indices, 1 - np.roll(tile_indices, 1, axis=1)
+        )
+
+    def test_wave_cache_keys(self):
+        wave_cache = WaveCache()
+        keys = {
+            wave_cache.get_key(
+                ENGINES["compact"](self.island, size=(4, 4), **kwargs)
+            )
+            for kwargs in ({}, {"periodic": True}, {"borders": False})
+        }
+
+        self.assertEqual(len(keys), 3)
@@ -0,0 +1,459 @@
+import random
+from unittest import TestCase, mock
+
+import colorama
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+
+
+class CompactGridUnitTests(TestCase):
+    def setUp(self):
+        self.tile1 = Tile(
+            "Mountain",
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                )
+            },
+            symbol="M",
+            tags=("mountain",),
+        )
+        self.tile2 = Tile(
+            "Hill",
+            color=colorama.Fore.GREEN,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                )
+            },
+            symbol="H",
+            tags=("hill",),
+        )
+        self.tile3 = Tile(
+            "Grassland",
+            color=colorama.Fore.LIGHTGREEN_EX,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "sea",
+                    },
+                )
+            },
+            symbol="G",
+            tags=("grassland",),
+        )
+        self.tile4 = Tile(
+            "Sea",
+            color=colorama.Fore.BLUE,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "sea",
+                    },
+                )
+            },
+            symbol="S",
+            tags=("sea",),
+        )
+        self.tiles = [self.tile1, self.tile2, self.tile3, self.tile4]
+        self.tiles_sorted = sorted(self.tiles, key=lambda t: t.name)
+
+    def assign(self, grid, coords, tile):
+        grid.set_domain(
+            grid.get_index(coords),
+            1 << grid.compiled_tileset.index[tile.name],
+        )
+
+    def possible_tile_names(self, grid, coords):
+        return [
+            tile.name
+            for tile in grid.get_possible_tiles(grid.get_index(coords))
+        ]
+
+    def test_init(self):
+        grid = CompactGrid(self.tiles, size=(3, 2))
+        self.assertEqual(grid.size, (3, 2))
+        self.assertEqual(grid.tileset, self.tiles_sorted)
+        self.assertEqual(list(grid.domains), [0b1111] * 6)
+
+    def test_index_and_coords(self):
+        grid = CompactGrid(self.tiles, size=(3, 2))
+        self.assertEqual(grid.get_index((2, 1)), 5)
+        self.assertEqual(grid.get_coords(5), (2, 1))
+
+    def test_get_neighbors(self):
+        grid = CompactGrid(self.tiles, size=(3, 2))
+        self.assertEqual(
+            grid.get_neighbors(1),
+            [
+                (RuleDirection.EAST, 2),
+                (RuleDirection.SOUTH, 4),
+                (RuleDirection.WEST, 0),
+            ],
+        )
+
+    def test_neighbor_indices(self):
+        grid = CompactGrid(self.tiles, size=(3, 2))
+        self.assertEqual(
+            list(grid.neighbor_indices[:8]), [-1, 1, 3, -1, -1, 2, 4, 0]
+        )
+        self.assertEqual(list(grid.neighbor_indices[20:]), [2, -1, -1, 4])
+
+    def test_spaces_view(self):
+        grid = CompactGrid(self.tiles, size=(3, 2))
+        self.assign(grid, (0, 0), self.tile1)
+        grid.update_possible_tiles([1, 3])
+
+        self.assertEqual(len(grid.spaces), 6)
+        self.assertEqual(
+            list(grid.spaces), [(x, y) for x in range(3) for y in range(2)]
+        )
+        self.assertEqual(grid.spaces[(0, 0)].tile, self.tile1)
+        self.assertIsNone(grid.spaces[(0, 0)].possible_tiles)
+
+        space = grid.spaces[(1, 0)]
+        self.assertEqual(space.coords, (1, 0))
+        self.assertIsNone(space.tile)
+        self.assertEqual(space.possible_tiles, [self.tile2, self.tile1])
+        self.assertEqual(
+            space.frequencies,
+            [f for _, f in grid.get_frequencies(1)],
+        )
+
+        with self.assertRaises(KeyError):
+            grid.spaces[(3, 0)]
+
+    def test_tile_indices(self):
+        grid = CompactGrid(self.tiles, size=(3, 1))
+        self.assign(grid, (1, 0), self.tile4)
+
+        self.assertEqual(list(grid.tile_indices), [-1, 3, -1])
+
+    def test_str_initial(self):
+        grid = CompactGrid(self.tiles, size=(2, 2))
+        self.assertEqual(str(grid), "  \n  ")
+
+    def test_update_possible_tiles(self):
+        grid = CompactGrid(self.tiles, size=(2, 2))
+        self.assign(grid, (0, 0), self.tile1)
+
+        grid.update_possible_tiles([grid.get_index((0, 1)), 1])
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (0, 1)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 0)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain"],
+        )
+
+    def test_update_possible_tiles_do_not_check_further(self):
+        grid = CompactGrid(self.tiles, size=(2, 2))
+        self.assign(grid, (0, 0), self.tile1)
+
+        grid.update_possible_tiles([2, 1], check_further=False)
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain", "Sea"],
+        )
+
+    def test_update_possible_tiles_raise_if_no_tiles_remain(self):
+        grid = CompactGrid(self.tiles, size=(2, 1))
+        self.assign(grid, (0, 0), self.tile1)
+        self.assign(grid, (1, 0), self.tile4)
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.update_possible_tiles([1])
+
+        self.assertEqual(
+            str(context.exception),
+            "No options remaining for this space. This should not happen. "
+            "Please check the rules.",
+        )
+        self.assertEqual(context.exception.coords, (1, 0))
+
+    def test_restore(self):
+        grid = CompactGrid(self.tiles, size=(3, 3))
+        self.assertIsNone(grid.trail)
+        domains = list(grid.domains)
+
+        checkpoint = grid.get_checkpoint()
+        self.assertEqual(checkpoint, 0)
+        self.assign(grid, (1, 1), self.tile1)
+        grid.update_possible_tiles([1, 3, 5, 7])
+        self.assertNotEqual(list(grid.domains), domains)
+
+        grid.restore(checkpoint)
+        self.assertEqual(list(grid.domains), domains)
+        self.assertEqual(grid.trail, [])
+
+    def test_restore_drops_decisions(self):
+        grid = CompactGrid(self.tiles, size=(3, 3))
+        grid.assign_tile(0, 0)
+        grid.update_possible_tiles([1, 3])
+
+        checkpoint = grid.get_checkpoint()
+        grid.assign_tile(8, 1)
+        self.assertEqual(grid.decisions, [((0, 0), 0), ((2, 2), 1)])
+
+        grid.restore(checkpoint)
+        self.assertEqual(grid.decisions, [((0, 0), 0)])
+        self.assertIsNotNone(grid.get_next_space())
+
+    def test_ban_tile(self):
+        grid = CompactGrid(self.tiles, size=(2, 1))
+        self.assign(grid, (0, 0), self.tile3)
+        grid.update_possible_tiles([1])
+
+        grid.ban_tile(1, grid.compiled_tileset.index["Grassland"])
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 0)), ["Hill", "Sea"]
+        )
+
+    def test_ban_tile_raise_if_no_tiles_remain(self):
+        grid = CompactGrid(self.tiles, size=(2, 1))
+        self.assign(grid, (0, 0), self.tile1)
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.ban_tile(0, grid.compiled_tileset.index["Mountain"])
+
+        self.assertEqual(context.exception.coords, (0, 0))
+
+    def test_reset_spaces(self):
+        grid = CompactGrid(self.tiles, size=(3, 1))
+        self.assign(grid, (0, 0), self.tile1)
+        self.assign(grid, (1, 0), self.tile1)
+        grid.update_possible_tiles([2])
+
+        grid.reset_spaces([1])
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 0)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (2, 0)), ["Hill", "Mountain"]
+        )
+
+    def test_restrict_spaces(self):
+        grid = CompactGrid(self.tiles, size=(3, 1))
+
+        grid.restrict_spaces({(0, 0): 0b1001})
+        grid.reset_spaces([0])
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (0, 0)), ["Grassland", "Sea"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 0)),
+            ["Grassland", "Hill", "Sea"],
+        )
+
+    def test_restrict_spaces_raise_if_no_tiles_remain(self):
+        grid = CompactGrid(self.tiles, size=(3, 1))
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.restrict_spaces({(0, 0): 0b1001, (1, 0): 0b0100})
+
+        self.assertEqual(context.exception.coords, (1, 0))
+
+    def test_frequencies_match_grid(self):
+        grid = Grid(self.tiles, size=(2, 2))
+        grid.spaces[(0, 0)].tile = self.tile1
+        grid.spaces[(0, 0)].possible_tiles = None
+        grid.update_possible_tiles([(0, 1), (1, 0)])
+
+        compact_grid = CompactGrid(self.tiles, size=(2, 2))
+        self.assign(compact_grid, (0, 0), self.tile1)
+        compact_grid.update_possible_tiles([2, 1])
+
+        for coords in [(0, 1), (1, 0), (1, 1)]:
+            index = compact_grid.get_index(coords)
+            self.assertEqual(
+                compact_grid.get_frequencies(index),
+                [
+                    (i, grid.get_tile_frequency(coords, tile))
+                    for i, tile in enumerate(self.tiles_sorted)
+                    if grid.get_tile_frequency(coords, tile)
+                ],
+            )
+
+    def test_lowest_entropy_spaces(self):
+        grid = CompactGrid(self.tiles, size=(2, 2))
+        self.assertEqual(grid.lowest_entropy_spaces, [0, 1, 2, 3])
+
+        grid.set_domain(2, 0b0111)
+        self.assertEqual(grid.lowest_entropy_spaces, [2])
+
+    def test_get_next_space(self):
+        grid = CompactGrid(self.tiles, size=(2, 2), random_tie_breaking=False)
+        self.assertEqual(grid.get_next_space(), 0)
+
+        grid.set_domain(2, 0b0111)
+        self.assertEqual(grid.get_next_space(), 2)
+
+        grid.set_domain(2, 0b0100)
+        self.assertEqual(grid.get_next_space(), 0)
+
+    def test_get_next_space_none_if_all_assigned(self):
+        grid = CompactGrid([self.tile1], size=(2, 2))
+        self.assertIsNone(grid.get_next_space())
+
+    @mock.patch("wave_function_collapse.compact_grid.random.uniform")
+    def test_assign_next_tile(self, random_uniform_mock):
+        random_uniform_mock.return_value = 12.5
+
+        grid = CompactGrid(self.tiles, size=(2, 2), random_tie_breaking=False)
+        grid.assign_next_tile()
+
+        random_uniform_mock.assert_called_once_with(0, 20)
+
+        self.assertEqual(grid.get_tile(0).name, "Mountain")
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain"],
+        )
+        self.assertEqual(str(grid), f"{self.tile1} \n  ")
+
+    def test_assign_next_tile_exception_if_all_assigned(self):
+        grid = CompactGrid([self.tile1], size=(2, 2))
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.assign_next_tile()
+
+        self.assertEqual(
+            str(context.exception), "All spaces have been assigned a tile."
+        )
+
+    def test_assign_all_tiles(self):
+        grid = CompactGrid(self.tiles, size=(8, 6))
+        grid.assign_all_tiles()
+
+        width, height = grid.size
+        for index in range(width * height):
+            tile = grid.get_tile(index)
+            self.assertIsNotNone(tile)
+            for direction, neighbor in grid.get_neighbors(index):
+                self.assertTrue(
+                    tile.get_adjacency_frequency(
+                        grid.get_tile(neighbor), direction
+                    )
+                )
+
+    def test_rng(self):
+        grids = [
+            CompactGrid(self.tiles, size=(6, 5), rng=random.Random(3))
+            for _ in range(2)
+        ]
+        for grid in grids:
+            grid.assign_all_tiles()
+
+        self.assertEqual(list(grids[0].domains), list(grids[1].domains))
+        self.assertEqual(grids[0].decisions, grids[1].decisions)
+
+    def test_replay(self):
+        grid = CompactGrid(self.tiles, size=(6, 5))
+        grid.assign_all_tiles()
+
+        replayed_grid = CompactGrid(self.tiles, size=(6, 5))
+        with mock.patch.object(replayed_grid, "get_entropy") as entropy_mock:
+            replayed_grid.replay(grid.decisions)
+
+        entropy_mock.assert_not_called()
+        self.assertEqual(list(replayed_grid.domains), list(grid.domains))
+        self.assertEqual(replayed_grid.decisions, grid.decisions)
+
+        grid_ = Grid(self.tiles, size=(6, 5))
+        grid_.replay(grid.decisions)
+        self.assertEqual(str(grid_), str(grid))
+
+    def test_replay_raise_if_tile_not_possible(self):
+        grid = CompactGrid(self.tiles, size=(2, 1))
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.replay([((0, 0), 2), ((1, 0), 3)])
+
+        self.assertEqual(
+            str(context.exception), "This tile is not possible for this space."
+        )
+        self.assertEqual(context.exception.coords, (1, 0))
+
+    def test_iter_solve(self):
+        grid = CompactGrid(self.tiles, size=(6, 5), rng=random.Random(3))
+        grid.assign_all_tiles()
+
+        events = []
+        iter_grid = CompactGrid(self.tiles, size=(6, 5), rng=random.Random(3))
+        for event in iter_grid.iter_solve():
+            self.assertTrue(
+                iter_grid.is_assigned(iter_grid.get_index(event.coords))
+            )
+            self.assertNotIn(event.coords, event.narrowed)
+            events.append((event.coords, event.tile_index))
+
+        self.assertEqual(events, grid.decisions)
+        self.assertEqual(iter_grid.domains, grid.domains)
+        self.assertIsNone(iter_grid.narrowed)
+
+    def test_iter_solve_narrowed(self):
+        grid = CompactGrid(self.tiles, size=(6, 5), rng=random.Random(1))
+        domains = list(grid.domains)
+        for event in grid.iter_solve():
+            changed = [
+                grid.get_coords(index)
+                for index, domain in enumerate(grid.domains)
+                if domain != domains[index]
+            ]
+            self.assertEqual(
+                sorted(event.narrowed + [event.coords]), sorted(changed)
+            )
+            domains = list(grid.domains)
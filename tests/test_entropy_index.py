@@ -0,0 +1,78 @@
+from unittest import TestCase, mock
+
+from wave_function_collapse.entropy_index import EntropyIndex
+
+
+class EntropyIndexUnitTests(TestCase):
+    def test_peek_empty(self):
+        self.assertIsNone(EntropyIndex().peek())
+
+    def test_peek_lowest_entropy(self):
+        index = EntropyIndex()
+        index.update(3, 2.0)
+        index.update(5, 1.5)
+        index.update(7, 1.75)
+
+        self.assertEqual(index.peek(), 5)
+        self.assertEqual(len(index), 3)
+
+    def test_update_invalidates_previous_entry(self):
+        index = EntropyIndex()
+        index.update(3, 2.0)
+        index.update(5, 1.5)
+        index.update(5, 2.5)
+
+        self.assertEqual(index.peek(), 3)
+        self.assertEqual(index.entropies, {3: 2.0, 5: 2.5})
+
+    def test_remove(self):
+        index = EntropyIndex()
+        index.update(3, 2.0)
+        index.update(5, 1.5)
+        index.remove(5)
+        index.remove(8)
+
+        self.assertEqual(index.peek(), 3)
+
+        index.remove(3)
+        self.assertIsNone(index.peek())
+
+    def test_deterministic_tie_breaking(self):
+        index = EntropyIndex(random_tie_breaking=False)
+        for i in [7, 2, 9]:
+            index.update(i, 1.0)
+
+        self.assertEqual(index.peek(), 2)
+
+    @mock.patch("wave_function_collapse.entropy_index.random.random")
+    def test_random_tie_breaking(self, random_mock):
+        random_mock.side_effect = [0.5, 0.25, 0.75]
+
+        index = EntropyIndex()
+        for i in [7, 2, 9]:
+            index.update(i, 1.0)
+
+        self.assertEqual(index.peek(), 2)
+        random_mock.side_effect = None
+        random_mock.return_value = 0.1
+        index.update(9, 1.0)
+        self.assertEqual(index.peek(), 2)
+
+    def test_rng(self):
+        rng = mock.Mock()
+        rng.random.side_effect = [0.5, 0.25]
+
+        index = EntropyIndex(rng=rng)
+        for i in [7, 2]:
+            index.update(i, 1.0)
+
+        self.assertEqual(index.peek(), 2)
+        self.assertEqual(rng.random.call_count, 2)
+
+    def test_outdated_entries_are_compacted(self):
+        index = EntropyIndex()
+        for i in range(100):
+            index.update(0, float(i))
+
+        self.assertLessEqual(len(index._heap), 66)
+        self.assertEqual(index.peek(), 0)
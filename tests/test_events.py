@@ -0,0 +1,63 @@
+import asyncio
+import random
+from unittest import TestCase
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.events import CollapseEvent, iter_solve_async
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+
+
+class EventsUnitTests(TestCase):
+    def setUp(self):
+        self.tiles = [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": f"color{j}",
+                        }
+                        for j in range(4)
+                        if j != i
+                    )
+                },
+                symbol=str(i),
+                tags=(f"color{i}",),
+            )
+            for i in range(4)
+        ]
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(CollapseEvent((1, 2), 3, [(1, 1)])),
+            "CollapseEvent(coords=(1, 2), tile_index=3, narrowed=[(1, 1)])",
+        )
+
+    def test_iter_solve_async(self):
+        grid = CompactGrid(self.tiles, size=(6, 5), rng=random.Random(2))
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(len(grid.decisions))
+                await asyncio.sleep(0)
+
+        async def solve():
+            task = asyncio.ensure_future(tick())
+            events = [
+                event async for event in iter_solve_async(grid, steps=10)
+            ]
+            task.cancel()
+            return events
+
+        events = asyncio.run(solve())
+
+        self.assertEqual(
+            [(event.coords, event.tile_index) for event in events],
+            grid.decisions,
+        )
+        self.assertIsNone(grid.get_next_space())
+        # The other task ran after every 10 tiles.
+        self.assertEqual(ticks[:2], [10, 20])
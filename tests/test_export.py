@@ -0,0 +1,104 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.export import (
+    export_grid,
+    export_tile_indices,
+    get_dtype,
+    load_tile_map,
+)
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.vectorized_grid import VectorizedGrid
+
+
+class ExportUnitTests(TestCase):
+    def setUp(self):
+        self.tiles = [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": f"color{j}",
+                        }
+                        for j in range(3)
+                        if j != i
+                    )
+                },
+                symbol=str(i),
+                tags=(f"color{i}",),
+            )
+            for i in range(3)
+        ]
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "map.wfc")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_dtype(self):
+        self.assertEqual(get_dtype(3), np.uint8)
+        self.assertEqual(get_dtype(255), np.uint8)
+        self.assertEqual(get_dtype(256), np.uint16)
+        self.assertEqual(get_dtype(70000), np.uint32)
+
+    def test_export_grid(self):
+        for engine in (CompactGrid, VectorizedGrid):
+            grid = engine(self.tiles, size=(5, 4))
+            grid.assign_tile(
+                0 if engine is CompactGrid else (0, 0), tile_index=1
+            )
+            export_grid(grid, self.path)
+
+            self.assertEqual(os.path.getsize(self.path), 48 + 20)
+            tile_map = load_tile_map(self.path, self.tiles)
+            self.assertEqual(tile_map.size, (5, 4))
+            self.assertEqual(tile_map.get_tile_index((0, 0)), 1)
+            self.assertEqual(tile_map.get_tile_index((4, 3)), -1)
+            self.assertEqual(tile_map.get_tile((0, 0)).name, "Color1")
+            self.assertIsNone(tile_map.get_tile((1, 0)))
+
+    def test_get_window(self):
+        tile_indices = np.arange(30).reshape(5, 6) % 3
+        tile_indices[2, 3] = -1
+        export_tile_indices(
+            self.path, tile_indices.ravel(), self.tiles, (6, 5)
+        )
+
+        tile_map = load_tile_map(self.path)
+        np.testing.assert_array_equal(
+            tile_map.get_window((2, 1), (3, 2)), tile_indices[1:3, 2:5]
+        )
+        np.testing.assert_array_equal(
+            tile_map.get_window((4, 3), (5, 5)), tile_indices[3:, 4:]
+        )
+        with self.assertRaises(IndexError):
+            tile_map.get_window((-1, 0), (2, 2))
+
+    def test_raise_if_tileset_does_not_match(self):
+        export_tile_indices(self.path, [[0, 1]], self.tiles)
+
+        with self.assertRaises(ValueError) as context:
+            load_tile_map(self.path, self.tiles[:2])
+
+        self.assertEqual(
+            str(context.exception),
+            "The tile map was created with another tileset.",
+        )
+
+    def test_raise_if_not_a_tile_map(self):
+        with open(self.path, "wb") as file_:
+            file_.write(b"\0" * 64)
+
+        with self.assertRaises(ValueError):
+            load_tile_map(self.path)
+
+    def test_raise_if_size_does_not_match(self):
+        with self.assertRaises(ValueError):
+            export_tile_indices(self.path, [0, 1, 2], self.tiles, (2, 2))
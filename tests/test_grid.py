@@ -1,3 +1,4 @@
+import random
 from unittest import TestCase, mock
 
 import colorama
@@ -116,6 +117,12 @@ class GridUnitTests(TestCase):
                 )
                 self.assertIsNone(space.tile)
 
+    def test_tile_indices(self):
+        grid = Grid(self.tiles, size=(3, 1))
+        grid.spaces[(1, 0)].set_tile(self.tile4)
+
+        self.assertEqual(list(grid.tile_indices), [-1, 3, -1])
+
     def test_str_initial(self):
         grid = Grid(self.tiles, size=(2, 2))
         self.assertEqual(str(grid), "  \n  ")
@@ -127,8 +134,7 @@ class GridUnitTests(TestCase):
             [(x, y) for x in range(2) for y in range(2)],
         )
 
-        grid.spaces[(0, 0)].possible_tiles.pop()
-        grid.spaces[(0, 0)].frequencies.pop()
+        grid.spaces[(0, 0)].set_frequencies([1, 1, 1, 0])
         self.assertEqual(
             grid.lowest_entropy_spaces,
             [(0, 0)],
@@ -249,6 +255,34 @@ class GridUnitTests(TestCase):
             ["Grassland", "Hill", "Mountain"],
         )
 
+    def test_restrict_spaces(self):
+        grid = Grid(self.tiles, size=(3, 1))
+
+        grid.restrict_spaces({(0, 0): 0b1001})
+
+        self.assertEqual(
+            [tile.name for tile in grid.spaces[(0, 0)].possible_tiles],
+            ["Grassland", "Sea"],
+        )
+        self.assertEqual(
+            [tile.name for tile in grid.spaces[(1, 0)].possible_tiles],
+            ["Grassland", "Hill", "Sea"],
+        )
+
+    def test_restrict_spaces_assigns_single_tile(self):
+        grid = Grid(self.tiles, size=(3, 1))
+
+        grid.restrict_spaces({(0, 0): 0b0100})
+
+        self.assertEqual(list(grid.tile_indices)[0], 2)
+        self.assertEqual(grid.decisions, [])
+
+    def test_restrict_spaces_raise_if_no_tiles_remain(self):
+        grid = Grid(self.tiles, size=(3, 1))
+
+        with self.assertRaises(WaveFunctionCollapseException):
+            grid.restrict_spaces({(0, 0): 0b1001, (1, 0): 0b0100})
+
     def test_update_possible_tiles_do_not_check_further(self):
         grid = Grid(self.tiles, size=(2, 2))
         grid.spaces[(0, 0)].tile = self.tile1
@@ -269,6 +303,43 @@ class GridUnitTests(TestCase):
             ["Grassland", "Hill", "Mountain", "Sea"],
         )
 
+    def test_update_possible_tiles_queues_spaces_once(self):
+        grid = Grid(self.tiles, size=(3, 1))
+        checked = []
+
+        def update_single_space(coords):
+            checked.append(coords)
+            return len(checked) == 1
+
+        with mock.patch.object(
+            grid,
+            "update_possible_tiles_for_single_space",
+            side_effect=update_single_space,
+        ):
+            grid.update_possible_tiles([(0, 0), (1, 0)], shuffle_list=False)
+
+        self.assertEqual(checked, [(0, 0), (1, 0)])
+
+    @mock.patch("wave_function_collapse.grid.random.getrandbits")
+    def test_update_possible_tiles_rotates_neighbors(self, getrandbits_mock):
+        getrandbits_mock.return_value = 2
+        grid = Grid(self.tiles, size=(3, 3))
+        checked = []
+
+        def update_single_space(coords):
+            checked.append(coords)
+            return len(checked) == 1
+
+        with mock.patch.object(
+            grid,
+            "update_possible_tiles_for_single_space",
+            side_effect=update_single_space,
+        ):
+            grid.update_possible_tiles([(1, 1)])
+
+        getrandbits_mock.assert_called_once_with(2)
+        self.assertEqual(checked, [(1, 1), (1, 2), (0, 1), (1, 0), (2, 1)])
+
     @mock.patch("wave_function_collapse.space.random.uniform")
     @mock.patch("wave_function_collapse.grid.random.randrange")
     def test_assign_next_tile(
@@ -391,3 +462,55 @@ class GridUnitTests(TestCase):
         self.assertEqual(
             str(grid), f"{self.tile1}{self.tile1}\n{self.tile1}{self.tile1}"
         )
+
+    def test_rng(self):
+        grids = [
+            Grid(self.tiles, size=(5, 4), rng=random.Random(3))
+            for _ in range(2)
+        ]
+        for grid in grids:
+            grid.assign_all_tiles()
+
+        self.assertEqual(str(grids[0]), str(grids[1]))
+        self.assertEqual(grids[0].decisions, grids[1].decisions)
+
+    def test_replay(self):
+        grid = Grid(self.tiles, size=(5, 4))
+        grid.assign_all_tiles()
+
+        replayed_grid = Grid(self.tiles, size=(5, 4))
+        with mock.patch.object(replayed_grid, "rng") as rng_mock:
+            replayed_grid.replay(grid.decisions)
+
+        rng_mock.assert_not_called()
+        self.assertEqual(str(replayed_grid), str(grid))
+        self.assertEqual(replayed_grid.decisions, grid.decisions)
+
+    def test_replay_raise_if_tile_not_possible(self):
+        grid = Grid(self.tiles, size=(2, 1))
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.replay([((0, 0), 2), ((1, 0), 3)])
+
+        self.assertEqual(
+            str(context.exception), "This tile is not possible for this space."
+        )
+        self.assertEqual(context.exception.coords, (1, 0))
+
+    def test_iter_solve(self):
+        grid = Grid(self.tiles, size=(5, 4), rng=random.Random(3))
+        grid.assign_all_tiles()
+
+        iter_grid = Grid(self.tiles, size=(5, 4), rng=random.Random(3))
+        events = list(iter_grid.iter_solve())
+
+        self.assertEqual(
+            [(event.coords, event.tile_index) for event in events],
+            grid.decisions,
+        )
+        self.assertEqual(str(iter_grid), str(grid))
+        for event in events:
+            self.assertNotIn(event.coords, event.narrowed)
+            for coords in event.narrowed:
+                x, y = coords
+                self.assertTrue(0 <= x < 5 and 0 <= y < 4)
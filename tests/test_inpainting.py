@@ -0,0 +1,278 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.export import export_tile_indices, load_tile_map
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.inpainting import (
+    get_masks,
+    pin_tiles,
+    resolve_window,
+)
+from wave_function_collapse.solver import Solver
+from wave_function_collapse.support_grid import SupportGrid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.vectorized_grid import VectorizedGrid
+
+
+def get_rules(*tags, border=False):
+    rules = tuple(
+        {
+            "frequency": 1,
+            "matching_type": RuleMatchingType.TAGS,
+            "matching_value": tag,
+        }
+        for tag in tags
+    )
+    if border:
+        rules += (
+            {
+                "frequency": 1,
+                "matching_type": RuleMatchingType.BORDER,
+                "matching_value": "",
+            },
+        )
+
+    return rules
+
+
+class InpaintingUnitTests(TestCase):
+    def setUp(self):
+        # No two neighboring spaces have the same color.
+        self.colors = [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: get_rules(
+                        *(f"color{j}" for j in range(4) if j != i)
+                    )
+                },
+                symbol=str(i),
+                tags=(f"color{i}",),
+            )
+            for i in range(4)
+        ]
+        self.island = [
+            Tile(
+                "Coast",
+                rules={RuleDirection.ALL: get_rules("land", "coast", "sea")},
+                tags=("coast",),
+            ),
+            Tile(
+                "Land",
+                rules={RuleDirection.ALL: get_rules("land", "coast")},
+                tags=("land",),
+            ),
+            Tile(
+                "Sea",
+                rules={
+                    RuleDirection.ALL: get_rules("coast", "sea", border=True)
+                },
+                tags=("sea",),
+            ),
+        ]
+
+    def assert_colors_valid(self, tile_indices):
+        tile_indices = np.asarray(tile_indices)
+        self.assertTrue((tile_indices >= 0).all())
+        self.assertFalse((tile_indices[1:] == tile_indices[:-1]).any())
+        self.assertFalse((tile_indices[:, 1:] == tile_indices[:, :-1]).any())
+
+    def test_get_masks_from_tile_indices(self):
+        region = np.array([[-1, 2], [0, -1]])
+
+        self.assertEqual(get_masks(region), {(1, 0): 0b100, (0, 1): 0b1})
+        self.assertEqual(
+            get_masks(region, origin=(3, 5)), {(4, 5): 0b100, (3, 6): 0b1}
+        )
+
+    def test_get_masks_from_allowed_tiles(self):
+        region = np.ones((2, 2, 10), dtype=bool)
+        region[0, 1, 9] = False
+        region[1, 0] = False
+        region[1, 0, 3] = True
+
+        self.assertEqual(
+            get_masks(region, origin=(1, 1)),
+            {(2, 1): 0b0111111111, (1, 2): 0b1000},
+        )
+
+    def test_pin_tiles(self):
+        region = np.full((3, 3), -1)
+        region[0, 0], region[2, 2], region[1, 2] = 0, 1, 2
+        for engine in (Grid, CompactGrid, SupportGrid, VectorizedGrid):
+            with self.subTest(engine=engine.__name__):
+                grid = engine(self.colors, size=(6, 5))
+                with patch.object(
+                    grid,
+                    "update_possible_tiles",
+                    wraps=grid.update_possible_tiles,
+                ) as update_possible_tiles:
+                    pin_tiles(grid, region, origin=(2, 1))
+
+                update_possible_tiles.assert_called_once()
+                tile_indices = np.asarray(grid.tile_indices).reshape(5, 6)
+                self.assertEqual(tile_indices[1, 2], 0)
+                self.assertEqual(tile_indices[3, 4], 1)
+                self.assertEqual(tile_indices[2, 4], 2)
+
+                grid.assign_all_tiles()
+                tile_indices = np.asarray(grid.tile_indices).reshape(5, 6)
+                self.assertEqual(tile_indices[1, 2], 0)
+                self.assertEqual(tile_indices[3, 4], 1)
+                self.assertEqual(tile_indices[2, 4], 2)
+                self.assert_colors_valid(tile_indices)
+
+    def test_get_masks_beyond_tileset(self):
+        region = np.array([[255, 2], [0, 4]], dtype=np.uint8)
+
+        self.assertEqual(
+            get_masks(region, n_tiles=4), {(1, 0): 0b100, (0, 1): 0b1}
+        )
+
+    def test_exported_map(self):
+        tile_indices = np.asarray(
+            Solver(self.colors, size=(8, 6), seed=0).solve().tile_indices
+        ).reshape(6, 8)
+        # The first unassigned space lies in the frame of the window, the
+        # second one within the window.
+        tile_indices[0, 0] = tile_indices[2, 3] = -1
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "map.wfc")
+            export_tile_indices(path, tile_indices, self.colors)
+            tile_map = load_tile_map(path, self.colors)
+
+            grid = CompactGrid(self.colors, size=(8, 6))
+            pin_tiles(grid, tile_map.data)
+            result = tile_indices.copy()
+            result[slice(1, 4), slice(1, 4)] = resolve_window(
+                self.colors,
+                tile_map.data,
+                (1, 1),
+                (3, 3),
+                seed=0,
+                max_restarts=50,
+            )
+
+        np.testing.assert_array_equal(
+            np.asarray(grid.tile_indices).reshape(6, 8), tile_indices
+        )
+        self.assertEqual(result[0, 0], -1)
+        result[0, 0] = min({0, 1, 2, 3} - {result[0, 1], result[1, 0]})
+        self.assert_colors_valid(result)
+
+    def test_pin_tiles_contradiction(self):
+        region = np.array([[0, 0]])
+        for engine in (Grid, CompactGrid, VectorizedGrid):
+            with self.subTest(engine=engine.__name__):
+                grid = engine(self.colors, size=(3, 3))
+                with self.assertRaises(WaveFunctionCollapseException):
+                    pin_tiles(grid, region)
+
+    def test_solver_with_masks(self):
+        grid = Solver(
+            self.colors,
+            size=(4, 4),
+            engine=VectorizedGrid,
+            seed=0,
+            masks={(1, 1): 0b1000, (2, 2): 0b0011},
+        ).solve()
+
+        self.assertEqual(grid.tile_indices[1, 1], 3)
+        self.assertIn(grid.tile_indices[2, 2], (0, 1))
+        self.assert_colors_valid(grid.tile_indices)
+
+    def test_resolve_window(self):
+        tile_indices = np.asarray(
+            Solver(self.colors, size=(8, 6), seed=0).solve().tile_indices
+        ).reshape(6, 8)
+        for coords, size in (
+            ((2, 1), (3, 3)),
+            ((0, 0), (2, 2)),
+            ((6, 4), (5, 5)),
+        ):
+            with self.subTest(coords=coords, size=size):
+                window = (
+                    slice(coords[1], coords[1] + size[1]),
+                    slice(coords[0], coords[0] + size[0]),
+                )
+                result = tile_indices.copy()
+                result[window] = resolve_window(
+                    self.colors,
+                    tile_indices,
+                    coords,
+                    size,
+                    seed=1,
+                    max_restarts=50,
+                )
+
+                outside = np.ones(tile_indices.shape, dtype=bool)
+                outside[window] = False
+                np.testing.assert_array_equal(
+                    result[outside], tile_indices[outside]
+                )
+                self.assert_colors_valid(result)
+
+    def test_resolve_window_with_masks(self):
+        tile_indices = np.asarray(
+            Solver(self.colors, size=(5, 5), seed=2).solve().tile_indices
+        ).reshape(5, 5)
+        result = resolve_window(
+            self.colors,
+            tile_indices,
+            (1, 1),
+            (3, 3),
+            masks={(2, 2): 1 << 3},
+            engine=VectorizedGrid,
+            seed=0,
+            max_restarts=50,
+        )
+
+        self.assertEqual(result.shape, (3, 3))
+        self.assertEqual(result[1, 1], 3)
+
+    def test_resolve_window_borders(self):
+        tile_indices = np.asarray(
+            Solver(self.island, size=(6, 6), seed=0).solve().tile_indices
+        ).reshape(6, 6)
+        for borders in (True, False):
+            with self.subTest(borders=borders):
+                result = resolve_window(
+                    self.island,
+                    tile_indices,
+                    (0, 0),
+                    (4, 4),
+                    masks={(2, 2): 0b010},
+                    borders=borders,
+                    seed=0,
+                    max_restarts=50,
+                )
+
+                self.assertEqual(result[2, 2], 1)
+                if borders:
+                    # Land is surrounded by coast, which may not touch
+                    # the edges.
+                    self.assertTrue((result[0] == 2).all())
+                    self.assertTrue((result[:, 0] == 2).all())
+
+    def test_resolve_window_outside(self):
+        with self.assertRaises(IndexError):
+            resolve_window(self.colors, np.zeros((3, 3)), (3, 0), (2, 2))
+
+    def test_resolve_window_raise_if_mask_outside(self):
+        tile_indices = np.zeros((5, 5), dtype=int)
+        for coords in ((0, 0), (4, 2), (2, 4)):
+            with self.subTest(coords=coords):
+                with self.assertRaises(ValueError):
+                    resolve_window(
+                        self.colors,
+                        tile_indices,
+                        (1, 1),
+                        (3, 3),
+                        masks={coords: 0b1},
+                    )
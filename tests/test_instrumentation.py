@@ -0,0 +1,110 @@
+import random
+from unittest import TestCase
+
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.instrumentation import (
+    PHASES,
+    GridStatistics,
+    Instrumentation,
+)
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+
+
+class InstrumentationUnitTests(TestCase):
+    def setUp(self):
+        self.tiles = [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": f"color{j}",
+                        }
+                        for j in range(4)
+                        if j != i
+                    )
+                },
+                symbol=str(i),
+                tags=(f"color{i}",),
+            )
+            for i in range(4)
+        ]
+
+    def test_statistics(self):
+        instrumentation = Instrumentation()
+        grid = Grid(
+            self.tiles,
+            size=(5, 4),
+            rng=random.Random(0),
+            instrumentation=instrumentation,
+        )
+        grid.assign_all_tiles()
+
+        statistics = instrumentation.statistics
+        self.assertEqual(statistics.collapses, len(grid.decisions))
+        self.assertEqual(
+            statistics.calls["selection"], len(grid.decisions) + 1
+        )
+        self.assertEqual(
+            statistics.calls["propagation"], len(grid.decisions) + 1
+        )
+        self.assertGreater(statistics.calls["frequency"], 0)
+        self.assertEqual(statistics.calls["sampling"], 20)
+        # Every space starts with four colors and ends with one. The
+        # colors removed by choosing a tile are not eliminated by
+        # propagation.
+        self.assertGreater(statistics.eliminated_tiles, 0)
+        self.assertLessEqual(
+            statistics.eliminated_tiles + len(grid.decisions), 20 * 3
+        )
+        self.assertGreater(statistics.revisits_per_collapse, 0)
+        self.assertGreater(statistics.max_queue_length, 0)
+        for phase in PHASES:
+            self.assertGreaterEqual(statistics.seconds[phase], 0)
+
+    def test_matches_uninstrumented_grid(self):
+        grid = Grid(self.tiles, size=(5, 4), rng=random.Random(1))
+        grid.assign_all_tiles()
+        instrumented_grid = Grid(
+            self.tiles,
+            size=(5, 4),
+            rng=random.Random(1),
+            instrumentation=Instrumentation(),
+        )
+        instrumented_grid.assign_all_tiles()
+
+        self.assertEqual(instrumented_grid.decisions, grid.decisions)
+
+    def test_hooks(self):
+        instrumentation = Instrumentation()
+        collapses, steps = [], []
+        instrumentation.collapse_hooks.append(
+            lambda *args: collapses.append(args)
+        )
+        instrumentation.step_hooks.append(lambda *args: steps.append(args))
+
+        grid = Grid(self.tiles, size=(3, 3), rng=random.Random(2))
+        grid.instrumentation = instrumentation
+        grid.assign_all_tiles()
+
+        self.assertEqual(
+            [(coords, tile_index) for coords, tile_index, _, _ in collapses],
+            grid.decisions,
+        )
+        self.assertEqual(
+            sum(revisits for _, _, revisits, _ in collapses), len(steps)
+        )
+        self.assertEqual(
+            sum(eliminated for _, _, _, eliminated in collapses),
+            sum(eliminated for _, eliminated, _ in steps),
+        )
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(GridStatistics()),
+            "GridStatistics(selection=0 (0.000 s), propagation=0 (0.000 s), "
+            "frequency=0 (0.000 s), sampling=0 (0.000 s), collapses=0, "
+            "revisits=0, eliminated_tiles=0, max_queue_length=0)",
+        )
@@ -0,0 +1,146 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.constants import ADJACENT_BORDERS
+from wave_function_collapse.pattern import (
+    Pattern,
+    PatternModel,
+    find_patterns,
+    get_compatibility,
+)
+from wave_function_collapse.tile import RuleDirection
+
+
+class PatternUnitTests(TestCase):
+    def setUp(self):
+        self.sample = [
+            "~~~~~~",
+            "~....~",
+            "~.^^.~",
+            "~....~",
+            "~~~~~~",
+        ]
+
+    def test_overlaps(self):
+        pattern = Pattern([[0, 1], [2, 3]])
+
+        self.assertTrue(
+            pattern.overlaps(Pattern([[1, 4], [3, 5]]), RuleDirection.EAST)
+        )
+        self.assertTrue(
+            pattern.overlaps(Pattern([[4, 0], [5, 2]]), RuleDirection.WEST)
+        )
+        self.assertTrue(
+            pattern.overlaps(Pattern([[4, 5], [0, 1]]), RuleDirection.NORTH)
+        )
+        self.assertTrue(
+            pattern.overlaps(Pattern([[2, 3], [4, 5]]), RuleDirection.SOUTH)
+        )
+        self.assertFalse(
+            pattern.overlaps(Pattern([[2, 3], [4, 5]]), RuleDirection.NORTH)
+        )
+
+    def test_find_patterns(self):
+        sample = np.array([[0, 1, 0, 1], [1, 0, 1, 0], [0, 1, 0, 1]])
+        patterns, counts = find_patterns(sample, n=2)
+
+        np.testing.assert_array_equal(
+            patterns, [[[0, 1], [1, 0]], [[1, 0], [0, 1]]]
+        )
+        np.testing.assert_array_equal(counts, [3, 3])
+
+    def test_find_patterns_periodic(self):
+        sample = np.arange(12).reshape(3, 4)
+        patterns, counts = find_patterns(sample, n=3, periodic=True)
+
+        self.assertEqual(len(patterns), 12)
+        np.testing.assert_array_equal(counts, np.ones(12))
+        np.testing.assert_array_equal(
+            patterns[-1], [[11, 8, 9], [3, 0, 1], [7, 4, 5]]
+        )
+
+    def test_find_patterns_raises_if_sample_is_too_small(self):
+        with self.assertRaises(ValueError):
+            find_patterns(np.zeros((2, 5)), n=3)
+
+    def test_compatibility_matches_overlaps(self):
+        patterns, _ = find_patterns(
+            np.random.default_rng(0).integers(0, 2, (8, 8)), n=2
+        )
+        compatibility = get_compatibility(patterns)
+
+        for direction, compatible in compatibility.items():
+            np.testing.assert_array_equal(
+                compatible,
+                compatibility[ADJACENT_BORDERS[direction]].T,
+            )
+            for i, values in enumerate(patterns):
+                for j, other_values in enumerate(patterns):
+                    self.assertEqual(
+                        compatible[i, j],
+                        Pattern(values).overlaps(
+                            Pattern(other_values), direction
+                        ),
+                    )
+
+    def test_pattern_model(self):
+        model = PatternModel(self.sample, n=3)
+
+        self.assertEqual(model.symbols, [".", "^", "~"])
+        self.assertEqual(len(model), 12)
+        self.assertEqual(
+            sum(pattern.weight for pattern in model.patterns), 3 * 4
+        )
+        self.assertEqual(
+            [tile.name for tile in model.tileset.tiles],
+            [tile.name for tile in model.tiles],
+        )
+        self.assertEqual(model.tiles[0].symbol, "~")
+        pattern = model.patterns[0]
+        self.assertEqual(
+            model.tileset.frequencies[RuleDirection.EAST][0],
+            [
+                pattern.weight
+                if pattern.overlaps(other, RuleDirection.EAST)
+                else 0
+                for other in model.patterns
+            ],
+        )
+
+    def test_solve_and_decode(self):
+        model = PatternModel(self.sample, n=2, periodic=True)
+        grid = CompactGrid(model.tileset, size=(8, 6), rng=random.Random(0))
+        grid.assign_all_tiles()
+
+        lines = model.decode_lines(np.array(grid.tile_indices).reshape(6, 8))
+        self.assertEqual(len(lines), 6)
+        # Every 2x2 window of the output occurs in the sample.
+        sample_patterns = {
+            p.values.tobytes()
+            for p in PatternModel(self.sample, n=2, periodic=True).patterns
+        }
+        output = np.array(
+            [
+                [model.symbols.index(symbol) for symbol in line]
+                for line in lines
+            ]
+        )
+        for output_pattern in find_patterns(output, n=2)[0]:
+            self.assertIn(
+                output_pattern.astype(np.int32).tobytes(), sample_patterns
+            )
+
+    def test_decode_unassigned(self):
+        model = PatternModel(self.sample, n=3)
+
+        np.testing.assert_array_equal(model.decode([[0, -1]]), [[2, -1]])
+        self.assertEqual(model.decode_lines([[0, -1]]), ["~ "])
+
+    def test_decode_lines_requires_symbols(self):
+        model = PatternModel(np.zeros((4, 4), dtype=int), n=2)
+
+        with self.assertRaises(ValueError):
+            model.decode_lines([[0]])
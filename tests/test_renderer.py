@@ -0,0 +1,57 @@
+import io
+from unittest import TestCase
+
+import colorama
+import numpy as np
+
+from wave_function_collapse.renderer import Renderer
+from wave_function_collapse.tile import Tile
+
+
+class RendererUnitTests(TestCase):
+    def setUp(self):
+        # Tiles sorted by name: Forest, Hill, Mountain, Sea.
+        self.tiles = [
+            Tile("Mountain", symbol="M", rules={}),
+            Tile("Hill", color=colorama.Fore.GREEN, symbol="H", rules={}),
+            Tile("Forest", color=colorama.Fore.GREEN, symbol="F", rules={}),
+            Tile("Sea", color=colorama.Fore.BLUE, symbol="S", rules={}),
+        ]
+        self.green = colorama.Fore.GREEN
+        self.blue = colorama.Fore.BLUE
+        self.reset = colorama.Style.RESET_ALL
+
+    def test_render(self):
+        renderer = Renderer(self.tiles)
+        self.assertEqual(
+            renderer.render([2, -1, 2, 2, 2, -1], width=3),
+            "M M\nMM ",
+        )
+
+    def test_coalesce_colors(self):
+        renderer = Renderer(self.tiles)
+        self.assertEqual(
+            renderer.render([[0, 1, 1, 3], [2, 3, 3, 0]]),
+            f"{self.green}FHH{self.reset}{self.blue}S{self.reset}\n"
+            f"M{self.blue}SS{self.reset}{self.green}F{self.reset}",
+        )
+
+    def test_matches_tile_symbols(self):
+        renderer = Renderer(self.tiles)
+        tile_indices = np.random.default_rng(0).integers(-1, 4, (5, 7))
+
+        lines = renderer.render(tile_indices).split("\n")
+        for line, row in zip(lines, tile_indices):
+            for color in (self.green, self.blue, self.reset):
+                line = line.replace(color, "")
+            self.assertEqual(line, "".join(renderer.symbols[i] for i in row))
+
+    def test_no_colors(self):
+        renderer = Renderer(self.tiles, colors=False, empty=".")
+        self.assertEqual(renderer.render([[0, 3], [-1, 2]]), "FS\n.M")
+
+    def test_write(self):
+        renderer = Renderer(self.tiles, colors=False)
+        stream = io.StringIO()
+        renderer.write(stream, [0, 1, 2, 3], width=2)
+        self.assertEqual(stream.getvalue(), "FH\nMS\n")
@@ -0,0 +1,64 @@
+import random
+from unittest import TestCase, mock
+
+import numpy as np
+
+from wave_function_collapse.sampling import choose_index, choose_indices
+
+
+def choose_index_linearly(weights, rng):
+    random_number = rng.uniform(0, sum(weights))
+    cumulative_weight = 0
+    for index, weight in enumerate(weights):
+        cumulative_weight += weight
+        if random_number < cumulative_weight:
+            return index
+
+
+class SamplingUnitTests(TestCase):
+    def test_choose_index(self):
+        weights = [0.5, 2, 0, 1.5]
+        rng = mock.Mock()
+        for random_number, index in [(0, 0), (0.5, 1), (2.4, 1), (2.5, 3)]:
+            rng.uniform.return_value = random_number
+            self.assertEqual(choose_index(weights, rng), index)
+
+        rng.uniform.assert_called_with(0, 4)
+
+    def test_choose_index_total(self):
+        rng = mock.Mock()
+        rng.uniform.return_value = 3
+
+        self.assertEqual(choose_index([1, 2, 0, 0], rng), 1)
+
+    def test_choose_index_matches_linear_search(self):
+        rng = random.Random(0)
+        weights = [rng.random() for _ in range(50)]
+        for seed in range(100):
+            self.assertEqual(
+                choose_index(weights, random.Random(seed)),
+                choose_index_linearly(weights, random.Random(seed)),
+            )
+
+    def test_choose_indices(self):
+        weights = np.array([[0.5, 2, 0, 1.5], [1, 2, 0, 0]])
+        rng = mock.Mock()
+        rng.uniform.side_effect = [2.5, 3]
+
+        np.testing.assert_array_equal(choose_indices(weights, rng), [3, 1])
+        self.assertEqual(
+            rng.uniform.call_args_list, [mock.call(0, 4), mock.call(0, 3)]
+        )
+
+    def test_choose_indices_matches_choose_index(self):
+        weights = np.random.default_rng(0).random((20, 30))
+        weights[weights < 0.5] = 0
+
+        np.testing.assert_array_equal(
+            choose_indices(weights, random.Random(1)),
+            [
+                choose_index(row, rng)
+                for rng in [random.Random(1)]
+                for row in weights.tolist()
+            ],
+        )
@@ -0,0 +1,215 @@
+from unittest import TestCase, mock
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.solver import (
+    ContradictionStrategy,
+    Solver,
+    SolverStatistics,
+)
+from wave_function_collapse.support_grid import SupportGrid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+
+
+class SolverUnitTests(TestCase):
+    def setUp(self):
+        # Three colors that may not touch themselves. Colorings of larger
+        # grids run into contradictions regularly.
+        self.tiles = [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": f"color{j}",
+                        }
+                        for j in range(3)
+                        if j != i
+                    )
+                },
+                symbol=str(i),
+                tags=(f"color{i}",),
+            )
+            for i in range(3)
+        ]
+
+    def assert_solved(self, grid):
+        width, height = grid.size
+        for index in range(width * height):
+            tile = grid.get_tile(index)
+            self.assertIsNotNone(tile)
+            for _, neighbor in grid.get_neighbors(index):
+                self.assertNotEqual(tile, grid.get_tile(neighbor))
+
+    def test_init_raise_if_engine_cannot_undo(self):
+        with self.assertRaises(ValueError):
+            Solver(self.tiles, engine=Grid, strategy="BACKTRACK")
+
+    def test_statistics_repr(self):
+        self.assertEqual(
+            repr(SolverStatistics()),
+            "SolverStatistics(decisions=0, contradictions=0, restarts=0, "
+            "backtracks=0, repairs=0)",
+        )
+
+    def test_restart(self):
+        solver = Solver(self.tiles, size=(20, 20), seed=0, max_restarts=50)
+        grid = solver.solve()
+
+        self.assertIs(grid, solver.grid)
+        self.assert_solved(grid)
+        self.assertEqual(
+            solver.statistics.restarts, solver.statistics.contradictions
+        )
+        self.assertGreaterEqual(solver.statistics.decisions, 1)
+
+    def test_restart_other_engine(self):
+        solver = Solver(self.tiles, size=(4, 4), engine=Grid, seed=0)
+        grid = solver.solve()
+
+        self.assertTrue(all(space.tile for space in grid.spaces.values()))
+
+    def test_restart_raise_if_no_solution(self):
+        solver = Solver([self.tiles[0]], size=(2, 1), max_restarts=2)
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            solver.solve()
+
+        self.assertEqual(
+            str(context.exception), "No solution found after 2 restarts."
+        )
+        self.assertEqual(solver.statistics.restarts, 2)
+        self.assertEqual(solver.statistics.contradictions, 3)
+
+    def test_backtrack(self):
+        for engine in (CompactGrid, SupportGrid):
+            solver = Solver(
+                self.tiles,
+                size=(20, 20),
+                engine=engine,
+                strategy=ContradictionStrategy.BACKTRACK,
+                seed=0,
+                max_restarts=50,
+            )
+            self.assert_solved(solver.solve())
+            self.assertIsNone(solver.grid.trail)
+
+    def test_backtrack_undoes_failed_decision(self):
+        solver = Solver(
+            self.tiles, size=(3, 1), strategy="BACKTRACK", max_restarts=0
+        )
+        grid = CompactGrid(self.tiles, size=(3, 1), random_tie_breaking=False)
+        # The middle space can only be color 2 once its neighbors are
+        # colors 0 and 1. Choosing color 0 for it fails and is undone.
+        grid.set_domain(0, 0b001)
+        grid.set_domain(2, 0b010)
+        grid.set_domain(1, 0b101)
+
+        with mock.patch.object(solver, "engine", return_value=grid):
+            with mock.patch.object(grid, "choose_tile", return_value=0):
+                solver.solve()
+
+        self.assertEqual(grid.get_tile(1), self.tiles[2])
+        self.assertEqual(solver.statistics.decisions, 1)
+        self.assertEqual(solver.statistics.contradictions, 1)
+        self.assertEqual(solver.statistics.backtracks, 1)
+        self.assertEqual(solver.statistics.restarts, 0)
+
+    def test_repair(self):
+        for engine in (CompactGrid, SupportGrid):
+            solver = Solver(
+                self.tiles,
+                size=(20, 20),
+                engine=engine,
+                strategy=ContradictionStrategy.REPAIR,
+                seed=0,
+                max_restarts=50,
+            )
+            self.assert_solved(solver.solve())
+            self.assertEqual(
+                solver.statistics.repairs + solver.statistics.restarts,
+                solver.statistics.contradictions,
+            )
+
+    def test_seed(self):
+        grids = [
+            Solver(self.tiles, size=(10, 10), seed=1, max_restarts=50).solve()
+            for _ in range(2)
+        ]
+
+        self.assertEqual(list(grids[0].domains), list(grids[1].domains))
+
+    def test_seed_restarts_differ_from_other_seeds(self):
+        solvers = [
+            Solver(self.tiles, size=(20, 20), seed=seed, max_restarts=50)
+            for seed in range(6)
+        ]
+        maps = {tuple(solver.solve().tile_indices) for solver in solvers}
+
+        self.assertTrue(any(solver.statistics.restarts for solver in solvers))
+        self.assertEqual(len(maps), len(solvers))
+
+    def test_get_attempt_seed(self):
+        self.assertEqual(
+            Solver(self.tiles, seed=1).get_attempt_seed(2),
+            Solver(self.tiles, seed=1).get_attempt_seed(2),
+        )
+        self.assertNotEqual(
+            Solver(self.tiles, seed=0).get_attempt_seed(1),
+            Solver(self.tiles, seed=1).get_attempt_seed(0),
+        )
+
+    def test_replay(self):
+        for strategy in ContradictionStrategy:
+            solver = Solver(
+                self.tiles,
+                size=(20, 20),
+                strategy=strategy,
+                seed=0,
+                max_restarts=50,
+            )
+            grid = solver.solve()
+
+            replayed_grid = Solver(self.tiles, size=(20, 20)).replay(
+                grid.decisions
+            )
+            self.assertEqual(list(replayed_grid.domains), list(grid.domains))
+
+    def test_masks(self):
+        masks = {(x, 0): 0b001 for x in range(0, 10, 2)}
+        for strategy in ContradictionStrategy:
+            solver = Solver(
+                self.tiles,
+                size=(10, 10),
+                strategy=strategy,
+                seed=0,
+                max_restarts=50,
+                masks=masks,
+            )
+            grid = solver.solve()
+
+            self.assert_solved(grid)
+            for coords in masks:
+                self.assertEqual(grid.spaces[coords].tile, self.tiles[0])
+
+    def test_masks_other_engine(self):
+        masks = {(x, 0): 0b001 for x in range(0, 4, 2)}
+        grid = Solver(
+            self.tiles, size=(4, 4), engine=Grid, seed=0, masks=masks
+        ).solve()
+
+        self.assertTrue(all(space.tile for space in grid.spaces.values()))
+        for coords in masks:
+            self.assertEqual(grid.spaces[coords].tile, self.tiles[0])
+
+    def test_get_neighborhood(self):
+        solver = Solver(self.tiles, size=(4, 3))
+        solver.grid = CompactGrid(self.tiles, size=(4, 3))
+
+        self.assertEqual(solver.get_neighborhood((0, 0), 1), [0, 1, 4, 5])
+        self.assertEqual(
+            solver.get_neighborhood((2, 1), 1), [1, 2, 3, 5, 6, 7, 9, 10, 11]
+        )
@@ -5,6 +5,7 @@ import colorama
 from wave_function_collapse.exceptions import WaveFunctionCollapseException
 from wave_function_collapse.space import Space
 from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.utils import shannon_entropy
 
 
 class SpaceUnitTests(TestCase):
@@ -45,6 +46,11 @@ class SpaceUnitTests(TestCase):
         self.assertEqual(space.possible_tiles, self.tiles)
         self.assertIsNone(space.tile)
 
+    def test_slots(self):
+        space = Space((1, 2), possible_tiles=self.tiles)
+        with self.assertRaises(AttributeError):
+            space.other = None
+
     def test_init_tile(self):
         space = Space((1, 2), tile=self.tile1)
         self.assertEqual(space.coords, (1, 2))
@@ -68,14 +74,24 @@ class SpaceUnitTests(TestCase):
             "Must assign either possible tiles or tile.",
         )
 
-    @mock.patch("wave_function_collapse.space.shannon_entropy")
+    @mock.patch("wave_function_collapse.space.entropy_from_sums")
     def test_entropy_for_possible_tiles(self, entropy_mock):
         entropy_mock.return_value = 0.987654321
         space = Space((1, 2), possible_tiles=self.tiles)
         self.assertEqual(space.entropy, 0.987654321)
-        entropy_mock.assert_called_once_with(1, 1)
+        entropy_mock.assert_called_once_with(2, 0)
+
+    def test_entropy_updated_with_frequencies(self):
+        space = Space((1, 2), possible_tiles=self.tiles)
+        self.assertEqual(space.entropy, 1)
+
+        space.set_frequencies([1, 3])
+        self.assertAlmostEqual(space.entropy, shannon_entropy(1, 3))
+
+        space.set_frequencies([4, 0])
+        self.assertEqual(space.entropy, 0)
 
-    @mock.patch("wave_function_collapse.space.shannon_entropy")
+    @mock.patch("wave_function_collapse.space.entropy_from_sums")
     def test_entropy_zero_if_assigned_tile(self, entropy_mock):
         entropy_mock.return_value = 0.987654321
         space = Space((1, 2), tile=self.tile1)
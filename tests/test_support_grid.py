@@ -0,0 +1,299 @@
+from unittest import TestCase
+
+import colorama
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.support_grid import SupportGrid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.utils import shannon_entropy
+
+
+class SupportGridUnitTests(TestCase):
+    def setUp(self):
+        self.tile1 = Tile(
+            "Mountain",
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                )
+            },
+            symbol="M",
+            tags=("mountain",),
+        )
+        self.tile2 = Tile(
+            "Hill",
+            color=colorama.Fore.GREEN,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                )
+            },
+            symbol="H",
+            tags=("hill",),
+        )
+        self.tile3 = Tile(
+            "Grassland",
+            color=colorama.Fore.LIGHTGREEN_EX,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "sea",
+                    },
+                )
+            },
+            symbol="G",
+            tags=("grassland",),
+        )
+        self.tile4 = Tile(
+            "Sea",
+            color=colorama.Fore.BLUE,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "sea",
+                    },
+                )
+            },
+            symbol="S",
+            tags=("sea",),
+        )
+        self.tiles = [self.tile1, self.tile2, self.tile3, self.tile4]
+        self.tiles_sorted = sorted(self.tiles, key=lambda t: t.name)
+
+    def assign(self, grid, coords, tile):
+        grid.set_domain(
+            grid.get_index(coords),
+            1 << grid.compiled_tileset.index[tile.name],
+        )
+
+    def possible_tile_names(self, grid, coords):
+        return [
+            tile.name
+            for tile in grid.get_possible_tiles(grid.get_index(coords))
+        ]
+
+    def test_init(self):
+        grid = SupportGrid(self.tiles, size=(3, 2))
+        self.assertEqual(list(grid.domains), [0b1111] * 6)
+        self.assertEqual(len(grid.counts), 6 * 4 * 4)
+        # Grassland is supported by hill, grassland and sea in every
+        # direction.
+        self.assertEqual(list(grid.counts[:4]), [3, 3, 3, 3])
+        self.assertEqual(list(grid.supports[:4]), [3, 3, 3, 3])
+
+    def test_update_possible_tiles(self):
+        grid = SupportGrid(self.tiles, size=(2, 2))
+        self.assign(grid, (0, 0), self.tile1)
+
+        grid.update_possible_tiles([])
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (0, 1)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 0)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain"],
+        )
+
+    def test_update_possible_tiles_do_not_check_further(self):
+        grid = SupportGrid(self.tiles, size=(2, 2))
+        self.assign(grid, (0, 0), self.tile1)
+
+        grid.update_possible_tiles([], check_further=False)
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (0, 1)),
+            ["Grassland", "Hill", "Mountain", "Sea"],
+        )
+
+        grid.update_possible_tiles([2, 1], check_further=False)
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (0, 1)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain", "Sea"],
+        )
+
+    def test_update_possible_tiles_raise_if_no_tiles_remain(self):
+        grid = SupportGrid(self.tiles, size=(2, 1))
+        self.assign(grid, (0, 0), self.tile1)
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            self.assign(grid, (1, 0), self.tile4)
+            grid.update_possible_tiles([])
+
+        self.assertEqual(
+            str(context.exception),
+            "No options remaining for this space. This should not happen. "
+            "Please check the rules.",
+        )
+
+    def test_matches_compact_grid(self):
+        grid = SupportGrid(self.tiles, size=(4, 3))
+        compact_grid = CompactGrid(self.tiles, size=(4, 3))
+        for coords, tile in [((0, 0), self.tile1), ((3, 2), self.tile4)]:
+            self.assign(grid, coords, tile)
+            grid.update_possible_tiles([])
+            self.assign(compact_grid, coords, tile)
+            compact_grid.update_possible_tiles(range(12))
+
+        self.assertEqual(grid.domains, compact_grid.domains)
+        for index in range(12):
+            self.assertEqual(
+                grid.get_frequencies(index),
+                compact_grid.get_frequencies(index),
+            )
+
+    def test_assign_all_tiles(self):
+        grid = SupportGrid(self.tiles, size=(8, 6))
+        grid.assign_all_tiles()
+
+        for index in range(8 * 6):
+            tile = grid.get_tile(index)
+            self.assertIsNotNone(tile)
+            for direction, neighbor in grid.get_neighbors(index):
+                self.assertTrue(
+                    tile.get_adjacency_frequency(
+                        grid.get_tile(neighbor), direction
+                    )
+                )
+
+    def test_frequency_sums(self):
+        grid = SupportGrid(self.tiles, size=(4, 3))
+        self.assign(grid, (1, 1), self.tile1)
+        grid.update_possible_tiles([])
+
+        for index in range(12):
+            frequencies = [f for _, f in grid.get_frequencies(index)]
+            if grid.is_assigned(index):
+                self.assertEqual(grid.get_entropy(index), 0)
+                continue
+
+            self.assertEqual(grid.sum_frequencies[index], sum(frequencies))
+            self.assertAlmostEqual(
+                grid.get_entropy(index), shannon_entropy(*frequencies)
+            )
+
+    def test_counters_match_recount(self):
+        grid = SupportGrid(self.tiles, size=(4, 3))
+        # Assigning a tile removes more tiles than remain, narrowing a
+        # space removes fewer.
+        self.assign(grid, (1, 1), self.tile1)
+        grid.update_possible_tiles([])
+        grid.set_domain(grid.get_index((3, 2)), 0b0111)
+        grid.update_possible_tiles([])
+
+        counts = list(grid.counts)
+        supports = list(grid.supports)
+        tile_frequencies = list(grid.tile_frequencies)
+        for index in range(12):
+            grid.count_supports(index)
+
+        for index in range(12):
+            for i in range(4):
+                if not grid.domains[index] >> i & 1:
+                    continue
+
+                self.assertEqual(
+                    tile_frequencies[index * 4 + i],
+                    grid.tile_frequencies[index * 4 + i],
+                )
+                for k in range((index * 4 + i) * 4, (index * 4 + i + 1) * 4):
+                    if grid.neighbor_indices[index * 4 + k % 4] >= 0:
+                        self.assertEqual(counts[k], grid.counts[k])
+                        self.assertEqual(supports[k], grid.supports[k])
+
+    def test_restore(self):
+        grid = SupportGrid(self.tiles, size=(4, 3))
+        state = [
+            list(grid.domains),
+            list(grid.counts),
+            list(grid.supports),
+            list(grid.tile_frequencies),
+            list(grid.sum_frequencies),
+            list(grid.sum_frequency_logs),
+        ]
+
+        checkpoint = grid.get_checkpoint()
+        self.assign(grid, (1, 1), self.tile1)
+        self.assign(grid, (3, 2), self.tile4)
+        grid.update_possible_tiles([])
+        grid.reset_spaces([5, 6])
+
+        grid.restore(checkpoint)
+        self.assertEqual(list(grid.domains), state[0])
+        self.assertEqual(list(grid.counts), state[1])
+        self.assertEqual(list(grid.supports), state[2])
+        self.assertEqual(list(grid.tile_frequencies), state[3])
+        for array_, values in zip(
+            (grid.sum_frequencies, grid.sum_frequency_logs), state[4:]
+        ):
+            for value, expected in zip(array_, values):
+                self.assertAlmostEqual(value, expected)
+
+    def test_reset_spaces_matches_compact_grid(self):
+        grid = SupportGrid(self.tiles, size=(4, 3))
+        compact_grid = CompactGrid(self.tiles, size=(4, 3))
+        for coords, tile in [((1, 1), self.tile1), ((2, 1), self.tile1)]:
+            self.assign(grid, coords, tile)
+            grid.update_possible_tiles([])
+            self.assign(compact_grid, coords, tile)
+            compact_grid.update_possible_tiles(range(12))
+
+        grid.reset_spaces([6])
+        compact_grid.reset_spaces([6])
+
+        self.assertEqual(grid.domains, compact_grid.domains)
+        for index in range(12):
+            self.assertEqual(
+                grid.get_frequencies(index),
+                compact_grid.get_frequencies(index),
+            )
@@ -39,6 +39,11 @@ class TileUnitTests(TestCase):
         self.assertEqual(tile.symbol, "A")
         self.assertEqual(tile.tags, ("test",))
 
+    def test_slots(self):
+        tile = Tile("Test Tile")
+        with self.assertRaises(AttributeError):
+            tile.other = None
+
     def test_symbol_must_be_single_character(self):
         with self.assertRaises(ValueError) as context:
             Tile("Test Tile", symbol="ABC")
@@ -167,3 +172,117 @@ class TileUnitTests(TestCase):
         self.assertEqual(
             tile1.get_adjacency_frequency(tile2, RuleDirection.NORTH), 0
         )
+
+    def test_get_variants(self):
+        tile = Tile(
+            "Corner",
+            color=colorama.Fore.CYAN,
+            rules={
+                RuleDirection.NORTH: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "south",
+                    },
+                ),
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 2,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "empty",
+                    },
+                ),
+            },
+            tags=("north", "east"),
+        )
+        directional_tags = {
+            RuleDirection.NORTH: ("north",),
+            RuleDirection.EAST: ("east",),
+            RuleDirection.SOUTH: ("south",),
+            RuleDirection.WEST: ("west",),
+        }
+        variants = tile.get_variants("L", "└┌┐┘", directional_tags)
+
+        self.assertEqual(
+            [variant.name for variant in variants],
+            ["Corner", "Corner:R90", "Corner:R180", "Corner:R270"],
+        )
+        self.assertEqual(
+            [variant.symbol for variant in variants], list("└┌┐┘")
+        )
+        self.assertEqual(variants[1].color, colorama.Fore.CYAN)
+        self.assertEqual(variants[1].tags, ("east", "south"))
+        self.assertEqual(
+            variants[1].rules,
+            {
+                RuleDirection.EAST: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "west",
+                    },
+                ),
+                RuleDirection.ALL: tile.rules[RuleDirection.ALL],
+            },
+        )
+
+    def test_get_variants_mirrored(self):
+        tile = Tile(
+            "Arrow",
+            rules={
+                RuleDirection.NORTH: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "head",
+                    },
+                ),
+                RuleDirection.EAST: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "tail",
+                    },
+                ),
+            },
+        )
+        variants = tile.get_variants()
+
+        self.assertEqual(len(variants), 8)
+        self.assertEqual(variants[4].name, "Arrow:M")
+        self.assertEqual(
+            variants[4].rules[RuleDirection.WEST],
+            tile.rules[RuleDirection.EAST],
+        )
+        # Mirroring a tile with only one rule equals rotating it.
+        del tile.rules[RuleDirection.NORTH]
+        self.assertEqual(len(tile.get_variants()), 4)
+
+    def test_get_variants_removes_duplicates(self):
+        tile = Tile(
+            "Cross",
+            rules={
+                direction: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "pipe",
+                    },
+                )
+                for direction in (
+                    RuleDirection.NORTH,
+                    RuleDirection.EAST,
+                    RuleDirection.SOUTH,
+                    RuleDirection.WEST,
+                )
+            },
+            tags=("pipe",),
+        )
+
+        self.assertEqual(len(tile.get_variants("F")), 1)
+
+    def test_get_variants_raise_if_symbols_do_not_match(self):
+        with self.assertRaises(ValueError):
+            Tile("Test Tile").get_variants("I", symbols="─")
+        with self.assertRaises(ValueError):
+            Tile("Test Tile").get_variants("Y")
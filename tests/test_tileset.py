@@ -0,0 +1,274 @@
+from unittest import TestCase
+
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.tileset import (
+    COMPILED_TILESETS,
+    Tileset,
+    clear_compiled_tilesets,
+    compile_tileset,
+    expand_rules,
+    get_content_hash,
+)
+
+
+class TilesetUnitTests(TestCase):
+    def setUp(self):
+        clear_compiled_tilesets()
+        self.addCleanup(clear_compiled_tilesets)
+        self.tile1 = Tile(
+            "Mountain",
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                ),
+                RuleDirection.EAST: (
+                    {
+                        "frequency": 2,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                ),
+            },
+            tags=("mountain",),
+        )
+        self.tile2 = Tile(
+            "Hill",
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 3,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                )
+            },
+            tags=("hill",),
+        )
+        self.tiles = [self.tile1, self.tile2]
+
+    def test_init(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(tileset.tiles, [self.tile2, self.tile1])
+        self.assertEqual(tileset.index, {"Hill": 0, "Mountain": 1})
+        self.assertEqual(len(tileset), 2)
+
+    def test_tile_names_must_be_unique(self):
+        with self.assertRaises(ValueError) as context:
+            Tileset([self.tile1, Tile("Mountain")])
+
+        self.assertEqual(str(context.exception), "Tile names must be unique.")
+
+    def test_frequencies(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(
+            tileset.frequencies[RuleDirection.NORTH], [[3, 1], [0, 1]]
+        )
+        self.assertEqual(
+            tileset.frequencies[RuleDirection.EAST], [[3, 1], [2, 0]]
+        )
+
+    def test_frequencies_match_tile_rules(self):
+        tileset = Tileset(self.tiles)
+
+        for direction in tileset.frequencies:
+            for tile in self.tiles:
+                for other_tile in self.tiles:
+                    self.assertEqual(
+                        tileset.get_frequency(tile, other_tile, direction),
+                        tile.get_adjacency_frequency(other_tile, direction),
+                    )
+
+    def test_get_frequency_table(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(
+            tileset.get_frequency_table(self.tile1, RuleDirection.EAST),
+            [2, 0],
+        )
+
+    def test_compile_tileset(self):
+        tileset = compile_tileset(self.tiles)
+
+        self.assertIsInstance(tileset, Tileset)
+        self.assertIs(compile_tileset(tileset), tileset)
+
+    def test_compatible(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(tileset.full_mask, 0b11)
+        self.assertEqual(tileset.compatible[RuleDirection.NORTH], [0b01, 0b11])
+        self.assertEqual(tileset.compatible[RuleDirection.EAST], [0b11, 0b01])
+
+    def test_get_allowed_mask(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(
+            tileset.get_allowed_mask(RuleDirection.NORTH, 0b01), 0b01
+        )
+        self.assertEqual(
+            tileset.get_allowed_mask(RuleDirection.NORTH, 0b11), 0b11
+        )
+        self.assertEqual(tileset.get_allowed_mask(RuleDirection.EAST, 0), 0)
+
+    def test_memoized_masks_capped(self):
+        tileset = Tileset(self.tiles)
+        tileset.max_memoized_masks = 2
+        for mask in (0b01, 0b10, 0b11, 0b01, 0b10):
+            for direction in (RuleDirection.NORTH, RuleDirection.EAST):
+                tileset.get_allowed_mask(direction, mask)
+                tileset.get_supports(direction, mask)
+
+                self.assertLessEqual(len(tileset._allowed_masks), 2)
+                self.assertLessEqual(len(tileset._supports), 2)
+
+        self.assertEqual(
+            tileset.get_allowed_mask(RuleDirection.EAST, 0b11),
+            Tileset(self.tiles).get_allowed_mask(RuleDirection.EAST, 0b11),
+        )
+
+    def test_get_supports(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(
+            tileset.get_supports(RuleDirection.EAST, 0b11), [4, 2]
+        )
+        self.assertEqual(
+            tileset.get_supports(RuleDirection.EAST, 0b10), [1, 0]
+        )
+
+    def test_fingerprint(self):
+        tileset = Tileset(self.tiles)
+        self.assertEqual(tileset.fingerprint, Tileset(self.tiles).fingerprint)
+        self.assertNotEqual(
+            tileset.fingerprint, Tileset(self.tiles[:1]).fingerprint
+        )
+
+    def test_init_with_frequencies(self):
+        frequencies = {
+            direction: [
+                [
+                    tile.get_adjacency_frequency(other, direction)
+                    for other in self.tiles
+                ]
+                for tile in self.tiles
+            ]
+            for direction in Tileset(self.tiles).frequencies
+        }
+        tileset = Tileset(
+            [self.tile1, Tile("Hill", rules={})], frequencies=frequencies
+        )
+
+        self.assertEqual(tileset.frequencies, Tileset(self.tiles).frequencies)
+        self.assertEqual(tileset.compatible, Tileset(self.tiles).compatible)
+
+    def test_tag_index(self):
+        tileset = Tileset(
+            self.tiles + [Tile("Peak", tags=("mountain", "mountain"))]
+        )
+
+        self.assertEqual(tileset.tag_index, {"hill": [0], "mountain": [1, 2]})
+
+    def test_expand_rules(self):
+        rules = expand_rules(self.tile1.rules)
+
+        self.assertEqual(
+            rules[RuleDirection.NORTH], self.tile1.rules[RuleDirection.ALL]
+        )
+        self.assertEqual(
+            rules[RuleDirection.EAST], self.tile1.rules[RuleDirection.EAST]
+        )
+        self.assertEqual(len(rules), 4)
+        self.assertEqual(expand_rules(None)[RuleDirection.WEST], ())
+
+    def test_asymmetric_rules(self):
+        tileset = Tileset(self.tiles)
+
+        self.assertEqual(
+            tileset.asymmetric_rules,
+            [
+                (self.tile2, RuleDirection.NORTH, self.tile1),
+                (self.tile2, RuleDirection.EAST, self.tile1),
+                (self.tile2, RuleDirection.SOUTH, self.tile1),
+                (self.tile1, RuleDirection.WEST, self.tile1),
+            ],
+        )
+
+    def test_unplaceable_tiles(self):
+        # Mountains need mountains to the west, which do not allow
+        # mountains to the east.
+        self.assertEqual(Tileset(self.tiles).unplaceable_tiles, [self.tile1])
+
+        tile = Tile(
+            "Hill",
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                )
+            },
+            tags=("hill",),
+        )
+        self.assertEqual(Tileset([tile]).unplaceable_tiles, [])
+
+    def test_validate(self):
+        with self.assertRaises(ValueError) as context:
+            Tileset(self.tiles).validate()
+
+        self.assertTrue(
+            str(context.exception).startswith(
+                "Hill allows Mountain NORTH, but not vice versa."
+            )
+        )
+
+    def test_compile_tileset_cache(self):
+        tileset = compile_tileset(self.tiles)
+        tile1 = Tile("Mountain", rules=self.tile1.rules, tags=self.tile1.tags)
+        cached_tileset = compile_tileset([tile1, self.tile2])
+
+        self.assertIsNot(cached_tileset, tileset)
+        self.assertIs(cached_tileset.frequencies, tileset.frequencies)
+        self.assertEqual(cached_tileset.tiles, [self.tile2, tile1])
+        self.assertIsNot(
+            compile_tileset(self.tiles, cache=False).frequencies,
+            tileset.frequencies,
+        )
+
+    def test_clear_compiled_tilesets(self):
+        tileset = compile_tileset(self.tiles)
+        self.assertEqual(len(COMPILED_TILESETS), 1)
+
+        clear_compiled_tilesets()
+
+        self.assertEqual(len(COMPILED_TILESETS), 0)
+        self.assertIsNot(
+            compile_tileset(self.tiles).frequencies, tileset.frequencies
+        )
+
+    def test_get_content_hash(self):
+        self.assertEqual(
+            get_content_hash(self.tiles), get_content_hash(self.tiles[::-1])
+        )
+        self.assertNotEqual(
+            get_content_hash(self.tiles),
+            get_content_hash([self.tile1, Tile("Hill", tags=("hill",))]),
+        )
+
+    def test_compile_tileset_raise_if_names_not_unique(self):
+        tiles = [Tile("Hill", rules={}), Tile("Hill", color="green", rules={})]
+
+        with self.assertRaises(ValueError):
+            compile_tileset(tiles)
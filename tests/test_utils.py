@@ -1,6 +1,12 @@
 from unittest import TestCase
 
-from wave_function_collapse.utils import shannon_entropy
+from wave_function_collapse.utils import (
+    count_bits,
+    entropy_from_sums,
+    frequency_log,
+    iter_bits,
+    shannon_entropy,
+)
 
 
 class ShannonEntropyTests(TestCase):
@@ -15,3 +21,35 @@ class ShannonEntropyTests(TestCase):
         self.assertEqual(shannon_entropy(1, 1, 1, 1), 2)
         self.assertEqual(shannon_entropy(1, 1, 2), 1.5)
         self.assertEqual(shannon_entropy(1, 1, 2, 4), 1.75)
+
+
+class EntropyFromSumsTests(TestCase):
+    def test_frequency_log(self):
+        self.assertEqual(frequency_log(0), 0)
+        self.assertEqual(frequency_log(1), 0)
+        self.assertEqual(frequency_log(4), 8)
+
+    def test_entropy_zero_without_frequencies(self):
+        self.assertEqual(entropy_from_sums(0, 0), 0)
+
+    def test_matches_shannon_entropy(self):
+        for frequencies in [(1,), (1, 1), (1, 1, 2), (1, 1, 2, 4), (3, 5)]:
+            self.assertAlmostEqual(
+                entropy_from_sums(
+                    sum(frequencies),
+                    sum(frequency_log(f) for f in frequencies),
+                ),
+                shannon_entropy(*frequencies),
+            )
+
+
+class BitmaskTests(TestCase):
+    def test_count_bits(self):
+        self.assertEqual(count_bits(0), 0)
+        self.assertEqual(count_bits(0b1), 1)
+        self.assertEqual(count_bits(0b1011), 3)
+
+    def test_iter_bits(self):
+        self.assertEqual(list(iter_bits(0)), [])
+        self.assertEqual(list(iter_bits(0b1)), [0])
+        self.assertEqual(list(iter_bits(0b101100)), [2, 3, 5])
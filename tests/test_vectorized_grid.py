@@ -0,0 +1,327 @@
+import random
+from unittest import TestCase, mock
+
+import colorama
+import numpy as np
+
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.vectorized_grid import VectorizedGrid
+
+
+class VectorizedGridUnitTests(TestCase):
+    def setUp(self):
+        self.tile1 = Tile(
+            "Mountain",
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                )
+            },
+            symbol="M",
+            tags=("mountain",),
+        )
+        self.tile2 = Tile(
+            "Hill",
+            color=colorama.Fore.GREEN,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "mountain",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                )
+            },
+            symbol="H",
+            tags=("hill",),
+        )
+        self.tile3 = Tile(
+            "Grassland",
+            color=colorama.Fore.LIGHTGREEN_EX,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "hill",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "sea",
+                    },
+                )
+            },
+            symbol="G",
+            tags=("grassland",),
+        )
+        self.tile4 = Tile(
+            "Sea",
+            color=colorama.Fore.BLUE,
+            rules={
+                RuleDirection.ALL: (
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "grassland",
+                    },
+                    {
+                        "frequency": 1,
+                        "matching_type": RuleMatchingType.TAGS,
+                        "matching_value": "sea",
+                    },
+                )
+            },
+            symbol="S",
+            tags=("sea",),
+        )
+        self.tiles = [self.tile1, self.tile2, self.tile3, self.tile4]
+        self.tiles_sorted = sorted(self.tiles, key=lambda t: t.name)
+
+    def assign(self, grid, coords, tile):
+        grid.wave[coords[1], coords[0]] = False
+        grid.wave[
+            coords[1], coords[0], grid.compiled_tileset.index[tile.name]
+        ] = True
+
+    def possible_tile_names(self, grid, coords):
+        return [tile.name for tile in grid.get_possible_tiles(coords)]
+
+    def test_init(self):
+        grid = VectorizedGrid(self.tiles, size=(3, 2))
+        self.assertEqual(grid.size, (3, 2))
+        self.assertEqual(grid.tileset, self.tiles_sorted)
+        self.assertEqual(grid.wave.shape, (2, 3, 4))
+        self.assertTrue(grid.wave.all())
+        np.testing.assert_array_equal(grid.tile_indices, -np.ones((2, 3)))
+
+    def test_str_initial(self):
+        grid = VectorizedGrid(self.tiles, size=(2, 2))
+        self.assertEqual(str(grid), "  \n  ")
+
+    def test_update_possible_tiles(self):
+        grid = VectorizedGrid(self.tiles, size=(2, 2))
+        self.assign(grid, (0, 0), self.tile1)
+
+        grid.update_possible_tiles((0, 2, 0, 2))
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (0, 1)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 0)), ["Hill", "Mountain"]
+        )
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain"],
+        )
+        self.assertEqual(grid.get_tile((0, 0)), self.tile1)
+        self.assertIsNone(grid.get_tile((1, 1)))
+
+    def test_update_possible_tiles_propagates_outside_window(self):
+        grid = VectorizedGrid(self.tiles, size=(4, 1))
+        self.assign(grid, (0, 0), self.tile1)
+
+        grid.update_possible_tiles((0, 1, 0, 2))
+
+        self.assertEqual(
+            self.possible_tile_names(grid, (2, 0)),
+            ["Grassland", "Hill", "Mountain"],
+        )
+
+    def test_update_possible_tiles_raise_if_no_tiles_remain(self):
+        grid = VectorizedGrid(self.tiles, size=(2, 1))
+        self.assign(grid, (0, 0), self.tile1)
+        self.assign(grid, (1, 0), self.tile4)
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.update_possible_tiles((0, 1, 0, 2))
+
+        self.assertEqual(
+            str(context.exception),
+            "No options remaining for this space. This should not happen. "
+            "Please check the rules.",
+        )
+
+    def test_frequencies_match_grid(self):
+        grid = Grid(self.tiles, size=(2, 2))
+        grid.spaces[(0, 0)].tile = self.tile1
+        grid.spaces[(0, 0)].possible_tiles = None
+        grid.update_possible_tiles([(0, 1), (1, 0)])
+
+        vectorized_grid = VectorizedGrid(self.tiles, size=(2, 2))
+        self.assign(vectorized_grid, (0, 0), self.tile1)
+        vectorized_grid.update_possible_tiles((0, 2, 0, 2))
+        frequencies = vectorized_grid.get_frequencies((0, 2, 0, 2))
+
+        for x, y in [(0, 1), (1, 0), (1, 1)]:
+            self.assertEqual(
+                frequencies[y, x].tolist(),
+                [
+                    grid.get_tile_frequency((x, y), tile)
+                    for tile in self.tiles_sorted
+                ],
+            )
+
+    def test_lowest_entropy_spaces(self):
+        grid = VectorizedGrid(self.tiles, size=(2, 2))
+        self.assertEqual(
+            grid.lowest_entropy_spaces,
+            [(x, y) for x in range(2) for y in range(2)],
+        )
+
+        grid.wave[1, 0, 3] = False
+        grid.update_entropies((0, 2, 0, 2))
+        self.assertEqual(grid.lowest_entropy_spaces, [(0, 1)])
+
+    def test_get_next_space(self):
+        grid = VectorizedGrid(self.tiles, size=(8, 6), rng=random.Random(0))
+        while (coords := grid.get_next_space()) is not None:
+            np.testing.assert_array_equal(
+                grid.row_entropies, grid.entropies.min(axis=1)
+            )
+            self.assertIn(coords, grid.lowest_entropy_spaces)
+
+            grid.assign_tile(coords)
+            grid._update_around(coords)
+
+        self.assertEqual(grid.lowest_entropy_spaces, [])
+        self.assertTrue((grid.row_entropies == np.inf).all())
+
+    @mock.patch("wave_function_collapse.vectorized_grid.random.uniform")
+    @mock.patch("wave_function_collapse.vectorized_grid.random.randrange")
+    def test_assign_next_tile(
+        self, random_randrange_mock, random_uniform_mock
+    ):
+        random_randrange_mock.return_value = 0
+        random_uniform_mock.return_value = 12.5
+
+        grid = VectorizedGrid(self.tiles, size=(2, 2))
+        grid.assign_next_tile()
+
+        random_randrange_mock.assert_called_once_with(4)
+        random_uniform_mock.assert_called_once_with(0, 20)
+
+        self.assertEqual(grid.get_tile((0, 0)).name, "Mountain")
+        self.assertEqual(
+            self.possible_tile_names(grid, (1, 1)),
+            ["Grassland", "Hill", "Mountain"],
+        )
+        self.assertEqual(str(grid), f"{self.tile1} \n  ")
+
+    def test_assign_next_tile_exception_if_all_assigned(self):
+        grid = VectorizedGrid([self.tile1], size=(2, 2))
+
+        with self.assertRaises(WaveFunctionCollapseException) as context:
+            grid.assign_next_tile()
+
+        self.assertEqual(
+            str(context.exception), "All spaces have been assigned a tile."
+        )
+
+    def test_assign_all_tiles(self):
+        grid = VectorizedGrid(self.tiles, size=(8, 6))
+        grid.assign_all_tiles()
+
+        tile_indices = grid.tile_indices
+        self.assertTrue((tile_indices >= 0).all())
+        for y in range(6):
+            for x in range(8):
+                tile = self.tiles_sorted[tile_indices[y, x]]
+                if x < 7:
+                    self.assertTrue(
+                        tile.get_adjacency_frequency(
+                            self.tiles_sorted[tile_indices[y, x + 1]],
+                            RuleDirection.EAST,
+                        )
+                    )
+                if y < 5:
+                    self.assertTrue(
+                        tile.get_adjacency_frequency(
+                            self.tiles_sorted[tile_indices[y + 1, x]],
+                            RuleDirection.SOUTH,
+                        )
+                    )
+
+    def test_get_space_frequencies(self):
+        grid = VectorizedGrid(self.tiles, size=(5, 4))
+        grid.assign_tile((1, 1))
+        grid.update_possible_tiles((0, 4, 0, 5))
+
+        frequencies = grid.get_frequencies((0, 4, 0, 5))
+        coords_list = [(0, 0), (2, 1), (4, 3)]
+        np.testing.assert_array_equal(
+            grid.get_space_frequencies(coords_list),
+            [frequencies[y, x] for x, y in coords_list],
+        )
+
+    def test_assign_next_tiles(self):
+        grid = VectorizedGrid(self.tiles, size=(8, 6), rng=random.Random(0))
+        coords_list = grid.assign_next_tiles(5)
+
+        self.assertEqual(len(coords_list), 5)
+        self.assertEqual([coords for coords, _ in grid.decisions], coords_list)
+        for i, (x, y) in enumerate(coords_list):
+            self.assertEqual(grid.wave[y, x].sum(), 1)
+            for other_x, other_y in coords_list[:i]:
+                self.assertGreater(abs(x - other_x) + abs(y - other_y), 1)
+
+        while grid.entropies.min() < np.inf:
+            grid.assign_next_tiles(4)
+        self.assertTrue((grid.tile_indices >= 0).all())
+
+    def test_replay(self):
+        grid = VectorizedGrid(self.tiles, size=(6, 5))
+        grid.assign_all_tiles()
+
+        replayed_grid = VectorizedGrid(self.tiles, size=(6, 5))
+        replayed_grid.replay(grid.decisions)
+
+        np.testing.assert_array_equal(replayed_grid.wave, grid.wave)
+        self.assertEqual(replayed_grid.decisions, grid.decisions)
+        self.assertEqual(replayed_grid.lowest_entropy_spaces, [])
+
+    def test_iter_solve(self):
+        grid = VectorizedGrid(self.tiles, size=(6, 5), rng=random.Random(3))
+        grid.assign_all_tiles()
+
+        iter_grid = VectorizedGrid(
+            self.tiles, size=(6, 5), rng=random.Random(3)
+        )
+        events = list(iter_grid.iter_solve())
+
+        self.assertEqual(
+            [(event.coords, event.tile_index) for event in events],
+            grid.decisions,
+        )
+        np.testing.assert_array_equal(iter_grid.wave, grid.wave)
+        for event in events:
+            self.assertNotIn(event.coords, event.narrowed)
+            for x, y in event.narrowed:
+                self.assertLess(iter_grid.wave[y, x].sum(), len(self.tiles))
@@ -0,0 +1,118 @@
+import os
+import random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.support_grid import SupportGrid
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.tileset import Tileset
+from wave_function_collapse.vectorized_grid import VectorizedGrid
+from wave_function_collapse.wave_cache import WaveCache
+
+
+class WaveCacheUnitTests(TestCase):
+    def setUp(self):
+        # Land next to land or coast, sea next to sea or coast and coast
+        # next to anything.
+        neighbors = {
+            "coast": ("coast", "land", "sea"),
+            "land": ("coast", "land"),
+            "sea": ("coast", "sea"),
+        }
+        self.tileset = Tileset(
+            [
+                Tile(
+                    name.capitalize(),
+                    rules={
+                        RuleDirection.ALL: tuple(
+                            {
+                                "frequency": 1,
+                                "matching_type": RuleMatchingType.TAGS,
+                                "matching_value": other,
+                            }
+                            for other in others
+                        )
+                    },
+                    symbol=name[0],
+                    tags=(name,),
+                )
+                for name, others in neighbors.items()
+            ]
+        )
+
+    def test_get_key(self):
+        cache = WaveCache()
+        keys = {
+            cache.get_key(CompactGrid(self.tileset, size=(3, 2))),
+            cache.get_key(CompactGrid(self.tileset, size=(2, 3))),
+            cache.get_key(SupportGrid(self.tileset, size=(3, 2))),
+        }
+        self.assertEqual(len(keys), 3)
+
+    def test_cached_grids_match(self):
+        for engine in (Grid, CompactGrid, SupportGrid, VectorizedGrid):
+            cache = WaveCache()
+            grid = engine(
+                self.tileset,
+                size=(6, 5),
+                rng=random.Random(1),
+                wave_cache=cache,
+            )
+            cached_grid = engine(
+                self.tileset,
+                size=(6, 5),
+                rng=random.Random(1),
+                wave_cache=cache,
+            )
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+            state = engine(self.tileset, size=(6, 5)).get_state()
+            for key, value in cached_grid.get_state().items():
+                np.testing.assert_equal(value, state[key])
+
+            # The random number generator is not used for the cached
+            # state, so the grids match whether it was cached or not.
+            grid.assign_all_tiles()
+            cached_grid.assign_all_tiles()
+            self.assertEqual(
+                list(np.ravel(grid.tile_indices)),
+                list(np.ravel(cached_grid.tile_indices)),
+            )
+
+    def test_cached_grids_do_not_share_state(self):
+        cache = WaveCache()
+        grid = SupportGrid(self.tileset, size=(4, 4), wave_cache=cache)
+        grid.assign_all_tiles()
+
+        cached_grid = SupportGrid(self.tileset, size=(4, 4), wave_cache=cache)
+        self.assertEqual(list(cached_grid.domains), [0b111] * 16)
+        cached_grid.assign_all_tiles()
+
+    def test_evict_least_recently_used(self):
+        cache = WaveCache(max_size=2)
+        for size in [(2, 2), (3, 3), (2, 2), (4, 4)]:
+            CompactGrid(self.tileset, size=size, wave_cache=cache)
+
+        self.assertEqual(
+            [key.rsplit("_", 1)[1] for key in cache.states], ["2x2", "4x4"]
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_directory(self):
+        with TemporaryDirectory() as directory:
+            cache = WaveCache(directory=directory)
+            grid = CompactGrid(self.tileset, size=(3, 2), wave_cache=cache)
+            self.assertTrue(
+                os.path.exists(cache.get_path(cache.get_key(grid)))
+            )
+
+            cache = WaveCache(directory=directory)
+            cached_grid = CompactGrid(
+                self.tileset, size=(3, 2), wave_cache=cache
+            )
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+            self.assertEqual(cached_grid.domains, grid.domains)
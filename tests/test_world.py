@@ -0,0 +1,204 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+import numpy as np
+
+from wave_function_collapse.tile import RuleDirection, RuleMatchingType, Tile
+from wave_function_collapse.world import ChunkOrder, World
+
+
+class WorldUnitTests(TestCase):
+    def setUp(self):
+        # Three colors that may not touch themselves, so that mismatching
+        # seams are likely.
+        self.tiles = [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": f"color{j}",
+                        }
+                        for j in range(3)
+                        if j != i
+                    )
+                },
+                symbol=str(i),
+                tags=(f"color{i}",),
+            )
+            for i in range(3)
+        ]
+
+    def get_asymmetric_tiles(self):
+        # Colors that may not touch themselves, but Color0 allows Color4
+        # next to it and not the other way around.
+        allowed = [[j for j in range(5) if j != i] for i in range(5)]
+        allowed[4].remove(0)
+        return [
+            Tile(
+                f"Color{i}",
+                rules={
+                    RuleDirection.ALL: tuple(
+                        {
+                            "frequency": 1,
+                            "matching_type": RuleMatchingType.TAGS,
+                            "matching_value": f"color{j}",
+                        }
+                        for j in allowed[i]
+                    )
+                },
+                tags=(f"color{i}",),
+            )
+            for i in range(5)
+        ]
+
+    def assert_valid(self, tile_indices):
+        self.assertFalse((tile_indices < 0).any())
+        self.assertFalse((tile_indices[1:, :] == tile_indices[:-1, :]).any())
+        self.assertFalse((tile_indices[:, 1:] == tile_indices[:, :-1]).any())
+
+    def test_get_chunk(self):
+        world = World(self.tiles, chunk_size=(6, 4))
+        chunk = world.get_chunk((2, -1))
+
+        self.assertEqual(chunk.shape, (4, 6))
+        self.assert_valid(chunk)
+        self.assertIs(world.get_chunk((2, -1)), chunk)
+
+    def test_get_region_across_chunks(self):
+        world = World(self.tiles, chunk_size=(6, 4), seed=1)
+        region = world.get_region((-7, -5), (20, 13))
+
+        self.assertEqual(region.shape, (13, 20))
+        self.assert_valid(region)
+        self.assertEqual(len(world.chunks), 4 * 5)
+        np.testing.assert_array_equal(
+            region[1:5, 1:7], world.get_chunk((-1, -1))
+        )
+
+    def test_get_tile(self):
+        world = World(self.tiles, chunk_size=(6, 4))
+        chunk = world.get_chunk((1, 0))
+
+        self.assertEqual(world.get_tile((8, 3)), self.tiles[chunk[3, 2]])
+
+    def test_seam_masks(self):
+        world = World(self.tiles, chunk_size=(3, 2))
+        world.chunks[(0, -1)] = np.array([[0, 1, 2], [1, 2, 0]])
+
+        self.assertEqual(
+            world.get_seam_masks((0, 0)),
+            {(0, 0): 0b101, (1, 0): 0b011, (2, 0): 0b110},
+        )
+
+    def test_seam_masks_asymmetric_rules(self):
+        world = World(self.get_asymmetric_tiles(), chunk_size=(3, 1))
+        world.chunks[(0, -1)] = np.array([[0, 1, 4]])
+
+        self.assertEqual(
+            world.get_seam_masks((0, 0)),
+            {(0, 0): 0b01110, (1, 0): 0b11101, (2, 0): 0b01110},
+        )
+
+    def test_get_region_asymmetric_rules(self):
+        tiles = self.get_asymmetric_tiles()
+        for order in ChunkOrder:
+            with self.subTest(order=order):
+                world = World(tiles, chunk_size=(3, 3), seed=0, order=order)
+                region = world.get_region((0, 0), (12, 12))
+
+                self.assert_valid(region)
+                # Color0 and Color4 are never adjacent.
+                self.assertFalse(
+                    (abs(region[1:, :] - region[:-1, :]) == 4).any()
+                )
+                self.assertFalse(
+                    (abs(region[:, 1:] - region[:, :-1]) == 4).any()
+                )
+
+    def test_chunk_seed(self):
+        world = World(self.tiles, seed=5)
+
+        self.assertEqual(
+            world.get_chunk_seed((1, 2)),
+            World(self.tiles, seed=5).get_chunk_seed((1, 2)),
+        )
+        self.assertNotEqual(
+            world.get_chunk_seed((1, 2)), world.get_chunk_seed((2, 1))
+        )
+
+    def test_cache_size(self):
+        world = World(self.tiles, chunk_size=(4, 4), cache_size=2)
+        for chunk_coords in [(0, 0), (5, 0), (0, 0), (10, 0)]:
+            world.get_chunk(chunk_coords)
+
+        self.assertEqual(list(world.chunks), [(0, 0), (10, 0)])
+
+    def test_directory(self):
+        with TemporaryDirectory() as directory:
+            world = World(
+                self.tiles,
+                chunk_size=(4, 4),
+                cache_size=1,
+                directory=directory,
+            )
+            chunk = world.get_chunk((0, 0))
+            world.get_chunk((3, 3))
+
+            self.assertNotIn((0, 0), world.chunks)
+            self.assertTrue(
+                os.path.exists(os.path.join(directory, "chunk_0_0.npy"))
+            )
+            np.testing.assert_array_equal(world.get_chunk((0, 0)), chunk)
+
+            other_world = World(
+                self.tiles, chunk_size=(4, 4), directory=directory
+            )
+            np.testing.assert_array_equal(other_world.get_chunk((0, 0)), chunk)
+
+    def test_get_phase(self):
+        world = World(self.tiles)
+        self.assertEqual(world.get_phase((3, -2)), 1)
+
+        world = World(self.tiles, order=ChunkOrder.CHECKERBOARD)
+        self.assertEqual(
+            [world.get_phase(c) for c in [(0, 0), (1, 0), (0, 1), (-1, 3)]],
+            [0, 1, 2, 3],
+        )
+
+    def test_generate_chunks_in_phases(self):
+        world = World(
+            self.tiles, chunk_size=(4, 4), order=ChunkOrder.CHECKERBOARD
+        )
+        chunk_coords = [(x, y) for y in range(2) for x in range(2)]
+
+        with mock.patch.object(
+            world, "generate_chunk", wraps=world.generate_chunk
+        ) as generate_chunk_mock:
+            chunks = world.generate_chunks(chunk_coords)
+
+        self.assertEqual(sorted(chunks), sorted(chunk_coords))
+        self.assertEqual(
+            [c.args[0] for c in generate_chunk_mock.call_args_list],
+            [(0, 0), (1, 0), (0, 1), (1, 1)],
+        )
+        # The chunk of the first phase is not restricted, the last one by
+        # both of its neighbors.
+        self.assertEqual(generate_chunk_mock.call_args_list[0].args[1], {})
+        self.assertEqual(
+            len(generate_chunk_mock.call_args_list[3].args[1]), 4 + 4 - 1
+        )
+
+    def test_generate_chunks_independent_of_workers(self):
+        regions = [
+            World(self.tiles, chunk_size=(4, 4), seed=2).get_region(
+                (0, 0), (12, 8), workers=workers
+            )
+            for workers in [1, 2]
+        ]
+
+        self.assert_valid(regions[1])
+        np.testing.assert_array_equal(regions[0], regions[1])
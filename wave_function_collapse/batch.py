@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, Tuple, Type, Union
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.solver import ContradictionStrategy, Solver
+from wave_function_collapse.tile import Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+
+# Solver of the current worker process, set up once by _init_worker.
+_solver = None
+
+
+def _init_worker(solver: Solver):
+    global _solver
+    _solver = solver
+
+
+def _generate(seed: int) -> Tuple[int, np.ndarray]:
+    return _solve(_solver, seed)
+
+
+def _solve(solver: Solver, seed: int) -> Tuple[int, np.ndarray]:
+    solver.seed = seed
+    grid = solver.solve()
+
+    width, height = solver.size
+    if len(solver.compiled_tileset) <= np.iinfo(np.int16).max:
+        dtype = np.int16
+    else:
+        dtype = np.int32
+
+    return seed, np.asarray(grid.tile_indices, dtype=dtype).reshape(
+        height, width
+    )
+
+
+def generate_many(
+    tileset: Union[List[Tile], Tileset],
+    size: Tuple[int],
+    seeds: Iterable[int],
+    workers: int = None,
+    engine: Type = CompactGrid,
+    strategy: ContradictionStrategy = ContradictionStrategy.RESTART,
+    **options,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Generates one map per seed in a pool of worker processes.
+
+    The tileset is compiled once and sent to every worker along with the
+    solver settings when it starts. Only the seeds and the resulting tile
+    indices are passed per map.
+
+    Arguments:
+        tileset: List of tiles or compiled tileset.
+        size: Size of the maps (width x height).
+        seeds: Seeds of the maps. The same seed always results in the
+            same map.
+        workers: Number of worker processes. If 1, the maps are generated
+            in the current process (default: number of CPUs).
+        engine: Grid class to be used (default: CompactGrid).
+        strategy: ContradictionStrategy of the solver (default: RESTART).
+        options: Further keyword arguments passed to Solver.
+
+    Yields:
+        Tuples of the seed and an integer array of shape (height, width)
+        with the tile indices of the map in the order the maps are
+        finished.
+
+    Raises:
+        WaveFunctionCollapseException if no map was found for a seed.
+    """
+    solver = Solver(
+        compile_tileset(tileset),
+        size=size,
+        engine=engine,
+        strategy=strategy,
+        **options,
+    )
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for seed in seeds:
+            yield _solve(solver, seed)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(solver,),
+    ) as executor:
+        # Keep a few tasks queued per worker instead of submitting all
+        # seeds at once, so that seeds can be a long or lazy iterable.
+        seeds = iter(seeds)
+        pending = set()
+        for seed in seeds:
+            pending.add(executor.submit(_generate, seed))
+            if len(pending) == 2 * workers:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                if (seed := next(seeds, None)) is not None:
+                    pending.add(executor.submit(_generate, seed))
@@ -0,0 +1,644 @@
+import random
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from copy import copy
+from typing import Dict, Iterator, List, Tuple, Union
+
+from wave_function_collapse.entropy_index import EntropyIndex
+from wave_function_collapse.events import CollapseEvent
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.renderer import Renderer
+from wave_function_collapse.sampling import choose_index
+from wave_function_collapse.space import Space
+from wave_function_collapse.tile import RuleDirection, Tile
+from wave_function_collapse.tileset import DIRECTIONS, Tileset, compile_tileset
+from wave_function_collapse.utils import (
+    entropy_from_sums,
+    frequency_log,
+    iter_bits,
+)
+from wave_function_collapse.wave_cache import WaveCache
+
+
+class CompactGrid:
+    """Grid of spaces storing each space's possible tiles as an integer
+    bitmask over the tile indices of a compiled tileset.
+
+    Narrowing the possible tiles of a space is a bitwise AND and checking
+    whether a space changed is an integer comparison. A space with a
+    single bit set has been assigned that tile.
+
+    Attributes:
+        tileset: List of tiles to be used, will be resorted by name.
+            Tile names must be unique.
+        compiled_tileset: Tileset with the precompiled adjacency
+            frequencies of the tiles.
+        size: Size of the grid (width x height, default: 20x20).
+        domains: Array (or list for more than 64 tiles) of bitmasks of
+            the spaces' possible tiles, indexed by y * width + x. Bit i is
+            set if tileset[i] is possible.
+        neighbor_indices: Array of the indices of the neighbors of every
+            space in the order north, east, south, west, indexed by
+            space index * 4 + direction index. Neighbors outside of the
+            grid are set to -1.
+        periodic: Whether the grid wraps around its edges, so that the
+            spaces along opposite edges are neighbors (default: False).
+        spaces: Read-only view mapping coordinates (x, y) to Space
+            objects, which are created on access.
+        entropy_index: Heap of the unassigned spaces' entropies used to
+            select the next space. Spaces whose entropy changed are
+            updated in bulk before each selection.
+        trail: List of changes recorded while it is not None, so that
+            they can be undone with restore (default: None).
+        rng: Random number generator, e.g. an instance of random.Random
+            (default: the random module).
+        decisions: List of the coordinates and tile indices of the tiles
+            assigned by assign_tile in order. Decisions are dropped when
+            their space is restored or reset.
+        masks: Dictionary of space indices to bitmasks of the tiles
+            allowed by the border rules and restrict_spaces. Reset spaces
+            keep these restrictions.
+        wave_cache: WaveCache the initial state of the spaces is copied
+            from. If None, the rules are propagated over the whole grid
+            (default: None).
+        narrowed: List of the indices of the spaces whose possible tiles
+            were set, recorded while it is not None (default: None).
+    """
+
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        size: Tuple[int] = (20, 20),
+        random_tie_breaking: bool = True,
+        rng: random.Random = None,
+        wave_cache: WaveCache = None,
+        periodic: bool = False,
+        borders: bool = True,
+    ):
+        """
+        Arguments:
+            borders: Whether the tiles along the edges are restricted by
+                the tiles' border rules. Ignored for periodic grids
+                (default: True).
+        """
+        self.compiled_tileset = compile_tileset(tileset)
+        self.tileset = self.compiled_tileset.tiles
+        self.size = size
+        self.rng = random if rng is None else rng
+        self.decisions = []
+        self.periodic = periodic
+        self.borders = borders and not periodic
+        self.wave_cache = wave_cache
+
+        width, height = self.size
+        if len(self.tileset) <= 64:
+            self.domains = array("Q", [self.compiled_tileset.full_mask])
+        else:
+            self.domains = [self.compiled_tileset.full_mask]
+        self.domains *= width * height
+
+        self.neighbor_indices = array("i")
+        for y in range(height):
+            for x in range(width):
+                if periodic:
+                    self.neighbor_indices.extend(
+                        (
+                            (y - 1) % height * width + x,
+                            y * width + (x + 1) % width,
+                            (y + 1) % height * width + x,
+                            y * width + (x - 1) % width,
+                        )
+                    )
+                    continue
+
+                index = y * width + x
+                self.neighbor_indices.extend(
+                    (
+                        index - width if y > 0 else -1,
+                        index + 1 if x < width - 1 else -1,
+                        index + width if y < height - 1 else -1,
+                        index - 1 if x > 0 else -1,
+                    )
+                )
+        self.masks = {}
+        if self.borders:
+            for coords, mask in self.compiled_tileset.get_border_masks(
+                size
+            ).items():
+                self.masks[self.get_index(coords)] = mask
+        self.spaces = SpacesView(self)
+        self.trail = None
+        self.narrowed = None
+
+        self._entropies = [None] * len(self.domains)
+        self.entropy_index = EntropyIndex(random_tie_breaking, self.rng)
+        self._changed_entropies = set(range(len(self.domains)))
+
+        if wave_cache is None or (state := wave_cache.get(self)) is None:
+            self._initialize()
+            if wave_cache is not None:
+                wave_cache.put(self, self.get_state())
+        else:
+            self.set_state(state)
+
+    def __str__(self):
+        return Renderer(self.compiled_tileset).render(
+            self.tile_indices, self.size[0]
+        )
+
+    @property
+    def tile_indices(self) -> array:
+        """Array of the indices of the assigned tiles and -1 for
+        unassigned spaces, indexed like domains.
+        """
+        return array(
+            "i",
+            (
+                domain.bit_length() - 1 if not domain & (domain - 1) else -1
+                for domain in self.domains
+            ),
+        )
+
+    def _initialize(self):
+        for index, mask in self.masks.items():
+            if not (domain := self.domains[index] & mask):
+                raise WaveFunctionCollapseException(
+                    "No options remaining for this space. "
+                    "This should not happen. "
+                    "Please check the rules.",
+                    coords=self.get_coords(index),
+                )
+            self.set_domain(index, domain)
+
+        self.update_possible_tiles(range(len(self.domains)))
+
+    def get_state(self) -> dict:
+        """Get a copy of the possible tiles and entropies of all spaces,
+        e.g. to be cached by a WaveCache.
+        """
+        return {
+            "domains": copy(self.domains),
+            "entropies": [
+                None if self.is_assigned(index) else self.get_entropy(index)
+                for index in range(len(self.domains))
+            ],
+        }
+
+    def set_state(self, state: dict):
+        """Replaces the possible tiles and entropies of all spaces with a
+        copy of a state returned by get_state. Nothing is propagated.
+        """
+        self.domains = copy(state["domains"])
+        self._entropies = list(state["entropies"])
+        self._changed_entropies = set(range(len(self.domains)))
+
+    def get_index(self, coords: Tuple[int]) -> int:
+        """Converts coordinates (x, y) to a flat space index."""
+        return coords[1] * self.size[0] + coords[0]
+
+    def get_coords(self, index: int) -> Tuple[int]:
+        """Converts a flat space index to coordinates (x, y)."""
+        return index % self.size[0], index // self.size[0]
+
+    def get_neighbors(self, index: int) -> List[Tuple[RuleDirection, int]]:
+        """Get the indices of the neighboring spaces within the grid.
+
+        Arguments:
+            index: A space's index.
+
+        Returns:
+            List of tuples of direction and neighbor index.
+        """
+        north, east, south, west = DIRECTIONS
+        offset = index * 4
+        neighbor_indices = self.neighbor_indices
+        neighbors = []
+        if (neighbor := neighbor_indices[offset]) >= 0:
+            neighbors.append((north, neighbor))
+        if (neighbor := neighbor_indices[offset + 1]) >= 0:
+            neighbors.append((east, neighbor))
+        if (neighbor := neighbor_indices[offset + 2]) >= 0:
+            neighbors.append((south, neighbor))
+        if (neighbor := neighbor_indices[offset + 3]) >= 0:
+            neighbors.append((west, neighbor))
+
+        return neighbors
+
+    def is_assigned(self, index: int) -> bool:
+        """Whether a space has a single possible tile left."""
+        domain = self.domains[index]
+        return not domain & (domain - 1)
+
+    def get_tile(self, index: int) -> Tile:
+        """Get the tile assigned to a space or None if not assigned."""
+        if not self.is_assigned(index):
+            return None
+
+        return self.tileset[self.domains[index].bit_length() - 1]
+
+    def get_possible_tiles(self, index: int) -> List[Tile]:
+        """Get the list of tiles that are possible for a space."""
+        return [self.tileset[i] for i in iter_bits(self.domains[index])]
+
+    def get_frequencies(self, index: int) -> List[Tuple[int, float]]:
+        """Determines the frequencies of the possible tiles of a space.
+
+        Arguments:
+            index: A space's index.
+
+        Returns:
+            List of tuples of tile index and frequency.
+        """
+        supports = [
+            self.compiled_tileset.get_supports(
+                direction, self.domains[neighbor]
+            )
+            for direction, neighbor in self.get_neighbors(index)
+        ]
+
+        return [
+            (i, sum(support[i] for support in supports))
+            for i in iter_bits(self.domains[index])
+        ]
+
+    def get_entropy(self, index: int) -> float:
+        """Shannon entropy of a space. The entropy is cached until the
+        space or one of its neighbors changes.
+        """
+        if (entropy := self._entropies[index]) is None:
+            if self.is_assigned(index):
+                entropy = 0
+            else:
+                frequencies = [f for _, f in self.get_frequencies(index)]
+                entropy = entropy_from_sums(
+                    sum(frequencies), sum(map(frequency_log, frequencies))
+                )
+            self._entropies[index] = entropy
+
+        return entropy
+
+    def set_domain(self, index: int, domain: int):
+        """Sets the possible tiles of a space and invalidates the cached
+        entropies that depend on them. The change is recorded if the
+        trail is enabled.
+        """
+        if self.trail is not None:
+            self.trail.append((index, self.domains[index]))
+        if self.narrowed is not None:
+            self.narrowed.append(index)
+
+        self._store_domain(index, domain)
+
+    def _store_domain(self, index: int, domain: int):
+        self.domains[index] = domain
+        self._entropies[index] = None
+        self._changed_entropies.add(index)
+        for _, neighbor in self.get_neighbors(index):
+            self._entropies[neighbor] = None
+            self._changed_entropies.add(neighbor)
+
+    def get_checkpoint(self) -> int:
+        """Get a checkpoint to restore the grid to later. Enables the
+        trail if necessary.
+        """
+        if self.trail is None:
+            self.trail = []
+
+        return len(self.trail)
+
+    def restore(self, checkpoint: int):
+        """Undoes all changes recorded since a checkpoint."""
+        while len(self.trail) > checkpoint:
+            self._undo(self.trail.pop())
+
+        # Spaces are only ever narrowed, so the decisions made after the
+        # checkpoint are exactly those whose space is unassigned again.
+        while self.decisions and not self.is_assigned(
+            self.get_index(self.decisions[-1][0])
+        ):
+            self.decisions.pop()
+
+    def _undo(self, change: Tuple):
+        index, domain = change
+        self._store_domain(index, domain)
+
+    def reset_spaces(self, indices: List[int]):
+        """Resets the possible tiles of spaces to the full tileset and
+        updates them from their neighbors again.
+
+        Arguments:
+            indices: List of space indices.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        self._reset_domains(indices)
+        self.update_possible_tiles(indices)
+
+    def _reset_domains(self, indices: List[int]):
+        for index in indices:
+            self.set_domain(
+                index, self.masks.get(index, self.compiled_tileset.full_mask)
+            )
+
+        reset = {self.get_coords(index) for index in indices}
+        self.decisions = [
+            decision for decision in self.decisions if decision[0] not in reset
+        ]
+
+    def restrict_spaces(self, masks: Dict[Tuple[int], int]):
+        """Restricts the possible tiles of spaces and updates the other
+        spaces accordingly.
+
+        Arguments:
+            masks: Dictionary of coordinates to bitmasks of the allowed
+                tiles.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        changed = []
+        for coords, mask in masks.items():
+            index = self.get_index(coords)
+            self.masks[index] = self.masks.get(index, mask) & mask
+            if not (domain := self.domains[index] & mask):
+                raise WaveFunctionCollapseException(
+                    "No options remaining for this space. "
+                    "This should not happen. "
+                    "Please check the rules.",
+                    coords=coords,
+                )
+
+            if domain != self.domains[index]:
+                self.set_domain(index, domain)
+                changed.append(index)
+
+        self.update_possible_tiles(
+            list(
+                dict.fromkeys(
+                    neighbor
+                    for index in changed
+                    for _, neighbor in self.get_neighbors(index)
+                )
+            )
+        )
+
+    def get_next_space(self) -> int:
+        """Get the index of an unassigned space with the lowest entropy
+        or None if all spaces are assigned. Only the entropies of spaces
+        that changed since the last call are recalculated.
+        """
+        for index in self._changed_entropies:
+            if self.is_assigned(index):
+                self.entropy_index.remove(index)
+            else:
+                self.entropy_index.update(index, self.get_entropy(index))
+        self._changed_entropies.clear()
+
+        return self.entropy_index.peek()
+
+    @property
+    def lowest_entropy_spaces(self) -> List[int]:
+        entropies = {
+            index: self.get_entropy(index)
+            for index in range(len(self.domains))
+            if not self.is_assigned(index)
+        }
+        if not entropies:
+            return []
+
+        min_entropy = min(entropies.values())
+
+        return [
+            index
+            for index, entropy in entropies.items()
+            if entropy == min_entropy
+        ]
+
+    def update_possible_tiles_for_single_space(self, index: int) -> bool:
+        """Updates the possible tiles for a space.
+
+        Arguments:
+            index: The space's index.
+
+        Returns:
+            Boolean flag whether the possible tiles were updated.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain.
+        """
+        domain = self.domains[index]
+        for direction, neighbor in self.get_neighbors(index):
+            domain &= self.compiled_tileset.get_allowed_mask(
+                direction, self.domains[neighbor]
+            )
+
+        if not domain:
+            raise WaveFunctionCollapseException(
+                "No options remaining for this space. "
+                "This should not happen. "
+                "Please check the rules.",
+                coords=self.get_coords(index),
+            )
+
+        if domain == self.domains[index]:
+            return False
+
+        self.set_domain(index, domain)
+        return True
+
+    def update_possible_tiles(
+        self, indices_to_check: List[int], check_further: bool = True
+    ):
+        """Updates the possible tiles for a list of spaces.
+
+        Arguments:
+            indices_to_check: List of space indices to check.
+            check_further: Flag whether the neighbors of checked spaces
+                that changed should also be checked (default: True).
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        queue = deque(indices_to_check)
+        queued = set(queue)
+
+        while queue:
+            index = queue.popleft()
+            queued.discard(index)
+            updated = self.update_possible_tiles_for_single_space(index)
+
+            if updated and check_further:
+                for _, neighbor in self.get_neighbors(index):
+                    if neighbor not in queued:
+                        queue.append(neighbor)
+                        queued.add(neighbor)
+
+    def choose_tile(self, index: int) -> int:
+        """Chooses a tile for a space based on the tiles' frequencies.
+
+        Arguments:
+            index: The space's index.
+
+        Returns:
+            Index of the chosen tile.
+        """
+        tile_indices, frequencies = zip(*self.get_frequencies(index))
+        return tile_indices[choose_index(frequencies, self.rng)]
+
+    def assign_tile(self, index: int, tile_index: int = None):
+        """Assigns a tile to a space.
+
+        Arguments:
+            index: The space's index.
+            tile_index: Index of the tile to be assigned. If None, it is
+                chosen based on the tiles' frequencies (default: None).
+
+        Raises:
+            WaveFunctionCollapseException if already assigned.
+        """
+        if self.is_assigned(index):
+            raise WaveFunctionCollapseException(
+                "This space has already been assigned a tile."
+            )
+
+        if tile_index is None:
+            tile_index = self.choose_tile(index)
+
+        self.set_domain(index, 1 << tile_index)
+        self.decisions.append((self.get_coords(index), tile_index))
+
+    def ban_tile(self, index: int, tile_index: int):
+        """Removes a tile from the possible tiles of a space and updates
+        its neighbors.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        if not (domain := self.domains[index] & ~(1 << tile_index)):
+            raise WaveFunctionCollapseException(
+                "No options remaining for this space. "
+                "This should not happen. "
+                "Please check the rules.",
+                coords=self.get_coords(index),
+            )
+
+        self.set_domain(index, domain)
+        self.update_possible_tiles(
+            [neighbor for _, neighbor in self.get_neighbors(index)]
+        )
+
+    def assign_next_tile(self):
+        """Assigns a tile to the next space.
+
+        Raises:
+            WaveFunctionCollapseException if not spaces left.
+        """
+        if (index := self.get_next_space()) is None:
+            raise WaveFunctionCollapseException(
+                "All spaces have been assigned a tile."
+            )
+
+        self.assign_tile(index)
+
+        self.update_possible_tiles(
+            [neighbor for _, neighbor in self.get_neighbors(index)]
+        )
+
+    def assign_all_tiles(self):
+        """Assigns tiles to spaces until there are none left."""
+        while self.get_next_space() is not None:
+            self.assign_next_tile()
+
+    def iter_solve(self) -> Iterator[CollapseEvent]:
+        """Assigns tiles to spaces until there are none left like
+        assign_all_tiles, but yields after every assigned tile.
+
+        Yields:
+            CollapseEvent for every assigned tile.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        while self.get_next_space() is not None:
+            self.narrowed = []
+            try:
+                self.assign_next_tile()
+            finally:
+                narrowed, self.narrowed = self.narrowed, None
+
+            coords, tile_index = self.decisions[-1]
+            index = self.get_index(coords)
+            yield CollapseEvent(
+                coords,
+                tile_index,
+                [
+                    self.get_coords(i)
+                    for i in dict.fromkeys(narrowed)
+                    if i != index
+                ],
+            )
+
+    def replay(self, decisions: List[Tuple[Tuple[int], int]]):
+        """Assigns tiles from a decision log, e.g. the decisions of
+        another grid of the same tileset and size. No entropies are
+        calculated.
+
+        Arguments:
+            decisions: List of coordinates and tile indices.
+
+        Raises:
+            WaveFunctionCollapseException if a space is already assigned,
+            a tile is not possible or no tiles remain for a space.
+        """
+        for coords, tile_index in decisions:
+            index = self.get_index(coords)
+            if not self.domains[index] >> tile_index & 1:
+                raise WaveFunctionCollapseException(
+                    "This tile is not possible for this space.",
+                    coords=coords,
+                )
+
+            self.assign_tile(index, tile_index)
+            self.update_possible_tiles(
+                [neighbor for _, neighbor in self.get_neighbors(index)]
+            )
+
+
+class SpacesView(Mapping):
+    """Read-only mapping of coordinates (x, y) to the spaces of a compact
+    grid. The Space objects are created on access and reflect the state
+    of the grid at that time.
+
+    Attributes:
+        grid: The compact grid.
+    """
+
+    def __init__(self, grid: CompactGrid):
+        self.grid = grid
+
+    def __getitem__(self, coords: Tuple[int]) -> Space:
+        width, height = self.grid.size
+        if not (0 <= coords[0] < width and 0 <= coords[1] < height):
+            raise KeyError(coords)
+
+        index = self.grid.get_index(coords)
+        if tile := self.grid.get_tile(index):
+            return Space(coords, tile=tile)
+
+        space = Space(
+            coords, possible_tiles=self.grid.get_possible_tiles(index)
+        )
+        space.set_frequencies(
+            [frequency for _, frequency in self.grid.get_frequencies(index)]
+        )
+        return space
+
+    def __iter__(self):
+        for x in range(self.grid.size[0]):
+            for y in range(self.grid.size[1]):
+                yield (x, y)
+
+    def __len__(self):
+        return self.grid.size[0] * self.grid.size[1]
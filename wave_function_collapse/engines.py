@@ -0,0 +1,11 @@
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.grid import Grid
+from wave_function_collapse.support_grid import SupportGrid
+from wave_function_collapse.vectorized_grid import VectorizedGrid
+
+ENGINES = {
+    "grid": Grid,
+    "compact": CompactGrid,
+    "support": SupportGrid,
+    "vectorized": VectorizedGrid,
+}
@@ -0,0 +1,68 @@
+import heapq
+import random
+
+
+class EntropyIndex:
+    """Min-heap of space entropies with lazy invalidation.
+
+    Updating a space pushes a new entry instead of searching the heap for
+    the old one. Outdated entries are skipped when they reach the top of
+    the heap, and the heap is rebuilt once it holds more outdated than
+    current entries.
+
+    Attributes:
+        entropies: Dictionary of space indices to their current entropy.
+        random_tie_breaking: Flag whether spaces with equal entropy are
+            ordered randomly or by index (default: True).
+        rng: Random number generator for the tie breaking, e.g. an
+            instance of random.Random (default: the random module).
+    """
+
+    def __init__(
+        self, random_tie_breaking: bool = True, rng: random.Random = None
+    ):
+        self.entropies = {}
+        self.random_tie_breaking = random_tie_breaking
+        self.rng = random if rng is None else rng
+        self._heap = []
+
+    def __len__(self):
+        return len(self.entropies)
+
+    def _get_key(self, index: int) -> float:
+        if self.random_tie_breaking:
+            return self.rng.random()
+
+        return index
+
+    def update(self, index: int, entropy: float):
+        """Sets the entropy of a space."""
+        if self.entropies.get(index) == entropy:
+            return
+
+        self.entropies[index] = entropy
+        heapq.heappush(self._heap, (entropy, self._get_key(index), index))
+
+        if len(self._heap) > 2 * len(self.entropies) + 64:
+            self._heap = [
+                (entropy, self._get_key(index), index)
+                for index, entropy in self.entropies.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def remove(self, index: int):
+        """Removes a space from the index, e.g. once it is assigned."""
+        self.entropies.pop(index, None)
+
+    def peek(self) -> int:
+        """Get the index of the space with the lowest entropy without
+        removing it, or None if the index is empty.
+        """
+        while self._heap:
+            entropy, _, index = self._heap[0]
+            if self.entropies.get(index) == entropy:
+                return index
+
+            heapq.heappop(self._heap)
+
+        return None
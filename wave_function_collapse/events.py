@@ -0,0 +1,55 @@
+import asyncio
+from typing import AsyncIterator, List, Tuple
+
+
+class CollapseEvent:
+    """A tile chosen for a space by a grid's iter_solve.
+
+    Attributes:
+        coords: The space's coordinates (x, y).
+        tile_index: Index of the assigned tile in the compiled tileset.
+        narrowed: List of the coordinates of the other spaces whose
+            possible tiles were reduced by the propagation, including
+            spaces that were left with a single tile.
+    """
+
+    __slots__ = ("coords", "narrowed", "tile_index")
+
+    def __init__(
+        self,
+        coords: Tuple[int],
+        tile_index: int,
+        narrowed: List[Tuple[int]],
+    ):
+        self.coords = coords
+        self.tile_index = tile_index
+        self.narrowed = narrowed
+
+    def __repr__(self):
+        return (
+            f"CollapseEvent(coords={self.coords}, "
+            f"tile_index={self.tile_index}, "
+            f"narrowed={self.narrowed})"
+        )
+
+
+async def iter_solve_async(
+    grid, steps: int = 100
+) -> AsyncIterator[CollapseEvent]:
+    """Assigns tiles to all spaces of a grid like its iter_solve and
+    hands control back to the event loop regularly.
+
+    Arguments:
+        grid: A grid of any engine.
+        steps: Number of tiles assigned between two pauses (default: 100).
+
+    Yields:
+        CollapseEvent for every assigned tile.
+
+    Raises:
+        WaveFunctionCollapseException if no tiles remain for a space.
+    """
+    for step, event in enumerate(grid.iter_solve(), 1):
+        yield event
+        if not step % steps:
+            await asyncio.sleep(0)
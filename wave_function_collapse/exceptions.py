@@ -4,13 +4,17 @@ class WaveFunctionCollapseException(Exception):
 
     Attributes:
         message -- explanation of the issue.
+        coords -- coordinates of the space where the issue occured, if
+            known (default: None).
     """
 
     def __init__(
         self,
         message,
+        coords=None,
     ):
         self.message = message
+        self.coords = coords
         super().__init__(self.message)
 
     def __str__(self):
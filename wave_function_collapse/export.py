@@ -0,0 +1,199 @@
+import struct
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from wave_function_collapse.tile import Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+
+MAGIC = b"WFCM"
+VERSION = 1
+# Magic, version, item size, width, height and SHA-256 digest of the
+# tileset. The header is 48 bytes long, so the tile indices are aligned.
+HEADER = struct.Struct("<4sBB2xII32s")
+DTYPES = {1: np.uint8, 2: np.uint16, 4: np.uint32}
+
+
+def get_dtype(n_tiles: int) -> np.dtype:
+    """Get the smallest unsigned integer type for the tile indices of a
+    tileset. Its maximum value marks unassigned spaces.
+    """
+    for dtype in DTYPES.values():
+        if n_tiles <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    raise ValueError("Too many tiles.")
+
+
+def export_tile_indices(
+    path: str,
+    tile_indices: Sequence[int],
+    tileset: Union[List[Tile], Tileset],
+    size: Tuple[int] = None,
+):
+    """Writes tile indices to a binary file, which can be opened with
+    load_tile_map.
+
+    The file starts with a header of 48 bytes containing the size and
+    the fingerprint of the tileset, followed by the tile indices as
+    unsigned integers of 1, 2 or 4 bytes in row-major order. Unassigned
+    spaces are stored as the maximum value of the type.
+
+    Arguments:
+        path: Path of the file.
+        tile_indices: Tile indices of the spaces and -1 for unassigned
+            spaces, either a flat sequence ordered by y * width + x or an
+            array of shape (height, width).
+        tileset: List of tiles or compiled tileset the indices refer to.
+        size: Size of the map (width x height). Required for flat
+            sequences.
+    """
+    compiled_tileset = compile_tileset(tileset)
+    tile_indices = np.asarray(tile_indices)
+    if size is None:
+        height, width = tile_indices.shape
+    else:
+        width, height = size
+    if tile_indices.size != width * height:
+        raise ValueError("The tile indices do not match the size.")
+
+    dtype = get_dtype(len(compiled_tileset))
+    data = tile_indices.astype(np.int64).ravel()
+    data[data < 0] = np.iinfo(dtype).max
+
+    with open(path, "wb") as file_:
+        file_.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                dtype.itemsize,
+                width,
+                height,
+                bytes.fromhex(compiled_tileset.fingerprint),
+            )
+        )
+        file_.write(data.astype(dtype.newbyteorder("<")).tobytes())
+
+
+def export_grid(grid, path: str):
+    """Writes the tile indices of a grid of any engine to a binary file,
+    see export_tile_indices.
+    """
+    export_tile_indices(
+        path, grid.tile_indices, grid.compiled_tileset, size=grid.size
+    )
+
+
+def load_tile_map(
+    path: str, tileset: Union[List[Tile], Tileset] = None
+) -> "TileMap":
+    """Opens a file written by export_tile_indices or export_grid.
+
+    Arguments:
+        path: Path of the file.
+        tileset: List of tiles or compiled tileset the indices refer to.
+            If given, its fingerprint must match the file's.
+
+    Returns:
+        TileMap reading the tile indices from the file on access.
+
+    Raises:
+        ValueError if the file is not a tile map or does not match the
+        tileset.
+    """
+    with open(path, "rb") as file_:
+        header = file_.read(HEADER.size)
+    if len(header) < HEADER.size or not header.startswith(MAGIC):
+        raise ValueError("Not a tile map.")
+
+    _, version, itemsize, width, height, digest = HEADER.unpack_from(header)
+    if version != VERSION:
+        raise ValueError(f"Unsupported tile map version {version}.")
+
+    tile_map = TileMap(
+        np.memmap(
+            path,
+            dtype=np.dtype(DTYPES[itemsize]).newbyteorder("<"),
+            mode="r",
+            offset=HEADER.size,
+            shape=(height, width),
+        ),
+        digest.hex(),
+        tileset,
+    )
+    if tileset is not None and (
+        tile_map.compiled_tileset.fingerprint != tile_map.fingerprint
+    ):
+        raise ValueError("The tile map was created with another tileset.")
+
+    return tile_map
+
+
+class TileMap:
+    """Read-only map of tile indices, e.g. memory-mapped from a file by
+    load_tile_map. Only the parts of the file that are accessed are read.
+
+    Attributes:
+        data: Unsigned integer array of shape (height, width) with the
+            stored tile indices. Unassigned spaces are set to the
+            maximum value of the type.
+        fingerprint: Fingerprint of the tileset the indices refer to.
+        compiled_tileset: Tileset to look up tiles in or None.
+        size: Size of the map (width x height).
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        fingerprint: str,
+        tileset: Union[List[Tile], Tileset] = None,
+    ):
+        self.data = data
+        self.fingerprint = fingerprint
+        self.compiled_tileset = (
+            None if tileset is None else compile_tileset(tileset)
+        )
+        self.size = (data.shape[1], data.shape[0])
+        self._unassigned = np.iinfo(data.dtype).max
+
+    def get_tile_index(self, coords: Tuple[int]) -> int:
+        """Get the index of the tile at coordinates (x, y) or -1 if the
+        space is unassigned.
+        """
+        tile_index = int(self.data[coords[1], coords[0]])
+        return -1 if tile_index == self._unassigned else tile_index
+
+    def get_tile(self, coords: Tuple[int]) -> Tile:
+        """Get the tile at coordinates (x, y) or None if the space is
+        unassigned. Requires a tileset.
+        """
+        if (tile_index := self.get_tile_index(coords)) < 0:
+            return None
+
+        return self.compiled_tileset.tiles[tile_index]
+
+    def get_window(self, coords: Tuple[int], size: Tuple[int]) -> np.ndarray:
+        """Get the tile indices of a rectangular part of the map.
+
+        Arguments:
+            coords: Coordinates (x, y) of the upper left space.
+            size: Size of the window (width x height). It is clipped at
+                the borders of the map.
+
+        Returns:
+            Integer array of shape (height, width) with -1 for unassigned
+            spaces.
+
+        Raises:
+            IndexError if the window starts outside of the map.
+        """
+        x, y = coords
+        if x < 0 or y < 0:
+            raise IndexError("The window starts outside of the map.")
+
+        window = np.array(
+            self.data[slice(y, y + size[1]), slice(x, x + size[0])],
+            dtype=np.int32,
+        )
+        window[window == self._unassigned] = -1
+        return window
@@ -1,10 +1,23 @@
 import random
+from array import array
+from collections import deque
 from copy import copy
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple, Union
 
+from wave_function_collapse.events import CollapseEvent
 from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.instrumentation import (
+    FREQUENCY,
+    PROPAGATION,
+    SAMPLING,
+    SELECTION,
+    Instrumentation,
+)
+from wave_function_collapse.renderer import Renderer
 from wave_function_collapse.space import Space
-from wave_function_collapse.tile import Tile
+from wave_function_collapse.tile import RuleDirection, Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+from wave_function_collapse.wave_cache import WaveCache
 
 
 class Grid:
@@ -13,53 +26,249 @@ class Grid:
     Attributes:
         tileset: List of tiles to be used, will be resorted by name.
             Tile names must be unique.
+        compiled_tileset: Tileset with the precompiled adjacency
+            frequencies of the tiles.
         size: Size of the grid (width x height, default: 20x20).
+        periodic: Whether the grid wraps around its edges, so that the
+            spaces along opposite edges are neighbors (default: False).
+        borders: Whether the tiles along the edges are restricted by the
+            tiles' border rules. Always False for periodic grids
+            (default: True).
+        rng: Random number generator, e.g. an instance of random.Random
+            (default: the random module).
+        decisions: List of the coordinates and tile indices of the tiles
+            assigned by assign_next_tile or replay in order.
+        wave_cache: WaveCache the initial state of the spaces is copied
+            from. If None, the rules are propagated over the whole grid
+            (default: None).
+        narrowed: List of the coordinates of the spaces whose possible
+            tiles were updated, recorded while it is not None
+            (default: None).
+        instrumentation: Instrumentation collecting statistics of the
+            selection, propagation, frequency evaluation and sampling
+            while it is not None (default: None).
     """
 
-    def __init__(self, tileset: List[Tile], size: Tuple[int] = (20, 20)):
-        self.tileset = sorted(tileset, key=lambda t: t.name)
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        size: Tuple[int] = (20, 20),
+        rng: random.Random = None,
+        wave_cache: WaveCache = None,
+        instrumentation: Instrumentation = None,
+        periodic: bool = False,
+        borders: bool = True,
+    ):
+        self.compiled_tileset = compile_tileset(tileset)
+        self.tileset = self.compiled_tileset.tiles
         self.size = size
+        self.periodic = periodic
+        self.borders = borders and not periodic
+        self.rng = random if rng is None else rng
+        self.decisions = []
+        self.wave_cache = wave_cache
+        self.narrowed = None
+        self.instrumentation = instrumentation
         self.spaces = {
             (x, y): Space((x, y), possible_tiles=copy(self.tileset))
             for x in range(self.size[0])
             for y in range(self.size[1])
         }
 
-        self.update_possible_tiles(list(self.spaces.keys()))
+        if wave_cache is None or (state := wave_cache.get(self)) is None:
+            if self.borders:
+                self.apply_border_rules()
+            # Cached states are propagated without shuffling, so that
+            # grids with the same random number generator do not depend
+            # on whether the state was cached already.
+            self.update_possible_tiles(
+                list(self.spaces.keys()), shuffle_list=wave_cache is None
+            )
+            if wave_cache is not None:
+                wave_cache.put(self, self.get_state())
+        else:
+            self.set_state(state)
 
     def __str__(self):
-        lines = []
-        for y in range(self.size[1]):
-            line = ""
-            for x in range(self.size[0]):
-                if tile := self.spaces[(x, y)].tile:
-                    line += str(tile)
-                else:
-                    line += " "
-            lines.append(line)
-
-        return "\n".join(lines)
+        return Renderer(self.compiled_tileset).render(
+            self.tile_indices, self.size[0]
+        )
 
     @property
-    def lowest_entropy_spaces(self):
-        non_zero_entropy_spaces = [
-            space.entropy
-            for space in self.spaces.values()
-            if space.entropy > 0
+    def tile_indices(self) -> array:
+        """Array of the indices of the assigned tiles and -1 for
+        unassigned spaces, indexed by y * width + x.
+        """
+        width, height = self.size
+        tiles = [
+            self.spaces[(x, y)].tile
+            for y in range(height)
+            for x in range(width)
         ]
-        if not non_zero_entropy_spaces:
-            return []
+        return array(
+            "i",
+            (
+                self.compiled_tileset.index[tile.name] if tile else -1
+                for tile in tiles
+            ),
+        )
 
-        min_entropy = min(non_zero_entropy_spaces)
+    def get_state(self) -> dict:
+        """Get the tile indices of the assigned tiles, possible tiles and
+        frequencies of all spaces, e.g. to be cached by a WaveCache.
+        """
+        tile_index = self.compiled_tileset.index
+        state = {"tiles": [], "possible_tiles": [], "frequencies": []}
+        for space in self.spaces.values():
+            if space.tile:
+                state["tiles"].append(tile_index[space.tile.name])
+                state["possible_tiles"].append(None)
+                state["frequencies"].append(None)
+            else:
+                state["tiles"].append(-1)
+                state["possible_tiles"].append(
+                    [tile_index[tile.name] for tile in space.possible_tiles]
+                )
+                state["frequencies"].append(list(space.frequencies))
 
-        return sorted(
-            [
-                coords
-                for coords, space in self.spaces.items()
-                if space.entropy == min_entropy
-            ]
+        return state
+
+    def set_state(self, state: dict):
+        """Replaces all spaces with spaces created from a state returned
+        by get_state. Nothing is propagated.
+        """
+        for coords, tile_index, possible_tiles, frequencies in zip(
+            self.spaces,
+            state["tiles"],
+            state["possible_tiles"],
+            state["frequencies"],
+        ):
+            if tile_index >= 0:
+                space = Space(coords, tile=self.tileset[tile_index])
+            else:
+                space = Space(
+                    coords,
+                    possible_tiles=[self.tileset[i] for i in possible_tiles],
+                )
+                space.set_frequencies(list(frequencies))
+            self.spaces[coords] = space
+
+    def apply_border_rules(self):
+        """Removes the tiles not allowed by the border rules from the
+        spaces along the edges. Nothing is propagated.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        for coords, mask in self.compiled_tileset.get_border_masks(
+            self.size
+        ).items():
+            space = self.spaces[coords]
+            space.set_possible_tiles(
+                [
+                    tile
+                    for tile in space.possible_tiles
+                    if mask >> self.compiled_tileset.index[tile.name] & 1
+                ]
+            )
+            space.set_frequencies([1] * len(space.possible_tiles))
+
+    def restrict_spaces(self, masks: Dict[Tuple[int], int]):
+        """Restricts the possible tiles of spaces and updates the other
+        spaces accordingly.
+
+        Arguments:
+            masks: Dictionary of coordinates to bitmasks of the allowed
+                tiles.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        tile_index = self.compiled_tileset.index
+        changed = []
+        for coords, mask in masks.items():
+            space = self.spaces[coords]
+            if space.tile:
+                if not mask >> tile_index[space.tile.name] & 1:
+                    raise WaveFunctionCollapseException(
+                        "No options remaining for this space. "
+                        "This should not happen. "
+                        "Please check the rules.",
+                        coords=coords,
+                    )
+                continue
+
+            n_tiles = len(space.possible_tiles)
+            space.set_frequencies(
+                [
+                    frequency if mask >> tile_index[tile.name] & 1 else 0
+                    for frequency, tile in zip(
+                        space.frequencies, space.possible_tiles
+                    )
+                ]
+            )
+            if len(space.possible_tiles) != n_tiles:
+                changed.append(coords)
+
+        # The restricted spaces are checked again as well, so that they
+        # are assigned if a single tile remains.
+        self.update_possible_tiles(
+            list(
+                dict.fromkeys(
+                    changed
+                    + [
+                        neighbor
+                        for coords in changed
+                        for neighbor in self.get_unassigned_neighbors(coords)
+                    ]
+                )
+            )
         )
 
+    def get_neighbors(
+        self, coords: Tuple[int]
+    ) -> Dict[RuleDirection, Tuple[int]]:
+        """Get the coordinates of the neighbors of a space by direction.
+        Neighbors of periodic grids wrap around the edges, otherwise they
+        may lie outside of the grid.
+        """
+        neighbors = self.spaces[coords].neighbors
+        if self.periodic:
+            width, height = self.size
+            return {
+                direction: (x % width, y % height)
+                for direction, (x, y) in neighbors.items()
+            }
+
+        return neighbors
+
+    @property
+    def lowest_entropy_spaces(self):
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                SELECTION, self._find_lowest_entropy_spaces
+            )
+
+        return self._find_lowest_entropy_spaces()
+
+    def _find_lowest_entropy_spaces(self) -> List[Tuple[int]]:
+        # Spaces are public and may be changed directly, so unlike the
+        # other engines the reference grid keeps no entropy index and
+        # scans all spaces, once, on every call.
+        min_entropy = float("inf")
+        lowest_entropy_spaces = []
+        for coords, space in self.spaces.items():
+            entropy = space.entropy
+            if entropy <= 0 or entropy > min_entropy:
+                continue
+
+            if entropy < min_entropy:
+                min_entropy = entropy
+                lowest_entropy_spaces = []
+            lowest_entropy_spaces.append(coords)
+
+        return sorted(lowest_entropy_spaces)
+
     def get_tile_frequency(self, coords: Tuple[int], tile: Tile) -> float:
         """Determines the frequency of a tile occuring at the given
         coordinates.
@@ -71,10 +280,12 @@ class Grid:
         Returns:
             Float frequency of the tile.
         """
-        space = self.spaces[coords]
+        tile_index = self.compiled_tileset.index
+        frequencies = self.compiled_tileset.frequencies
+        row = tile_index[tile.name]
 
         frequency = 0
-        for direction, neighbor_coords in space.neighbors.items():
+        for direction, neighbor_coords in self.get_neighbors(coords).items():
             if neighbor_coords not in self.spaces:
                 continue
 
@@ -84,9 +295,9 @@ class Grid:
             else:
                 tiles_to_check = neighbor.possible_tiles
 
+            table = frequencies[direction][row]
             frequency_from_neighbor = sum(
-                tile.get_adjacency_frequency(t_, direction)
-                for t_ in tiles_to_check
+                table[tile_index[t_.name]] for t_ in tiles_to_check
             )
             if frequency_from_neighbor:
                 frequency += frequency_from_neighbor
@@ -112,19 +323,33 @@ class Grid:
             WaveFunctionCollapseException if a tile is already assigned.
         """
         space = self.spaces[coords]
-        original_possible_tiles = copy(space.possible_tiles)
+        # Tiles are only ever removed, so comparing the number of possible
+        # tiles is enough to detect changes.
+        original_n_tiles = len(space.possible_tiles)
 
-        space.set_frequencies(
-            [
+        if self.instrumentation is None:
+            frequencies = [
                 self.get_tile_frequency(coords, tile)
                 for tile in space.possible_tiles
             ]
-        )
+        else:
+            frequencies = self.instrumentation.measure(
+                FREQUENCY,
+                lambda: [
+                    self.get_tile_frequency(coords, tile)
+                    for tile in space.possible_tiles
+                ],
+                calls=original_n_tiles,
+            )
+        space.set_frequencies(frequencies)
 
         if len(space.possible_tiles) == 1:
-            space.assign_tile()
+            self._assign_space_tile(space)
 
-        return space.possible_tiles != original_possible_tiles
+        return (
+            space.possible_tiles is None
+            or len(space.possible_tiles) != original_n_tiles
+        )
 
     def update_possible_tiles(
         self,
@@ -139,31 +364,73 @@ class Grid:
             check_further: Flag whether the neighbors of checked spaces
                 that changed should also be checked (default: True).
             shuffle_list: Flag whether to shuffle the list of
-                coordinates (default: True).
+                coordinates and the order in which neighbors are added
+                (default: True).
 
         Raises:
             WaveFunctionCollapseException if a tile is already assigned.
         """
-        coords_checked = []
-        if shuffle_list:
-            random.shuffle(coords_to_check)
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                PROPAGATION,
+                self._update_possible_tiles,
+                coords_to_check,
+                check_further,
+                shuffle_list,
+            )
 
-        while coords_to_check:
-            coords = coords_to_check.pop(0)
-            updated = self.update_possible_tiles_for_single_space(coords)
+        self._update_possible_tiles(
+            coords_to_check, check_further, shuffle_list
+        )
+
+    def _update_possible_tiles(
+        self,
+        coords_to_check: List[Tuple[int]],
+        check_further: bool,
+        shuffle_list: bool,
+    ):
+        if shuffle_list:
+            self.rng.shuffle(coords_to_check)
+        queue = deque(coords_to_check)
+        queued = set(queue)
+        instrumentation = self.instrumentation
+
+        while queue:
+            coords = queue.popleft()
+            queued.discard(coords)
+            if not self.spaces[coords].possible_tiles:
+                # The space was assigned while it was queued.
+                continue
+            if instrumentation is None:
+                updated = self.update_possible_tiles_for_single_space(coords)
+            else:
+                space = self.spaces[coords]
+                n_tiles = len(space.possible_tiles)
+                updated = self.update_possible_tiles_for_single_space(coords)
+                instrumentation.record_step(
+                    coords,
+                    n_tiles - len(space.possible_tiles or (space.tile,)),
+                    len(queue),
+                )
+            if updated and self.narrowed is not None:
+                self.narrowed.append(coords)
 
             if updated and check_further:
-                new_coords_to_check = [
-                    c_
-                    for c_ in self.spaces[coords].neighbors.values()
-                    if c_ in self.spaces
-                    and c_ not in coords_to_check
-                    and c_ not in coords_checked
-                    and self.spaces[c_].possible_tiles
-                ]
+                neighbors = list(self.get_neighbors(coords).values())
                 if shuffle_list:
-                    random.shuffle(new_coords_to_check)
-                coords_to_check.extend(new_coords_to_check)
+                    # Rotating the four neighbors by a random offset is
+                    # much cheaper than shuffling them.
+                    offset = self.rng.getrandbits(2)
+                    neighbors = neighbors[offset:] + neighbors[:offset]
+
+                for c_ in neighbors:
+                    if (
+                        c_ in self.spaces
+                        and c_ not in queued
+                        and self.spaces[c_].possible_tiles
+                    ):
+                        queue.append(c_)
+                        queued.add(c_)
 
     def assign_next_tile(self):
         """Assgins a tile to the next space.
@@ -176,17 +443,107 @@ class Grid:
                 "All spaces have been assigned a tile."
             )
 
-        coords = low_entropy_spaces[random.randrange(len(low_entropy_spaces))]
-        self.spaces[coords].assign_tile()
+        self._assign_lowest_entropy_space(low_entropy_spaces)
 
-        coords_to_check = [
+    def _assign_lowest_entropy_space(
+        self, low_entropy_spaces: List[Tuple[int]]
+    ):
+        # Takes the result of lowest_entropy_spaces, so that loops do not
+        # scan the spaces twice per tile.
+        coords = low_entropy_spaces[
+            self.rng.randrange(len(low_entropy_spaces))
+        ]
+        space = self.spaces[coords]
+        self._assign_space_tile(space)
+        tile_index = self.compiled_tileset.index[space.tile.name]
+        self.decisions.append((coords, tile_index))
+
+        if (instrumentation := self.instrumentation) is None:
+            self.update_possible_tiles(self.get_unassigned_neighbors(coords))
+            return
+
+        statistics = instrumentation.statistics
+        revisits = statistics.revisits
+        eliminated_tiles = statistics.eliminated_tiles
+        self.update_possible_tiles(self.get_unassigned_neighbors(coords))
+        instrumentation.record_collapse(
+            coords,
+            tile_index,
+            statistics.revisits - revisits,
+            statistics.eliminated_tiles - eliminated_tiles,
+        )
+
+    def _assign_space_tile(self, space: Space):
+        if self.instrumentation is None:
+            space.assign_tile(self.rng)
+        else:
+            self.instrumentation.measure(SAMPLING, space.assign_tile, self.rng)
+
+    def get_unassigned_neighbors(self, coords: Tuple[int]) -> List[Tuple[int]]:
+        """Get the coordinates of the unassigned neighbors of a space."""
+        return [
             coord
-            for coord in self.spaces[coords].neighbors.values()
+            for coord in self.get_neighbors(coords).values()
             if coord in self.spaces and self.spaces[coord].possible_tiles
         ]
-        self.update_possible_tiles(coords_to_check)
+
+    def replay(self, decisions: List[Tuple[Tuple[int], int]]):
+        """Assigns tiles from a decision log, e.g. the decisions of
+        another grid of the same tileset and size. No entropies are
+        calculated.
+
+        Arguments:
+            decisions: List of coordinates and tile indices.
+
+        Raises:
+            WaveFunctionCollapseException if a space is already assigned,
+            a tile is not possible or no tiles remain for a space.
+        """
+        for coords, tile_index in decisions:
+            space = self.spaces[coords]
+            if not space.possible_tiles:
+                raise WaveFunctionCollapseException(
+                    "This space has already been assigned a tile."
+                )
+
+            tile = self.tileset[tile_index]
+            if tile not in space.possible_tiles:
+                raise WaveFunctionCollapseException(
+                    "This tile is not possible for this space.",
+                    coords=coords,
+                )
+
+            space.set_tile(tile)
+            self.decisions.append((coords, tile_index))
+            self.update_possible_tiles(
+                self.get_unassigned_neighbors(coords), shuffle_list=False
+            )
 
     def assign_all_tiles(self):
         """Assigns tiles to spaces until there are none left."""
-        while self.lowest_entropy_spaces:
-            self.assign_next_tile()
+        while low_entropy_spaces := self.lowest_entropy_spaces:
+            self._assign_lowest_entropy_space(low_entropy_spaces)
+
+    def iter_solve(self) -> Iterator[CollapseEvent]:
+        """Assigns tiles to spaces until there are none left like
+        assign_all_tiles, but yields after every assigned tile.
+
+        Yields:
+            CollapseEvent for every assigned tile.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        while low_entropy_spaces := self.lowest_entropy_spaces:
+            self.narrowed = []
+            try:
+                self._assign_lowest_entropy_space(low_entropy_spaces)
+            finally:
+                narrowed, self.narrowed = self.narrowed, None
+
+            coords, tile_index = self.decisions[-1]
+            yield CollapseEvent(
+                coords,
+                tile_index,
+                [c_ for c_ in dict.fromkeys(narrowed) if c_ != coords],
+            )
@@ -0,0 +1,166 @@
+from typing import Dict, List, Tuple, Type, Union
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.solver import Solver
+from wave_function_collapse.tile import Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+
+
+def get_masks(
+    region: np.ndarray, origin: Tuple[int] = (0, 0), n_tiles: int = None
+) -> Dict[Tuple[int], int]:
+    """Converts a region of tile indices or allowed tiles to the bitmasks
+    taken by restrict_spaces.
+
+    Arguments:
+        region: Either an integer array of shape (height, width) with the
+            index of the tile to be pinned and -1 for unrestricted
+            spaces, or a boolean array of shape (height, width, n_tiles),
+            which is True where a tile is allowed.
+        origin: Coordinates (x, y) of the region's upper left space in
+            the grid (default: (0, 0)).
+        n_tiles: Number of tiles of the tileset. If given, indices of
+            n_tiles or more are unrestricted too, so that the data of a
+            TileMap, which stores unassigned spaces as the maximum value
+            of its type, can be passed as is (default: None).
+
+    Returns:
+        Dictionary of coordinates to bitmasks for the restricted spaces.
+    """
+    region = np.asarray(region)
+    x_offset, y_offset = origin
+    if region.ndim == 2:
+        pinned = region >= 0
+        if n_tiles is not None:
+            pinned &= region < n_tiles
+        ys, xs = np.nonzero(pinned)
+        return {
+            (x + x_offset, y + y_offset): 1 << tile_index
+            for x, y, tile_index in zip(
+                xs.tolist(), ys.tolist(), region[ys, xs].tolist()
+            )
+        }
+
+    ys, xs = np.nonzero(~region.all(axis=2))
+    bits = np.packbits(region[ys, xs], axis=1, bitorder="little")
+    return {
+        (x + x_offset, y + y_offset): int.from_bytes(row.tobytes(), "little")
+        for x, y, row in zip(xs.tolist(), ys.tolist(), bits)
+    }
+
+
+def pin_tiles(grid, region: np.ndarray, origin: Tuple[int] = (0, 0)):
+    """Pins tiles or restricts the possible tiles over a region of a grid
+    and propagates the changes once for all spaces.
+
+    Arguments:
+        grid: A grid of any engine.
+        region: Integer array of tile indices, e.g. the data of a
+            TileMap, or boolean array of the allowed tiles, see
+            get_masks.
+        origin: Coordinates (x, y) of the region's upper left space in
+            the grid (default: (0, 0)).
+
+    Raises:
+        WaveFunctionCollapseException if no tiles remain for a space.
+    """
+    grid.restrict_spaces(get_masks(region, origin, len(grid.compiled_tileset)))
+
+
+def resolve_window(
+    tileset: Union[List[Tile], Tileset],
+    tile_indices: np.ndarray,
+    coords: Tuple[int],
+    size: Tuple[int],
+    masks: Dict[Tuple[int], int] = None,
+    borders: bool = True,
+    engine: Type = CompactGrid,
+    **solver_options,
+) -> np.ndarray:
+    """Solves a rectangular window of a map again, leaving the rest of
+    the map unchanged.
+
+    Only the window and a frame of one space around it are solved. The
+    frame is pinned to the map's tiles, so that the new window fits in.
+
+    Arguments:
+        tileset: List of tiles or compiled tileset the map was created
+            with.
+        tile_indices: Integer array of shape (height, width) with the
+            tile indices of the map and -1 for unassigned spaces. The
+            data of a TileMap can be passed as is, as indices beyond the
+            tileset are treated as unassigned. Only the window and its
+            frame are read.
+        coords: Coordinates (x, y) of the window's upper left space.
+        size: Size of the window (width x height). It is clipped at the
+            edges of the map.
+        masks: Dictionary of coordinates in the map to bitmasks of the
+            tiles allowed within the window. The coordinates must lie
+            within the clipped window (default: None).
+        borders: Whether the tiles along the edges of the map are
+            restricted by the tiles' border rules (default: True).
+        engine: Grid class to be used (default: CompactGrid).
+        solver_options: Further keyword arguments passed to Solver, e.g.
+            seed or strategy.
+
+    Returns:
+        Integer array with the new tile indices of the window.
+
+    Raises:
+        IndexError if the window lies outside of the map.
+        ValueError if masks has coordinates outside of the window.
+        WaveFunctionCollapseException if no solution was found.
+    """
+    compiled_tileset = compile_tileset(tileset)
+    map_height, map_width = tile_indices.shape
+    x, y = coords
+    x_max, y_max = min(x + size[0], map_width), min(y + size[1], map_height)
+    if x < 0 or y < 0 or x >= x_max or y >= y_max:
+        raise IndexError("The window lies outside of the map.")
+    for map_x, map_y in masks or {}:
+        if not (x <= map_x < x_max and y <= map_y < y_max):
+            raise ValueError(
+                f"The mask for {(map_x, map_y)} lies outside of the window."
+            )
+
+    frame_x, frame_y = max(x - 1, 0), max(y - 1, 0)
+    frame = np.array(
+        tile_indices[
+            slice(frame_y, min(y_max + 1, map_height)),
+            slice(frame_x, min(x_max + 1, map_width)),
+        ],
+        dtype=np.int64,
+    )
+    window = (
+        slice(y - frame_y, y_max - frame_y),
+        slice(x - frame_x, x_max - frame_x),
+    )
+    frame[window] = -1
+
+    grid_masks = get_masks(frame, n_tiles=len(compiled_tileset))
+    restrictions = dict(masks or {})
+    if borders:
+        for map_coords, mask in compiled_tileset.get_border_masks(
+            (map_width, map_height)
+        ).items():
+            if x <= map_coords[0] < x_max and y <= map_coords[1] < y_max:
+                restrictions[map_coords] = (
+                    restrictions.get(map_coords, mask) & mask
+                )
+    for (map_x, map_y), mask in restrictions.items():
+        grid_coords = (map_x - frame_x, map_y - frame_y)
+        grid_masks[grid_coords] = grid_masks.get(grid_coords, mask) & mask
+
+    solver = Solver(
+        compiled_tileset,
+        size=(frame.shape[1], frame.shape[0]),
+        engine=engine,
+        masks=grid_masks,
+        borders=False,
+        **solver_options,
+    )
+    grid = solver.solve()
+
+    return np.asarray(grid.tile_indices).reshape(frame.shape)[window]
@@ -0,0 +1,138 @@
+from time import perf_counter
+from typing import Callable, Tuple
+
+SELECTION = "selection"
+PROPAGATION = "propagation"
+FREQUENCY = "frequency"
+SAMPLING = "sampling"
+PHASES = (SELECTION, PROPAGATION, FREQUENCY, SAMPLING)
+
+
+class GridStatistics:
+    """Counters collected by an instrumented grid.
+
+    Attributes:
+        calls: Dictionary of the phases to the number of calls. The
+            phases are selection (lowest_entropy_spaces), propagation
+            (update_possible_tiles), frequency (get_tile_frequency) and
+            sampling (Space.assign_tile).
+        seconds: Dictionary of the phases to the time spent in them.
+        collapses: Number of tiles assigned by assign_next_tile.
+        revisits: Number of times the possible tiles of a space were
+            updated during propagation.
+        eliminated_tiles: Number of tiles removed from spaces during
+            propagation.
+        max_queue_length: Maximum number of spaces waiting to be
+            updated during propagation.
+        queue_lengths: Sum of the number of spaces waiting whenever a
+            space was updated.
+    """
+
+    __slots__ = (
+        "calls",
+        "collapses",
+        "eliminated_tiles",
+        "max_queue_length",
+        "queue_lengths",
+        "revisits",
+        "seconds",
+    )
+
+    def __init__(self):
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.collapses = 0
+        self.revisits = 0
+        self.eliminated_tiles = 0
+        self.max_queue_length = 0
+        self.queue_lengths = 0
+
+    def __repr__(self):
+        calls = ", ".join(
+            f"{phase}={self.calls[phase]} ({self.seconds[phase]:.3f} s)"
+            for phase in PHASES
+        )
+        return (
+            f"GridStatistics({calls}, collapses={self.collapses}, "
+            f"revisits={self.revisits}, "
+            f"eliminated_tiles={self.eliminated_tiles}, "
+            f"max_queue_length={self.max_queue_length})"
+        )
+
+    @property
+    def revisits_per_collapse(self) -> float:
+        return self.revisits / self.collapses if self.collapses else 0
+
+    @property
+    def eliminated_tiles_per_step(self) -> float:
+        return self.eliminated_tiles / self.revisits if self.revisits else 0
+
+    @property
+    def mean_queue_length(self) -> float:
+        return self.queue_lengths / self.revisits if self.revisits else 0
+
+
+class Instrumentation:
+    """Collects statistics of a grid and passes its events to hooks.
+
+    Attributes:
+        statistics: GridStatistics of all grids this instrumentation was
+            attached to.
+        collapse_hooks: List of callables called after every collapse
+            and its propagation with the coordinates of the space, the
+            tile index and the number of revisited spaces and eliminated
+            tiles.
+        step_hooks: List of callables called after every update of a
+            space during propagation with the coordinates of the space,
+            the number of eliminated tiles and the number of spaces
+            waiting to be updated.
+    """
+
+    def __init__(self):
+        self.statistics = GridStatistics()
+        self.collapse_hooks = []
+        self.step_hooks = []
+
+    def measure(self, phase: str, function: Callable, *args, calls: int = 1):
+        """Calls a function and adds the time spent to a phase.
+
+        Arguments:
+            phase: One of PHASES.
+            function: The function to be called with args.
+            calls: Number of calls to be counted (default: 1).
+
+        Returns:
+            The function's return value.
+        """
+        start = perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.statistics.seconds[phase] += perf_counter() - start
+            self.statistics.calls[phase] += calls
+
+    def record_step(
+        self, coords: Tuple[int], eliminated_tiles: int, queue_length: int
+    ):
+        """Records the update of a space during propagation."""
+        statistics = self.statistics
+        statistics.revisits += 1
+        statistics.eliminated_tiles += eliminated_tiles
+        statistics.queue_lengths += queue_length
+        if queue_length > statistics.max_queue_length:
+            statistics.max_queue_length = queue_length
+
+        for hook in self.step_hooks:
+            hook(coords, eliminated_tiles, queue_length)
+
+    def record_collapse(
+        self,
+        coords: Tuple[int],
+        tile_index: int,
+        revisits: int,
+        eliminated_tiles: int,
+    ):
+        """Records a collapse and the propagation that followed it."""
+        self.statistics.collapses += 1
+        for hook in self.collapse_hooks:
+            hook(coords, tile_index, revisits, eliminated_tiles)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from wave_function_collapse.tile import RuleDirection, Tile
+from wave_function_collapse.tileset import Tileset
+
+# Parts of two NxN patterns that have to be equal if the second pattern
+# is placed next to the first one in a direction, as (first, second).
+OVERLAPS = {
+    RuleDirection.NORTH: (
+        (slice(None, -1), slice(None)),
+        (slice(1, None), slice(None)),
+    ),
+    RuleDirection.EAST: (
+        (slice(None), slice(1, None)),
+        (slice(None), slice(None, -1)),
+    ),
+    RuleDirection.SOUTH: (
+        (slice(1, None), slice(None)),
+        (slice(None, -1), slice(None)),
+    ),
+    RuleDirection.WEST: (
+        (slice(None), slice(None, -1)),
+        (slice(None), slice(1, None)),
+    ),
+}
+
+
+class Pattern:
+    """Class representing an NxN pattern found in a sample.
+
+    Attributes:
+        values: NxN array of the sample values, indexed by (y, x).
+        weight: Number of occurrences of the pattern in the sample.
+    """
+
+    __slots__ = ("values", "weight")
+
+    def __init__(self, values: np.ndarray, weight: int = 1):
+        self.values = np.asarray(values)
+        self.weight = weight
+
+    def __repr__(self):
+        return f"Pattern({self.values.tolist()}, weight={self.weight})"
+
+    def overlaps(self, pattern: Pattern, direction: RuleDirection) -> bool:
+        """Checks if a pattern may be placed next to this pattern.
+
+        Arguments:
+            pattern: The other pattern.
+            direction: The direction, in which the other pattern is
+                placed.
+
+        Returns:
+            True if the patterns agree where they overlap.
+        """
+        first, second = OVERLAPS[direction]
+        return np.array_equal(self.values[first], pattern.values[second])
+
+
+def _get_keys(array: np.ndarray) -> np.ndarray:
+    """Views every row of a two-dimensional array as a single value, so
+    that rows can be compared and deduplicated like scalars.
+    """
+    array = np.ascontiguousarray(array)
+    return array.view(
+        np.dtype((np.void, array.dtype.itemsize * array.shape[1]))
+    ).ravel()
+
+
+def find_patterns(
+    sample: np.ndarray, n: int = 3, periodic: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Finds all distinct NxN patterns in a sample.
+
+    Arguments:
+        sample: Two-dimensional array of integer values, e.g. pixel or
+            symbol indices, indexed by (y, x).
+        n: Width and height of the patterns (default: 3).
+        periodic: Whether patterns wrap around the edges of the sample
+            (default: False).
+
+    Returns:
+        Tuple of an array of the patterns with the shape (P, n, n) and
+        an array of their number of occurrences. Patterns are ordered by
+        their first occurrence in the sample.
+
+    Raises:
+        ValueError if the sample is smaller than the patterns.
+    """
+    sample = np.asarray(sample)
+    if sample.ndim != 2:
+        raise ValueError("The sample must be two-dimensional.")
+    if periodic:
+        sample = np.pad(sample, ((0, n - 1), (0, n - 1)), mode="wrap")
+    if sample.shape[0] < n or sample.shape[1] < n:
+        raise ValueError("The sample must not be smaller than the patterns.")
+
+    windows = np.lib.stride_tricks.sliding_window_view(sample, (n, n))
+    windows = windows.reshape(-1, n * n)
+    _, first, counts = np.unique(
+        _get_keys(windows), return_index=True, return_counts=True
+    )
+    order = np.argsort(first)
+
+    return windows[first[order]].reshape(-1, n, n), counts[order]
+
+
+def get_compatibility(patterns: np.ndarray) -> dict:
+    """Computes which patterns may be placed next to each other.
+
+    Arguments:
+        patterns: Array of patterns with the shape (P, n, n).
+
+    Returns:
+        Dictionary of directions to PxP boolean arrays, which are True
+        where the second pattern may be placed in the direction from the
+        first one.
+    """
+    n_patterns = len(patterns)
+    compatibility = {}
+    for direction, (first, second) in OVERLAPS.items():
+        # Overlapping parts are equal if they are mapped to the same id.
+        parts = np.concatenate(
+            [
+                patterns[(slice(None),) + first].reshape(n_patterns, -1),
+                patterns[(slice(None),) + second].reshape(n_patterns, -1),
+            ]
+        )
+        _, ids = np.unique(_get_keys(parts), return_inverse=True)
+        ids = ids.ravel()
+        compatibility[direction] = (
+            ids[:n_patterns, None] == ids[None, n_patterns:]
+        )
+
+    return compatibility
+
+
+class PatternModel:
+    """Overlapping model built from the NxN patterns of a sample. Every
+    pattern becomes a tile, whose frequencies next to the patterns it
+    overlaps with are its number of occurrences.
+
+    Attributes:
+        symbols: Sorted list of the distinct characters if the sample is
+            a list of strings, otherwise None.
+        n: Width and height of the patterns.
+        patterns: List of Pattern objects, ordered like the tiles of the
+            tileset.
+        compatibility: Dictionary of directions to PxP boolean arrays,
+            see get_compatibility.
+        tiles: List of tiles named Pattern0000, Pattern0001 and so on.
+        tileset: The compiled tileset to be passed to a grid.
+    """
+
+    def __init__(
+        self,
+        sample: Union[Sequence[str], np.ndarray],
+        n: int = 3,
+        periodic: bool = False,
+    ):
+        """
+        Arguments:
+            sample: List of equally long strings or two-dimensional array
+                of integer values, indexed by (y, x).
+            n: Width and height of the patterns (default: 3).
+            periodic: Whether patterns wrap around the edges of the
+                sample (default: False).
+        """
+        if isinstance(sample, (list, tuple)) and all(
+            isinstance(row, str) for row in sample
+        ):
+            if len({len(row) for row in sample}) > 1:
+                raise ValueError("All rows must be equally long.")
+
+            self.symbols = sorted(set("".join(sample)))
+            index = {symbol: i for i, symbol in enumerate(self.symbols)}
+            sample = np.array(
+                [[index[symbol] for symbol in row] for row in sample],
+                dtype=np.int32,
+            )
+        else:
+            self.symbols = None
+
+        self.n = n
+        values, counts = find_patterns(sample, n, periodic)
+        self.patterns = [
+            Pattern(pattern_values, int(count))
+            for pattern_values, count in zip(values, counts)
+        ]
+        self.compatibility = get_compatibility(values)
+
+        weights = counts.astype(float)
+        frequencies = {
+            direction: np.where(compatible, weights[:, None], 0.0).tolist()
+            for direction, compatible in self.compatibility.items()
+        }
+        # Zero padded names keep the tiles ordered like the patterns.
+        digits = max(len(str(len(self.patterns) - 1)), 4)
+        self.tiles = [
+            Tile(
+                f"Pattern{i:0{digits}d}",
+                rules={},
+                symbol=self.symbols[pattern.values[0, 0]]
+                if self.symbols
+                else None,
+            )
+            for i, pattern in enumerate(self.patterns)
+        ]
+        self.tileset = Tileset(self.tiles, frequencies=frequencies)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def decode(self, tile_indices: Sequence[int]) -> np.ndarray:
+        """Converts the tile indices of a solved grid to sample values.
+
+        Arguments:
+            tile_indices: Tile indices of the spaces, indexed by (y, x),
+                and -1 for unassigned spaces.
+
+        Returns:
+            Array of the same shape of the top left value of every
+            space's pattern and -1 for unassigned spaces.
+        """
+        tile_indices = np.asarray(tile_indices)
+        top_left = np.array(
+            [pattern.values[0, 0] for pattern in self.patterns] + [-1]
+        )
+        return top_left[tile_indices]
+
+    def decode_lines(self, tile_indices: Sequence[int]) -> List[str]:
+        """Converts the tile indices of a solved grid to lines of
+        symbols like the sample. Unassigned spaces are left blank.
+
+        Arguments:
+            tile_indices: Tile indices of the spaces, indexed by (y, x).
+
+        Returns:
+            List of strings.
+        """
+        if self.symbols is None:
+            raise ValueError("The sample was not a list of strings.")
+
+        symbols = np.array(self.symbols + [" "])
+        return ["".join(row) for row in symbols[self.decode(tile_indices)]]
@@ -0,0 +1,119 @@
+from typing import Iterator, List, Sequence, TextIO, Union
+
+import colorama
+import numpy as np
+
+from wave_function_collapse.tile import Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+
+
+class Renderer:
+    """Renders tile indices as lines of tile symbols.
+
+    The rendered symbols of all tiles are precomputed once. Each line is
+    joined in bulk and consecutive tiles of the same color share a
+    single color code and reset, instead of one per tile.
+
+    Attributes:
+        compiled_tileset: Tileset with the precompiled adjacency
+            frequencies of the tiles.
+        colors: Flag whether to emit ANSI color codes, e.g. False for
+            log files (default: True).
+        empty: Symbol of unassigned spaces, i.e. tile index -1
+            (default: " ").
+        symbols: List of the tiles' symbols ordered by tile index,
+            followed by the empty symbol.
+        color_codes: List of the distinct colors of the tiles. The first
+            entry is the empty string for tiles without color.
+        color_ids: Integer array of the index of every tile's color in
+            color_codes, ordered like symbols.
+    """
+
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        colors: bool = True,
+        empty: str = " ",
+    ):
+        self.compiled_tileset = compile_tileset(tileset)
+        self.colors = colors
+        self.empty = empty
+        self.symbols = [tile.symbol for tile in self.compiled_tileset.tiles]
+        self.symbols.append(empty)
+
+        self.color_codes = [""]
+        color_ids = []
+        for tile in self.compiled_tileset.tiles:
+            color = (tile.color or "") if colors else ""
+            if color not in self.color_codes:
+                self.color_codes.append(color)
+            color_ids.append(self.color_codes.index(color))
+        color_ids.append(0)
+        self.color_ids = np.array(color_ids, dtype=np.intp)
+
+        # Rendered symbol of every tile after a tile of every color. The
+        # color code is only emitted where the color changes.
+        self._parts = []
+        for previous_color in self.color_codes:
+            for symbol, color_id in zip(self.symbols, color_ids):
+                color = self.color_codes[color_id]
+                if color == previous_color:
+                    self._parts.append(symbol)
+                elif previous_color:
+                    self._parts.append(
+                        f"{colorama.Style.RESET_ALL}{color}{symbol}"
+                    )
+                else:
+                    self._parts.append(f"{color}{symbol}")
+
+    def iter_lines(
+        self, tile_indices: Sequence[int], width: int = None
+    ) -> Iterator[str]:
+        """Yields the rendered lines of a grid one at a time.
+
+        Arguments:
+            tile_indices: Tile indices of the spaces and -1 for unassigned
+                spaces, either a flat sequence ordered by y * width + x or
+                an array of shape (height, width), e.g. the tile_indices
+                of a grid.
+            width: Width of the grid. Required for flat sequences.
+
+        Yields:
+            Strings with one symbol per space.
+        """
+        rows = np.asarray(tile_indices, dtype=np.intp)
+        if width is not None:
+            rows = rows.reshape(-1, width)
+
+        # Index -1 selects the empty symbol, which comes last.
+        rows = rows % len(self.symbols)
+        color_ids = self.color_ids[rows]
+        previous_color_ids = np.zeros_like(color_ids)
+        previous_color_ids[:, 1:] = color_ids[:, :-1]
+        keys = previous_color_ids * len(self.symbols) + rows
+
+        # Rows are converted to lists one at a time, so that only one
+        # row of Python integers exists at once.
+        parts = self._parts
+        for row_keys, last_color_id in zip(keys, color_ids[:, -1].tolist()):
+            line = "".join(map(parts.__getitem__, row_keys.tolist()))
+            if last_color_id:
+                line += colorama.Style.RESET_ALL
+            yield line
+
+    def render(self, tile_indices: Sequence[int], width: int = None) -> str:
+        """Renders a grid as a string with one line per row, see
+        iter_lines.
+        """
+        return "\n".join(self.iter_lines(tile_indices, width))
+
+    def write(
+        self, stream: TextIO, tile_indices: Sequence[int], width: int = None
+    ):
+        """Writes a grid to a file or stream line by line without
+        rendering it as a whole, see iter_lines. Every line, including
+        the last, ends with a newline.
+        """
+        for line in self.iter_lines(tile_indices, width):
+            stream.write(line)
+            stream.write("\n")
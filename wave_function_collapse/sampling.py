@@ -0,0 +1,57 @@
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterable
+
+import numpy as np
+
+
+def choose_index(weights: Iterable[float], rng=random) -> int:
+    """Chooses an index with a probability proportional to its weight.
+
+    The cumulative weights are built in one pass and searched with a
+    binary search. Given the same random number generator state, the
+    result is the same as walking the weights until their running sum
+    exceeds rng.uniform(0, sum(weights)).
+
+    Arguments:
+        weights: Non-negative weights, at least one of which is positive.
+        rng: Random number generator, e.g. an instance of random.Random
+            (default: the random module).
+
+    Returns:
+        The chosen index.
+    """
+    cumulative_weights = list(accumulate(weights))
+    total = cumulative_weights[-1]
+    index = bisect_right(cumulative_weights, rng.uniform(0, total))
+    if index == len(cumulative_weights):
+        # uniform may return the total itself, which belongs to the last
+        # index with a positive weight.
+        index = bisect_left(cumulative_weights, total)
+
+    return index
+
+
+def choose_indices(weights: np.ndarray, rng=random) -> np.ndarray:
+    """Chooses an index for every row of weights at once like
+    choose_index. Only the random numbers are drawn one by one.
+
+    Arguments:
+        weights: Float array of shape (n_rows, n_weights) of non-negative
+            weights, every row having at least one positive weight.
+        rng: Random number generator, e.g. an instance of random.Random
+            (default: the random module).
+
+    Returns:
+        Integer array of shape (n_rows,) of the chosen indices.
+    """
+    cumulative_weights = np.cumsum(weights, axis=1)
+    totals = cumulative_weights[:, -1].tolist()
+    thresholds = np.array([rng.uniform(0, total) for total in totals])
+    indices = (cumulative_weights <= thresholds[:, None]).sum(axis=1)
+    last_indices = (
+        weights.shape[1] - 1 - np.argmax(weights[:, ::-1] > 0, axis=1)
+    )
+
+    return np.minimum(indices, last_indices)
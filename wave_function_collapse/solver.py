@@ -0,0 +1,365 @@
+import hashlib
+import random
+from collections import deque
+from enum import Enum
+from typing import Dict, List, Tuple, Type, Union
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.tile import Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+from wave_function_collapse.wave_cache import WaveCache
+
+
+class ContradictionStrategy(str, Enum):
+    BACKTRACK = "BACKTRACK"
+    REPAIR = "REPAIR"
+    RESTART = "RESTART"
+
+
+class SolverStatistics:
+    """Counters describing how a solver reached its solution.
+
+    Attributes:
+        decisions: Number of tiles chosen at random.
+        contradictions: Number of times a space ran out of tiles.
+        restarts: Number of times the grid was created from scratch.
+        backtracks: Number of decisions that were undone.
+        repairs: Number of neighborhoods that were reset.
+    """
+
+    __slots__ = (
+        "backtracks",
+        "contradictions",
+        "decisions",
+        "repairs",
+        "restarts",
+    )
+
+    def __init__(self):
+        self.backtracks = 0
+        self.contradictions = 0
+        self.decisions = 0
+        self.repairs = 0
+        self.restarts = 0
+
+    def __repr__(self):
+        return (
+            f"SolverStatistics(decisions={self.decisions}, "
+            f"contradictions={self.contradictions}, "
+            f"restarts={self.restarts}, "
+            f"backtracks={self.backtracks}, "
+            f"repairs={self.repairs})"
+        )
+
+
+class Solver:
+    """Assigns tiles to all spaces of a grid and recovers from
+    contradictions instead of failing.
+
+    Strategies:
+        RESTART: Create the grid from scratch and start over. Works with
+            all engines.
+        BACKTRACK: Undo the last decision, remove the chosen tile from
+            the space and continue. If no tile is left, undo the decision
+            before. Only the last max_depth decisions can be undone.
+        REPAIR: Undo the last decision and reset the possible tiles of
+            all spaces around the contradiction. The neighborhood grows
+            with every consecutive failure.
+
+    BACKTRACK and REPAIR undo changes with the trail of a compact grid.
+    Both fall back to a restart once their limits are exceeded.
+
+    Attributes:
+        compiled_tileset: Tileset with the precompiled adjacency
+            frequencies of the tiles.
+        size: Size of the grid (width x height, default: 20x20).
+        engine: Grid class to be used (default: CompactGrid).
+        strategy: ContradictionStrategy (default: RESTART).
+        seed: Seed of the grids' random number generators. Each attempt
+            gets its own seed, see get_attempt_seed. If None, the random
+            module is used (default: None).
+        max_restarts: Maximum number of restarts (default: 10).
+        max_backtracks: Maximum number of undone decisions per attempt
+            (default: 1000).
+        max_depth: Maximum number of decisions that can be undone
+            (default: 100).
+        max_repairs: Maximum number of times the same neighborhood is
+            repaired (default: 10).
+        repair_radius: Distance from the contradiction up to which
+            spaces are reset by the first repair (default: 1).
+        masks: Dictionary of coordinates to bitmasks of the tiles
+            allowed there, applied to every new grid (default: None).
+        wave_cache: WaveCache the grids are initialized from. If None,
+            the solver creates its own, so that restarts do not
+            propagate the rules over the whole grid again
+            (default: None).
+        periodic: Whether the grids wrap around their edges
+            (default: False).
+        borders: Whether the tiles along the edges of the grids are
+            restricted by the tiles' border rules (default: True).
+        grid: The grid of the last attempt.
+        statistics: SolverStatistics of the last call to solve.
+    """
+
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        size: Tuple[int] = (20, 20),
+        engine: Type = CompactGrid,
+        strategy: ContradictionStrategy = ContradictionStrategy.RESTART,
+        seed: int = None,
+        max_restarts: int = 10,
+        max_backtracks: int = 1000,
+        max_depth: int = 100,
+        max_repairs: int = 10,
+        repair_radius: int = 1,
+        masks: Dict[Tuple[int], int] = None,
+        wave_cache: WaveCache = None,
+        periodic: bool = False,
+        borders: bool = True,
+    ):
+        strategy = ContradictionStrategy(strategy)
+        if strategy != ContradictionStrategy.RESTART and not issubclass(
+            engine, CompactGrid
+        ):
+            raise ValueError(
+                f"The {strategy.value} strategy requires a compact grid."
+            )
+
+        self.compiled_tileset = compile_tileset(tileset)
+        self.size = size
+        self.engine = engine
+        self.strategy = strategy
+        self.seed = seed
+        self.max_restarts = max_restarts
+        self.max_backtracks = max_backtracks
+        self.max_depth = max_depth
+        self.max_repairs = max_repairs
+        self.repair_radius = repair_radius
+        self.masks = masks
+        self.wave_cache = WaveCache() if wave_cache is None else wave_cache
+        self.periodic = periodic
+        self.borders = borders
+
+        self.grid = None
+        self.statistics = SolverStatistics()
+
+    def solve(self):
+        """Assigns tiles to all spaces.
+
+        Returns:
+            The solved grid.
+
+        Raises:
+            WaveFunctionCollapseException if no solution was found.
+        """
+        self.statistics = SolverStatistics()
+        solve_grid = {
+            ContradictionStrategy.BACKTRACK: self._backtrack,
+            ContradictionStrategy.REPAIR: self._repair,
+            ContradictionStrategy.RESTART: self._assign_all_tiles,
+        }[self.strategy]
+
+        for attempt in range(self.max_restarts + 1):
+            if attempt:
+                self.statistics.restarts += 1
+            if self.seed is None:
+                rng = None
+            else:
+                rng = random.Random(self.get_attempt_seed(attempt))
+            recoveries = self.statistics.backtracks + self.statistics.repairs
+
+            try:
+                self.grid = self._create_grid(rng)
+                if solve_grid():
+                    if (
+                        self.statistics.backtracks + self.statistics.repairs
+                        > recoveries
+                    ):
+                        self._complete_decisions()
+                    return self.grid
+            except WaveFunctionCollapseException:
+                self.statistics.contradictions += 1
+
+        raise WaveFunctionCollapseException(
+            f"No solution found after {self.max_restarts} restarts."
+        )
+
+    def get_attempt_seed(self, attempt: int) -> int:
+        """Get the seed of an attempt from the solver's seed and the
+        attempt's number. Unlike seed + attempt, restarts of one seed do
+        not repeat the first attempts of other seeds.
+        """
+        key = f"{self.seed},{attempt}".encode()
+        return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+    def replay(self, decisions: List[Tuple[Tuple[int], int]]):
+        """Creates a grid from a decision log without selecting spaces
+        or tiles.
+
+        Arguments:
+            decisions: List of coordinates and tile indices, e.g. the
+                decisions of a solved grid.
+
+        Returns:
+            The grid.
+        """
+        self.grid = self._create_grid()
+        self.grid.replay(decisions)
+        return self.grid
+
+    def _create_grid(self, rng: random.Random = None):
+        grid = self.engine(
+            self.compiled_tileset,
+            size=self.size,
+            rng=rng,
+            wave_cache=self.wave_cache,
+            periodic=self.periodic,
+            borders=self.borders,
+        )
+        if self.masks:
+            grid.restrict_spaces(self.masks)
+
+        return grid
+
+    def _complete_decisions(self):
+        # Banned tiles and the spaces narrowed by decisions that were
+        # dropped during a repair are not part of the decision log.
+        # Replaying the log reveals the spaces it does not determine.
+        grid = self._create_grid()
+        grid.replay(self.grid.decisions)
+        for index in range(len(grid.domains)):
+            if not grid.is_assigned(index):
+                grid.replay(
+                    [
+                        (
+                            grid.get_coords(index),
+                            self.grid.domains[index].bit_length() - 1,
+                        )
+                    ]
+                )
+
+        self.grid.decisions = grid.decisions
+
+    def _assign_all_tiles(self) -> bool:
+        if not isinstance(self.grid, CompactGrid):
+            self.grid.assign_all_tiles()
+            return True
+
+        while (index := self.grid.get_next_space()) is not None:
+            self._assign_tile(index, self.grid.choose_tile(index))
+
+        return True
+
+    def _assign_tile(self, index: int, tile_index: int):
+        self.statistics.decisions += 1
+        self.grid.assign_tile(index, tile_index)
+        self.grid.update_possible_tiles(
+            [neighbor for _, neighbor in self.grid.get_neighbors(index)]
+        )
+
+    def _backtrack(self) -> bool:
+        grid = self.grid
+        decisions = deque()
+        backtracks = 0
+
+        while (index := grid.get_next_space()) is not None:
+            checkpoint = grid.get_checkpoint()
+            tile_index = grid.choose_tile(index)
+            try:
+                self._assign_tile(index, tile_index)
+            except WaveFunctionCollapseException:
+                self.statistics.contradictions += 1
+            else:
+                decisions.append((checkpoint, index, tile_index))
+                if len(decisions) > self.max_depth:
+                    # Forget the oldest decision and the changes recorded
+                    # before the next one to keep the trail bounded.
+                    decisions.popleft()
+                    offset = decisions[0][0]
+                    del grid.trail[:offset]
+                    decisions = deque(
+                        (checkpoint - offset, index, tile_index)
+                        for checkpoint, index, tile_index in decisions
+                    )
+                continue
+
+            # Undo the failed decision and rule out its tile. If that
+            # empties a space, undo the previous decision as well.
+            while True:
+                if backtracks == self.max_backtracks:
+                    return False
+
+                grid.restore(checkpoint)
+                backtracks += 1
+                self.statistics.backtracks += 1
+                try:
+                    grid.ban_tile(index, tile_index)
+                    break
+                except WaveFunctionCollapseException:
+                    self.statistics.contradictions += 1
+                    if not decisions:
+                        return False
+                    checkpoint, index, tile_index = decisions.pop()
+
+        grid.trail = None
+        return True
+
+    def _repair(self) -> bool:
+        grid = self.grid
+        center, radius, repairs = None, 0, 0
+
+        while (index := grid.get_next_space()) is not None:
+            grid.trail = []
+            try:
+                self._assign_tile(index, grid.choose_tile(index))
+                continue
+            except WaveFunctionCollapseException as exception:
+                self.statistics.contradictions += 1
+                coords = exception.coords or grid.get_coords(index)
+                grid.restore(0)
+
+            # Grow the last repaired neighborhood if the contradiction
+            # occured within it again, otherwise start a new one.
+            if (
+                center is None
+                or max(abs(coords[0] - center[0]), abs(coords[1] - center[1]))
+                > radius
+            ):
+                center, radius, repairs = coords, 0, 0
+
+            while True:
+                if repairs == self.max_repairs:
+                    return False
+
+                radius += self.repair_radius
+                repairs += 1
+                self.statistics.repairs += 1
+                try:
+                    grid.reset_spaces(self.get_neighborhood(center, radius))
+                    break
+                except WaveFunctionCollapseException:
+                    self.statistics.contradictions += 1
+                    grid.restore(0)
+
+        grid.trail = None
+        return True
+
+    def get_neighborhood(self, coords: Tuple[int], radius: int) -> List[int]:
+        """Get the indices of all spaces within a square around a space.
+
+        Arguments:
+            coords: The center space's coordinates.
+            radius: Maximum distance along each axis.
+
+        Returns:
+            List of space indices.
+        """
+        width, height = self.size
+        x, y = coords
+        return [
+            self.grid.get_index((x_, y_))
+            for y_ in range(max(y - radius, 0), min(y + radius + 1, height))
+            for x_ in range(max(x - radius, 0), min(x + radius + 1, width))
+        ]
@@ -2,8 +2,9 @@ import random
 from typing import List, Tuple
 
 from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.sampling import choose_index
 from wave_function_collapse.tile import RuleDirection, Tile
-from wave_function_collapse.utils import shannon_entropy
+from wave_function_collapse.utils import entropy_from_sums, frequency_log
 
 
 class Space:
@@ -21,10 +22,20 @@ class Space:
 
     Properties:
         entropy: Shannon entropy of the space based on the possibles
-            tiles' frequencies.
+            tiles' frequencies. It is calculated from running sums, which
+            are updated whenever the frequencies are set.
         neighbors: List of neighboring coordingates.
     """
 
+    __slots__ = (
+        "coords",
+        "frequencies",
+        "possible_tiles",
+        "tile",
+        "_sum_frequencies",
+        "_sum_frequency_logs",
+    )
+
     def __init__(
         self,
         coords: Tuple[int],
@@ -43,15 +54,18 @@ class Space:
 
         if possible_tiles:
             self.frequencies = [1 for tile in possible_tiles]
+            self._sum_frequencies = len(possible_tiles)
         else:
             self.frequencies = None
+            self._sum_frequencies = 0
+        self._sum_frequency_logs = 0
 
     @property
     def entropy(self):
         """Shannon entropy."""
         if self.frequencies:
-            return shannon_entropy(
-                *[frequency for frequency in self.frequencies]
+            return entropy_from_sums(
+                self._sum_frequencies, self._sum_frequency_logs
             )
 
         return 0
@@ -73,6 +87,8 @@ class Space:
         self.tile = tile
         self.possible_tiles = None
         self.frequencies = None
+        self._sum_frequencies = 0
+        self._sum_frequency_logs = 0
 
     def set_possible_tiles(self, possible_tiles: List[Tile]):
         """Sets the possible_tiles property.
@@ -85,7 +101,8 @@ class Space:
             raise WaveFunctionCollapseException(
                 "No options remaining for this space. "
                 "This should not happen. "
-                "Please check the rules."
+                "Please check the rules.",
+                coords=self.coords,
             )
 
         self.possible_tiles = possible_tiles
@@ -104,10 +121,18 @@ class Space:
             frequencies = [frequency for frequency in frequencies if frequency]
 
         self.frequencies = frequencies
+        self._sum_frequencies = sum(frequencies)
+        self._sum_frequency_logs = sum(
+            frequency_log(frequency) for frequency in frequencies
+        )
 
-    def assign_tile(self):
+    def assign_tile(self, rng=random):
         """Assigns a tile to the space based on the tiles' frequencies.
 
+        Arguments:
+            rng: Random number generator, e.g. an instance of
+                random.Random (default: the random module).
+
         Raises:
             WaveFunctionCollapseException if already assigned.
         """
@@ -119,11 +144,4 @@ class Space:
             self.set_tile(self.possible_tiles[0])
             return
 
-        random_number = random.uniform(0, sum(self.frequencies))
-
-        cumulative_frequency = 0
-        for tile, frequency in zip(self.possible_tiles, self.frequencies):
-            cumulative_frequency += frequency
-            if random_number < cumulative_frequency:
-                self.set_tile(tile)
-                break
+        self.set_tile(self.possible_tiles[choose_index(self.frequencies, rng)])
@@ -0,0 +1,487 @@
+import random
+from array import array
+from collections import deque
+from copy import copy
+from typing import List, Tuple, Union
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.constants import ADJACENT_BORDERS
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.tile import Tile
+from wave_function_collapse.tileset import (
+    DIRECTIONS,
+    Tileset,
+    compile_tileset,
+)
+from wave_function_collapse.utils import (
+    count_bits,
+    entropy_from_sums,
+    frequency_log,
+    iter_bits,
+)
+from wave_function_collapse.wave_cache import WaveCache
+
+DIRECTION_INDICES = {direction: i for i, direction in enumerate(DIRECTIONS)}
+# Arrays of counters and frequencies that are part of a grid's state.
+STATE_ARRAYS = (
+    "counts",
+    "supports",
+    "tile_frequencies",
+    "sum_frequencies",
+    "sum_frequency_logs",
+)
+
+
+class SupportGrid(CompactGrid):
+    """Compact grid propagating with AC-4 style support counters.
+
+    For every space, tile and direction the grid counts the possible
+    tiles of the neighbor in that direction that allow the tile and sums
+    up their frequencies. Removing tiles from a space only decrements
+    the counters of the neighbors' tiles that they supported, and a tile
+    is removed as soon as one of its counters reaches zero. All tiles
+    removed from a space at once are processed together, so the cost of
+    propagation is proportional to the number of affected counters
+    instead of re-evaluating every tile of every revisited space. Only
+    spaces whose counters were changed without removing unsupported
+    tiles are checked tile by tile.
+
+    Maintaining the counters costs more than the memoized bitmasks of
+    CompactGrid in pure Python, so CompactGrid is usually faster. The
+    counters keep the tiles' frequencies and the entropies up to date
+    without recomputing them from the neighbors.
+
+    Attributes:
+        counts: Array of the number of supporting tiles, indexed by
+            (space index * n_tiles + tile index) * 4 + direction index.
+        supports: Array of the summed frequencies of the supporting
+            tiles with the same layout as counts.
+        support_masks: Dictionary with the directions as keys and lists
+            of bitmasks as values. Bit j of support_masks[direction][i]
+            is set if tiles[j] supports tiles[i] from that direction.
+        tile_frequencies: Array of the tiles' frequencies, i.e. the sum
+            of the supports from all neighbors, indexed by
+            space index * n_tiles + tile index.
+        sum_frequencies: Array of the sum of the possible tiles'
+            frequencies for every space.
+        sum_frequency_logs: Array of the sum of f * log2(f) over the
+            possible tiles' frequencies f for every space.
+
+    The frequency sums are updated whenever a support is decremented or a
+    tile is removed, so that entropies can be read in constant time.
+
+    While the trail is enabled, decremented counters are recorded along
+    with the possible tiles, so that restore can increment them again.
+    """
+
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        size: Tuple[int] = (20, 20),
+        random_tie_breaking: bool = True,
+        rng: random.Random = None,
+        wave_cache: WaveCache = None,
+        periodic: bool = False,
+        borders: bool = True,
+    ):
+        compiled_tileset = compile_tileset(tileset)
+        self.support_masks = {
+            direction: [
+                sum(1 << j for j, f in enumerate(row) if f > 0)
+                for row in compiled_tileset.frequencies[direction]
+            ]
+            for direction in DIRECTIONS
+        }
+        self._removals = deque()
+        # Spaces whose counters may have reached zero without their
+        # unsupported tiles being removed.
+        self._unchecked = set()
+        super().__init__(
+            compiled_tileset,
+            size,
+            random_tie_breaking,
+            rng,
+            wave_cache=wave_cache,
+            periodic=periodic,
+            borders=borders,
+        )
+
+    def _initialize(self):
+        counts = array("l")
+        supports = array("d")
+        for frequencies in zip(
+            *[self.compiled_tileset.frequencies[d] for d in DIRECTIONS]
+        ):
+            for row in frequencies:
+                counts.append(sum(1 for f in row if f > 0))
+                supports.append(sum(row))
+
+        width, height = self.size
+        self.counts = counts * (width * height)
+        self.supports = supports * (width * height)
+
+        # The initial frequencies only depend on which neighbors lie
+        # within the grid, so they are calculated once per combination.
+        n_tiles = len(self.tileset)
+        initial_frequencies = {}
+        self.tile_frequencies = array("d")
+        self.sum_frequencies = array("d")
+        self.sum_frequency_logs = array("d")
+        neighbor_indices = self.neighbor_indices
+        for index in range(width * height):
+            inside = tuple(
+                neighbor_indices[index * 4 + d] >= 0 for d in range(4)
+            )
+            if inside not in initial_frequencies:
+                frequencies = [
+                    sum(supports[i * 4 + d] for d in range(4) if inside[d])
+                    for i in range(n_tiles)
+                ]
+                initial_frequencies[inside] = (
+                    frequencies,
+                    sum(frequencies),
+                    sum(map(frequency_log, frequencies)),
+                )
+
+            (
+                frequencies,
+                sum_frequencies,
+                sum_frequency_logs,
+            ) = initial_frequencies[inside]
+            self.tile_frequencies.extend(frequencies)
+            self.sum_frequencies.append(sum_frequencies)
+            self.sum_frequency_logs.append(sum_frequency_logs)
+
+        self._unchecked = set(range(width * height))
+        super()._initialize()
+
+    def get_state(self) -> dict:
+        """Get a copy of the possible tiles, entropies and counters of all
+        spaces, e.g. to be cached by a WaveCache.
+        """
+        state = super().get_state()
+        for name in STATE_ARRAYS:
+            state[name] = copy(getattr(self, name))
+
+        return state
+
+    def set_state(self, state: dict):
+        """Replaces the possible tiles, entropies and counters of all
+        spaces with a copy of a state returned by get_state.
+        """
+        super().set_state(state)
+        for name in STATE_ARRAYS:
+            setattr(self, name, copy(state[name]))
+        self._removals.clear()
+        self._unchecked.clear()
+
+    def set_domain(self, index: int, domain: int):
+        """Sets the possible tiles of a space and schedules the removed
+        tiles for decrementing the neighbors' counters together.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain.
+        """
+        if not domain:
+            raise WaveFunctionCollapseException(
+                "No options remaining for this space. "
+                "This should not happen. "
+                "Please check the rules.",
+                coords=self.get_coords(index),
+            )
+
+        if removed := self.domains[index] & ~domain:
+            offset = index * len(self.tileset)
+            for i in iter_bits(removed):
+                frequency = self.tile_frequencies[offset + i]
+                self.sum_frequencies[index] -= frequency
+                self.sum_frequency_logs[index] -= frequency_log(frequency)
+            self._removals.append((index, removed, domain))
+
+        super().set_domain(index, domain)
+
+    def restore(self, checkpoint: int):
+        """Undoes all changes recorded since a checkpoint, including the
+        decremented counters. Pending tile removals are discarded.
+        """
+        super().restore(checkpoint)
+        self._removals.clear()
+
+    def _undo(self, change: Tuple):
+        # The trail holds three kinds of changes: (index, domain) from
+        # set_domain, (index, tile, direction, count, frequency) from
+        # remove_supports and snapshots of all counters of a space from
+        # count_supports.
+        n_tiles = len(self.tileset)
+        if len(change) == 2:
+            index, domain = change
+            # Narrowed domains are only undone together with a snapshot
+            # of the space, so only tiles that come back need updating.
+            offset = index * n_tiles
+            for i in iter_bits(domain & ~self.domains[index]):
+                frequency = self.tile_frequencies[offset + i]
+                self.sum_frequencies[index] += frequency
+                self.sum_frequency_logs[index] += frequency_log(frequency)
+            super()._undo(change)
+        elif len(change) == 5:
+            index, tile_index, d, count, frequency = change
+            k = (index * n_tiles + tile_index) * 4 + d
+            self.counts[k] += count
+            self.supports[k] += frequency
+
+            old_frequency = self.tile_frequencies[index * n_tiles + tile_index]
+            new_frequency = old_frequency + frequency
+            self.tile_frequencies[index * n_tiles + tile_index] = new_frequency
+            self.sum_frequencies[index] += frequency
+            self.sum_frequency_logs[index] += frequency_log(
+                new_frequency
+            ) - frequency_log(old_frequency)
+            self._changed_entropies.add(index)
+        else:
+            (
+                index,
+                counts,
+                supports,
+                tile_frequencies,
+                sum_frequencies,
+                sum_frequency_logs,
+            ) = change
+            counters, frequencies = self._get_slices(index)
+            self.counts[counters] = counts
+            self.supports[counters] = supports
+            self.tile_frequencies[frequencies] = tile_frequencies
+            self.sum_frequencies[index] = sum_frequencies
+            self.sum_frequency_logs[index] = sum_frequency_logs
+            self._changed_entropies.add(index)
+            self._unchecked.add(index)
+
+    def _get_slices(self, index: int) -> Tuple[slice]:
+        # Slices of the counters and of the tile frequencies of a space.
+        n_tiles = len(self.tileset)
+        return (
+            slice(index * n_tiles * 4, (index + 1) * n_tiles * 4),
+            slice(index * n_tiles, (index + 1) * n_tiles),
+        )
+
+    def count_supports(self, index: int):
+        """Recalculates all counters and frequencies of a space from the
+        current possible tiles of its neighbors.
+
+        Arguments:
+            index: The space's index.
+        """
+        n_tiles = len(self.tileset)
+        offset = index * n_tiles
+        counters, frequencies = self._get_slices(index)
+        if self.trail is not None:
+            self.trail.append(
+                (
+                    index,
+                    self.counts[counters],
+                    self.supports[counters],
+                    self.tile_frequencies[frequencies],
+                    self.sum_frequencies[index],
+                    self.sum_frequency_logs[index],
+                )
+            )
+
+        tile_frequencies = [0] * n_tiles
+        for direction, neighbor in self.get_neighbors(index):
+            d = DIRECTION_INDICES[direction]
+            domain = self.domains[neighbor]
+            supports = self.compiled_tileset.get_supports(direction, domain)
+            for i, mask in enumerate(self.support_masks[direction]):
+                k = (offset + i) * 4 + d
+                self.counts[k] = count_bits(domain & mask)
+                self.supports[k] = supports[i]
+                tile_frequencies[i] += supports[i]
+
+        self.tile_frequencies[frequencies] = array("d", tile_frequencies)
+        frequencies = [
+            tile_frequencies[i] for i in iter_bits(self.domains[index])
+        ]
+        self.sum_frequencies[index] = sum(frequencies)
+        self.sum_frequency_logs[index] = sum(map(frequency_log, frequencies))
+        self._changed_entropies.add(index)
+        self._unchecked.add(index)
+
+    def reset_spaces(self, indices: List[int]):
+        """Resets the possible tiles of spaces to the full tileset,
+        recalculates the counters around them and removes the tiles that
+        lost their support.
+
+        Arguments:
+            indices: List of space indices.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        self._reset_domains(indices)
+        affected = set(indices)
+        for index in indices:
+            affected.update(
+                neighbor for _, neighbor in self.get_neighbors(index)
+            )
+
+        affected = sorted(affected)
+        for index in affected:
+            self.count_supports(index)
+
+        self.update_possible_tiles(affected)
+
+    def get_frequencies(self, index: int) -> List[Tuple[int, float]]:
+        offset = index * len(self.tileset)
+        return [
+            (i, self.tile_frequencies[offset + i])
+            for i in iter_bits(self.domains[index])
+        ]
+
+    def get_entropy(self, index: int) -> float:
+        """Shannon entropy of a space from its running frequency sums."""
+        if self.is_assigned(index):
+            return 0
+
+        return entropy_from_sums(
+            self.sum_frequencies[index], self.sum_frequency_logs[index]
+        )
+
+    def update_possible_tiles_for_single_space(self, index: int) -> bool:
+        """Removes the tiles of a space that have no support left from
+        any neighbor. Spaces whose unsupported tiles were already removed
+        while decrementing their counters are skipped.
+
+        Arguments:
+            index: The space's index.
+
+        Returns:
+            Boolean flag whether the possible tiles were updated.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain.
+        """
+        if index not in self._unchecked:
+            return False
+
+        self._unchecked.discard(index)
+        offset = index * len(self.tileset) * 4
+        directions = [
+            DIRECTION_INDICES[direction]
+            for direction, _ in self.get_neighbors(index)
+        ]
+
+        domain = self.domains[index]
+        unsupported = 0
+        for i in iter_bits(domain):
+            if not all(self.counts[offset + i * 4 + d] for d in directions):
+                unsupported |= 1 << i
+
+        if not unsupported:
+            return False
+
+        self.set_domain(index, domain & ~unsupported)
+        return True
+
+    def remove_supports(
+        self,
+        index: int,
+        removed: int,
+        remaining: int,
+        remove_unsupported: bool = True,
+    ):
+        """Decrements the counters of the neighbors' tiles supported by
+        tiles that were removed from a space. If more tiles were removed
+        than remain, e.g. when a tile is assigned, the counters are
+        recounted from the remaining tiles instead.
+
+        Arguments:
+            index: The space's index.
+            removed: Bitmask of the removed tiles.
+            remaining: Bitmask of the space's possible tiles right after
+                the removal.
+            remove_unsupported: Flag whether tiles without support left
+                should be removed in turn (default: True).
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        n_tiles = len(self.tileset)
+        compiled_tileset = self.compiled_tileset
+        counts = self.counts
+        supports = self.supports
+        tile_frequencies = self.tile_frequencies
+        trail = self.trail
+        recount = count_bits(removed) > count_bits(remaining)
+        for direction, neighbor in self.get_neighbors(index):
+            opposite = ADJACENT_BORDERS[direction]
+            domain = self.domains[neighbor]
+            if not (
+                affected := compiled_tileset.get_allowed_mask(
+                    opposite, removed
+                )
+                & domain
+            ):
+                continue
+
+            d = DIRECTION_INDICES[opposite]
+            support_masks = self.support_masks[opposite]
+            frequencies = compiled_tileset.frequencies[opposite]
+            # Only the smaller of the removed and remaining tiles is
+            # iterated.
+            tiles = remaining if recount else removed
+            offset = neighbor * n_tiles
+            sum_frequency_logs = 0
+            unsupported = 0
+            for i in iter_bits(affected):
+                k = (offset + i) * 4 + d
+                row = frequencies[i]
+                count = 0
+                frequency = 0
+                for j in iter_bits(tiles & support_masks[i]):
+                    count += 1
+                    frequency += row[j]
+                if recount:
+                    count = counts[k] - count
+                    frequency = supports[k] - frequency
+                counts[k] -= count
+                supports[k] -= frequency
+                if not counts[k]:
+                    unsupported |= 1 << i
+                if trail is not None:
+                    trail.append((neighbor, i, d, count, frequency))
+
+                old_frequency = tile_frequencies[offset + i]
+                new_frequency = old_frequency - frequency
+                tile_frequencies[offset + i] = new_frequency
+                self.sum_frequencies[neighbor] -= frequency
+                sum_frequency_logs += frequency_log(
+                    new_frequency
+                ) - frequency_log(old_frequency)
+            self.sum_frequency_logs[neighbor] += sum_frequency_logs
+
+            if unsupported:
+                if remove_unsupported:
+                    self.set_domain(neighbor, domain & ~unsupported)
+                else:
+                    self._unchecked.add(neighbor)
+
+    def update_possible_tiles(
+        self, indices_to_check: List[int], check_further: bool = True
+    ):
+        """Removes unsupported tiles from a list of spaces and processes
+        all pending tile removals.
+
+        Arguments:
+            indices_to_check: List of space indices to check.
+            check_further: Flag whether the neighbors of spaces that
+                lost tiles should also lose their unsupported tiles
+                (default: True). The counters are updated either way.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        for index in indices_to_check:
+            self.update_possible_tiles_for_single_space(index)
+
+        while self._removals:
+            index, removed, remaining = self._removals.popleft()
+            self.remove_supports(index, removed, remaining, check_further)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import json
 from enum import Enum
-from typing import Dict, Tuple, TypedDict
+from typing import Dict, List, Tuple, TypedDict
 
 import colorama
 
@@ -19,11 +20,37 @@ class RuleDirection(str, Enum):
 
 
 class RuleMatchingType(str, Enum):
-    # BORDER = "BORDER"
+    BORDER = "BORDER"
     # NOT_TAGS = "NOT TAGS"
     TAGS = "TAGS"
 
 
+_N, _E, _S, _W = (
+    RuleDirection.NORTH,
+    RuleDirection.EAST,
+    RuleDirection.SOUTH,
+    RuleDirection.WEST,
+)
+
+# Where each direction of a tile points after rotating it clockwise and
+# mirroring it from west to east, by the suffix of the variant's name.
+TRANSFORMS = {
+    "": {_N: _N, _E: _E, _S: _S, _W: _W},
+    "R90": {_N: _E, _E: _S, _S: _W, _W: _N},
+    "R180": {_N: _S, _E: _W, _S: _N, _W: _E},
+    "R270": {_N: _W, _E: _N, _S: _E, _W: _S},
+    "M": {_N: _N, _E: _W, _S: _S, _W: _E},
+    "MR90": {_N: _E, _E: _N, _S: _W, _W: _S},
+    "MR180": {_N: _S, _E: _E, _S: _N, _W: _W},
+    "MR270": {_N: _W, _E: _S, _S: _E, _W: _N},
+}
+
+# Number of leading TRANSFORMS that produce the distinct variants of a
+# tile of each symmetry class, named after the letters of the same
+# symmetry.
+SYMMETRIES = {"X": 1, "I": 2, "\\": 2, "L": 4, "T": 4, "F": 8}
+
+
 class TileRule(TypedDict):
     frequency: float
     matching_type: RuleMatchingType
@@ -37,13 +64,18 @@ class Tile:
         name: Tile name, used in rules for specific tiles.
         color: ANSI color string for terminal output (default: None).
         rules: Dictionary of rules for adjacent tiles with directions as
-            keys,  (default: None).
+            keys,  (default: None). Rules of the matching type BORDER
+            with a positive frequency allow the tile along the edge of
+            the grid in their direction, their matching value is
+            ignored.
         symbol: String symbol representation for terminal output
             (default: █).
         tags: List of string tags, used for rules for tagged tiles
             (default: None).
     """
 
+    __slots__ = ("color", "name", "rules", "symbol", "tags")
+
     def __init__(
         self,
         name: str,
@@ -94,3 +126,84 @@ class Tile:
                     frequency += rule["frequency"]
 
         return max(0, frequency)
+
+    def get_variants(
+        self,
+        symmetry: str = "F",
+        symbols: str = None,
+        directional_tags: Dict[RuleDirection, Tuple[str]] = None,
+    ) -> List[Tile]:
+        """Creates the rotated and mirrored variants of this tile. The
+        directions of the rules are transformed with the tile, as are
+        directional tags both in the tags and the rules' matching values.
+        Variants equal to an earlier one are left out.
+
+        Arguments:
+            symmetry: Symmetry class of the tile, one of SYMMETRIES
+                (default: F, i.e. no symmetry).
+            symbols: String with a symbol for every variant of the
+                symmetry class in the order of TRANSFORMS. If None, all
+                variants use this tile's symbol (default: None).
+            directional_tags: Dictionary of directions to tuples of tags
+                that refer to the direction. Each tag is replaced by the
+                tag at the same position for the transformed direction
+                (default: None).
+
+        Returns:
+            List of tiles, starting with this tile's equal. Other
+            variants are named after this tile and the transform, e.g.
+            "Corner:R90".
+
+        Raises:
+            ValueError if the symmetry class is unknown or the number of
+            symbols does not match.
+        """
+        if symmetry not in SYMMETRIES:
+            raise ValueError(f"Unknown symmetry class {symmetry!r}.")
+
+        transforms = list(TRANSFORMS)[: SYMMETRIES[symmetry]]
+        if symbols is not None and len(symbols) != len(transforms):
+            raise ValueError(
+                f"Symmetry class {symmetry} requires {len(transforms)} "
+                "symbols."
+            )
+
+        variants = []
+        keys = set()
+        for i, transform in enumerate(transforms):
+            directions = TRANSFORMS[transform]
+            tag_map = {}
+            for direction, tags in (directional_tags or {}).items():
+                tag_map.update(
+                    zip(tags, directional_tags[directions[direction]])
+                )
+
+            tags = self.tags and tuple(tag_map.get(t, t) for t in self.tags)
+            rules = self.rules and {
+                directions.get(direction, direction): tuple(
+                    {
+                        **rule,
+                        "matching_value": tag_map.get(
+                            rule["matching_value"], rule["matching_value"]
+                        ),
+                    }
+                    for rule in direction_rules
+                )
+                for direction, direction_rules in self.rules.items()
+            }
+            key = json.dumps([sorted(tags or ()), rules], sort_keys=True)
+            if key in keys:
+                continue
+
+            keys.add(key)
+            variants.append(
+                Tile(
+                    f"{self.name}:{transform}" if transform else self.name,
+                    color=self.color,
+                    rules=rules,
+                    symbol=symbols[i] if symbols else self.symbol,
+                    tags=tags,
+                )
+            )
+
+        return variants
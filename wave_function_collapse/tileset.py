@@ -0,0 +1,425 @@
+import hashlib
+import json
+from collections import OrderedDict
+from copy import copy
+from typing import Dict, List, Tuple
+
+from wave_function_collapse.constants import ADJACENT_BORDERS
+from wave_function_collapse.tile import (
+    RuleDirection,
+    RuleMatchingType,
+    Tile,
+    TileRule,
+)
+from wave_function_collapse.utils import iter_bits
+
+DIRECTIONS = tuple(ADJACENT_BORDERS)
+
+# Maximum number of memoized bitmasks per table of a tileset, see
+# Tileset.get_allowed_mask and Tileset.get_supports.
+MAX_MEMOIZED_MASKS = 4096
+
+# Compiled tilesets by the content hash of their tiles, see
+# compile_tileset.
+COMPILED_TILESETS = OrderedDict()
+MAX_COMPILED_TILESETS = 32
+
+
+def expand_rules(
+    rules: Dict[RuleDirection, Tuple[TileRule]]
+) -> Dict[RuleDirection, Tuple[TileRule]]:
+    """Expands rules for all directions into the concrete directions.
+    Rules for a specific direction replace those for all directions.
+
+    Arguments:
+        rules: Dictionary of rules with directions as keys or None.
+
+    Returns:
+        Dictionary with a tuple of rules for every direction.
+    """
+    rules = rules or {}
+    default = rules.get(RuleDirection.ALL) or ()
+    return {
+        direction: rules.get(direction) or default for direction in DIRECTIONS
+    }
+
+
+class Tileset:
+    """Tileset compiled into dense adjacency frequency tables.
+
+    The rules of every tile are evaluated once per direction, so that
+    looking up an adjacency frequency becomes a table lookup by tile
+    index. Rules for all directions are expanded into the four concrete
+    directions and matched through an index of the tiles' tags.
+    Alternatively, the tables can be passed in directly, e.g. for tiles
+    generated from patterns.
+
+    Attributes:
+        tiles: List of tiles sorted by name. Tile names must be unique.
+        index: Dictionary of tile names to their index in tiles.
+        frequencies: Dictionary with the directions as keys and
+            (n_tiles x n_tiles) nested lists as values.
+            frequencies[direction][i][j] is the frequency of tiles[j]
+            occuring adjacent to tiles[i] in the given direction.
+        full_mask: Bitmask with the bits of all tile indices set.
+        compatible: Dictionary with the directions as keys and lists of
+            bitmasks as values. Bit i of compatible[direction][j] is set
+            if tiles[j] may occur adjacent to tiles[i] in the given
+            direction.
+        tag_index: Dictionary of tags to the indices of the tiles
+            having them.
+        border_masks: Dictionary with the directions as keys and
+            bitmasks of the tiles allowed along the grid's edge in that
+            direction as values. If no tile has a border rule for a
+            direction, all tiles are allowed along that edge.
+        fingerprint: Hex digest of the tile names and frequency tables.
+            Tilesets with the same fingerprint produce the same grids.
+        asymmetric_rules: List of tuples (tile, direction, other_tile)
+            for which tile allows other_tile in direction, but other_tile
+            does not allow tile in the opposite direction. Such rules
+            only apply where both tiles allow each other.
+        unplaceable_tiles: List of tiles that cannot be placed on any
+            space that has neighbors in all directions, as no tiles they
+            can be placed next to remain in some direction.
+        max_memoized_masks: Maximum number of bitmasks memoized by
+            get_allowed_mask and get_supports. A table is cleared once
+            it is full, so that long running processes do not keep
+            every domain they ever saw (default: MAX_MEMOIZED_MASKS).
+    """
+
+    def __init__(
+        self,
+        tiles: List[Tile],
+        frequencies: Dict[RuleDirection, List[List[float]]] = None,
+    ):
+        """
+        Arguments:
+            tiles: List of tiles.
+            frequencies: Frequency tables like the frequencies attribute,
+                but ordered like tiles instead of by name. If None, they
+                are evaluated from the tiles' rules (default: None).
+        """
+        order = sorted(range(len(tiles)), key=lambda i: tiles[i].name)
+        self.tiles = [tiles[i] for i in order]
+        self.index = {tile.name: i for i, tile in enumerate(self.tiles)}
+        if len(self.index) != len(self.tiles):
+            raise ValueError("Tile names must be unique.")
+
+        self.tag_index = {}
+        for i, tile in enumerate(self.tiles):
+            for tag in dict.fromkeys(tile.tags or ()):
+                self.tag_index.setdefault(tag, []).append(i)
+
+        if frequencies is None:
+            self.frequencies = {direction: [] for direction in DIRECTIONS}
+            for tile in self.tiles:
+                for direction, rules in expand_rules(tile.rules).items():
+                    self.frequencies[direction].append(
+                        self._evaluate_rules(rules)
+                    )
+        else:
+            self.frequencies = {
+                direction: [
+                    [frequencies[direction][i][j] for j in order]
+                    for i in order
+                ]
+                for direction in DIRECTIONS
+            }
+
+        self.full_mask = (1 << len(self.tiles)) - 1
+        self.border_masks = dict.fromkeys(DIRECTIONS, 0)
+        for i, tile in enumerate(self.tiles):
+            for direction, rules in expand_rules(tile.rules).items():
+                if any(
+                    rule["matching_type"] == RuleMatchingType.BORDER
+                    and rule["frequency"] > 0
+                    for rule in rules
+                ):
+                    self.border_masks[direction] |= 1 << i
+        for direction, mask in self.border_masks.items():
+            if not mask:
+                self.border_masks[direction] = self.full_mask
+        self.compatible = {
+            direction: [
+                sum(
+                    1 << i
+                    for i, row in enumerate(self.frequencies[direction])
+                    if row[j] > 0
+                )
+                for j in range(len(self.tiles))
+            ]
+            for direction in DIRECTIONS
+        }
+
+        self.max_memoized_masks = MAX_MEMOIZED_MASKS
+        self._allowed_masks = {}
+        self._supports = {}
+        self._fingerprint = None
+        self._asymmetric_rules = None
+        self._unplaceable_tiles = None
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def _evaluate_rules(self, rules: Tuple[TileRule]) -> List[float]:
+        """Get the frequencies of all tiles like
+        Tile.get_adjacency_frequency for the rules of one direction.
+        """
+        row = [0] * len(self.tiles)
+        for rule in rules:
+            if rule["matching_type"] == RuleMatchingType.TAGS:
+                for j in self.tag_index.get(rule["matching_value"], ()):
+                    row[j] += rule["frequency"]
+
+        return [max(0, frequency) for frequency in row]
+
+    @property
+    def asymmetric_rules(self) -> List[Tuple[Tile, RuleDirection, Tile]]:
+        if self._asymmetric_rules is None:
+            self._asymmetric_rules = []
+            for direction in DIRECTIONS:
+                opposite = self.compatible[ADJACENT_BORDERS[direction]]
+                for j, mask in enumerate(self.compatible[direction]):
+                    for i in iter_bits(mask):
+                        if not opposite[i] >> j & 1:
+                            self._asymmetric_rules.append(
+                                (self.tiles[i], direction, self.tiles[j])
+                            )
+
+        return self._asymmetric_rules
+
+    @property
+    def unplaceable_tiles(self) -> List[Tile]:
+        if self._unplaceable_tiles is None:
+            # Bitmasks of the tiles that a tile allows in a direction and
+            # that allow the tile in the opposite direction.
+            mutual = {
+                direction: [
+                    sum(1 << j for j, f in enumerate(row) if f > 0)
+                    & self.compatible[ADJACENT_BORDERS[direction]][i]
+                    for i, row in enumerate(self.frequencies[direction])
+                ]
+                for direction in DIRECTIONS
+            }
+            placeable = self.full_mask
+            changed = True
+            while changed:
+                changed = False
+                for i in iter_bits(placeable):
+                    if any(
+                        not mutual[direction][i] & placeable
+                        for direction in DIRECTIONS
+                    ):
+                        placeable &= ~(1 << i)
+                        changed = True
+
+            self._unplaceable_tiles = [
+                self.tiles[i] for i in iter_bits(self.full_mask & ~placeable)
+            ]
+
+        return self._unplaceable_tiles
+
+    @property
+    def has_borders(self) -> bool:
+        """Whether border rules restrict the tiles along any edge."""
+        return any(
+            mask != self.full_mask for mask in self.border_masks.values()
+        )
+
+    def get_border_masks(self, size: Tuple[int]) -> Dict[Tuple[int], int]:
+        """Get the bitmasks of the tiles allowed along the edges of a
+        grid by the border rules.
+
+        Arguments:
+            size: Size of the grid (width x height).
+
+        Returns:
+            Dictionary of coordinates to bitmasks for the spaces along
+            the restricted edges.
+        """
+        if not self.has_borders:
+            return {}
+
+        width, height = size
+        north, east, south, west = (self.border_masks[d] for d in DIRECTIONS)
+        masks = {}
+        for x in range(width):
+            masks[(x, 0)] = north
+            masks[(x, height - 1)] = masks.get((x, height - 1), -1) & south
+        for y in range(height):
+            masks[(0, y)] = masks.get((0, y), -1) & west
+            masks[(width - 1, y)] = masks.get((width - 1, y), -1) & east
+
+        return {
+            coords: mask
+            for coords, mask in masks.items()
+            if mask != self.full_mask
+        }
+
+    def validate(self):
+        """Checks the rules for asymmetric rules and unplaceable tiles.
+
+        Raises:
+            ValueError if any are found.
+        """
+        problems = [
+            f"{tile.name} allows {other_tile.name} {direction.name}, "
+            "but not vice versa."
+            for tile, direction, other_tile in self.asymmetric_rules
+        ] + [
+            f"{tile.name} cannot be placed." for tile in self.unplaceable_tiles
+        ]
+        if problems:
+            raise ValueError(" ".join(problems))
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            content = [
+                [tile.name for tile in self.tiles],
+                [self.frequencies[d] for d in DIRECTIONS],
+            ]
+            if self.has_borders:
+                content.append([self.border_masks[d] for d in DIRECTIONS])
+            content = json.dumps(content)
+            self._fingerprint = hashlib.sha256(content.encode()).hexdigest()
+
+        return self._fingerprint
+
+    def get_frequency_table(
+        self, tile: Tile, direction: RuleDirection
+    ) -> List[float]:
+        """Get the frequencies of all tiles occuring adjacent to a tile.
+
+        Arguments:
+            tile: A tile of the tileset.
+            direction: The direction, in which the other tiles may be
+                placed.
+
+        Returns:
+            List of frequencies ordered by tile index.
+        """
+        return self.frequencies[direction][self.index[tile.name]]
+
+    def get_frequency(
+        self, tile: Tile, other_tile: Tile, direction: RuleDirection
+    ) -> float:
+        """Get the frequency of a tile occuring adjacent to another tile.
+
+        Arguments:
+            tile: A tile of the tileset.
+            other_tile: Another tile of the tileset.
+            direction: The direction, in which other_tile may be placed.
+
+        Returns:
+            Frequency of other_tile occuring.
+        """
+        return self.get_frequency_table(tile, direction)[
+            self.index[other_tile.name]
+        ]
+
+    def get_allowed_mask(self, direction: RuleDirection, mask: int) -> int:
+        """Get the tiles that are allowed next to a space with the given
+        possible tiles. Results are memoized, as the same bitmasks occur
+        over and over again on a grid, up to max_memoized_masks of them.
+
+        Arguments:
+            direction: The direction from the space to be checked to the
+                neighboring space.
+            mask: Bitmask of the neighboring space's possible tiles.
+
+        Returns:
+            Bitmask of the allowed tiles.
+        """
+        key = (direction, mask)
+        if (allowed_mask := self._allowed_masks.get(key)) is None:
+            compatible = self.compatible[direction]
+            allowed_mask = 0
+            for j in iter_bits(mask):
+                allowed_mask |= compatible[j]
+            if len(self._allowed_masks) >= self.max_memoized_masks:
+                self._allowed_masks.clear()
+            self._allowed_masks[key] = allowed_mask
+
+        return allowed_mask
+
+    def get_supports(self, direction: RuleDirection, mask: int) -> List[float]:
+        """Get the frequencies of all tiles given the possible tiles of a
+        neighboring space. Results are memoized like get_allowed_mask.
+
+        Arguments:
+            direction: The direction from the space to be checked to the
+                neighboring space.
+            mask: Bitmask of the neighboring space's possible tiles.
+
+        Returns:
+            List of frequencies ordered by tile index.
+        """
+        key = (direction, mask)
+        if (supports := self._supports.get(key)) is None:
+            indices = list(iter_bits(mask))
+            supports = [
+                sum(row[j] for j in indices)
+                for row in self.frequencies[direction]
+            ]
+            if len(self._supports) >= self.max_memoized_masks:
+                self._supports.clear()
+            self._supports[key] = supports
+
+        return supports
+
+
+def get_content_hash(tiles: List[Tile]) -> str:
+    """Get a hex digest of everything the compiled tileset of a list of
+    tiles depends on, i.e. their names, colors, symbols, rules and tags.
+    """
+    # Sorted by name only, as colors and rules cannot be compared.
+    content = json.dumps(
+        [
+            [tile.name, tile.color, tile.symbol, tile.rules, tile.tags]
+            for tile in sorted(tiles, key=lambda tile: tile.name)
+        ],
+        default=repr,
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def clear_compiled_tilesets():
+    """Removes all compiled tilesets cached by compile_tileset."""
+    COMPILED_TILESETS.clear()
+
+
+def compile_tileset(tileset: List[Tile], cache: bool = True) -> Tileset:
+    """Compiles a list of tiles unless it already is a compiled tileset.
+
+    Arguments:
+        tileset: List of tiles or a compiled tileset.
+        cache: Whether to reuse the compiled tileset of an earlier call
+            with tiles of the same content (default: True).
+
+    Returns:
+        The compiled tileset.
+    """
+    if isinstance(tileset, Tileset):
+        return tileset
+    if not cache:
+        return Tileset(tileset)
+
+    key = get_content_hash(tileset)
+    if (compiled_tileset := COMPILED_TILESETS.get(key)) is None:
+        compiled_tileset = Tileset(tileset)
+        COMPILED_TILESETS[key] = compiled_tileset
+        if len(COMPILED_TILESETS) > MAX_COMPILED_TILESETS:
+            COMPILED_TILESETS.popitem(last=False)
+        return compiled_tileset
+
+    COMPILED_TILESETS.move_to_end(key)
+    # Share the tables, including the memoized bitmasks, which are capped
+    # by max_memoized_masks, but hand out the caller's own tile objects.
+    compiled_tileset = copy(compiled_tileset)
+    compiled_tileset.tiles = sorted(tileset, key=lambda t: t.name)
+    compiled_tileset._asymmetric_rules = None
+    compiled_tileset._unplaceable_tiles = None
+
+    return compiled_tileset
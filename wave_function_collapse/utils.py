@@ -1,3 +1,4 @@
+from functools import lru_cache
 from math import log2
 
 
@@ -7,3 +8,39 @@ def shannon_entropy(*frequencies: float) -> float:
     probabilities = [f / sum_frequencies for f in frequencies]
 
     return -sum(p * log2(p) for p in probabilities)
+
+
+@lru_cache(maxsize=4096)
+def frequency_log(frequency: float) -> float:
+    """Calculates frequency * log2(frequency). The results are memoized,
+    as the same frequencies occur over and over again.
+    """
+    if frequency <= 0:
+        return 0
+
+    return frequency * log2(frequency)
+
+
+def entropy_from_sums(sum_frequencies: float, sum_frequency_logs: float):
+    """Calculates the Shannon entropy from the sum of the frequencies f
+    and the sum of f * log2(f).
+    """
+    if sum_frequencies <= 0:
+        return 0
+
+    return log2(sum_frequencies) - sum_frequency_logs / sum_frequencies
+
+
+def count_bits(mask: int) -> int:
+    """Counts the set bits of an integer bitmask."""
+    return bin(mask).count("1")
+
+
+def iter_bits(mask: int):
+    """Yields the indices of the set bits of an integer bitmask in
+    ascending order.
+    """
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length() - 1
+        mask ^= lowest_bit
@@ -0,0 +1,621 @@
+import random
+from typing import Dict, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from wave_function_collapse.events import CollapseEvent
+from wave_function_collapse.exceptions import WaveFunctionCollapseException
+from wave_function_collapse.renderer import Renderer
+from wave_function_collapse.sampling import choose_index, choose_indices
+from wave_function_collapse.tile import RuleDirection, Tile
+from wave_function_collapse.tileset import DIRECTIONS, Tileset, compile_tileset
+from wave_function_collapse.wave_cache import WaveCache
+
+OFFSETS = {
+    RuleDirection.NORTH: (-1, 0),
+    RuleDirection.EAST: (0, 1),
+    RuleDirection.SOUTH: (1, 0),
+    RuleDirection.WEST: (0, -1),
+}
+
+
+class VectorizedGrid:
+    """Grid storing the whole wave as a boolean array, which is updated
+    with vectorized array operations instead of space by space.
+
+    Propagation sweeps over a rectangular window around the spaces that
+    changed. Each sweep computes the frequencies contributed by the
+    neighbors in every direction as a matrix product of the wave with
+    the tileset's frequency table and shifts the result by one space.
+    The window grows and shrinks with the spaces that changed in the
+    previous sweep until nothing changes anymore.
+
+    Attributes:
+        tileset: List of tiles to be used, will be resorted by name.
+            Tile names must be unique.
+        compiled_tileset: Tileset with the precompiled adjacency
+            frequencies of the tiles.
+        size: Size of the grid (width x height, default: 20x20).
+        periodic: Whether the grid wraps around its edges, so that the
+            spaces along opposite edges are neighbors (default: False).
+        borders: Whether the tiles along the edges are restricted by the
+            tiles' border rules. Always False for periodic grids
+            (default: True).
+        wave: Boolean array of shape (height, width, n_tiles).
+            wave[y, x, i] is True if tileset[i] is possible for the space
+            at (x, y). A space with a single possible tile has been
+            assigned that tile.
+        entropies: Float array of shape (height, width) with the Shannon
+            entropies of the spaces. Assigned spaces are set to infinity.
+        row_entropies: Float array of shape (height,) with the lowest
+            entropy of every row. Only the rows of recalculated windows
+            are updated, so that selecting a space only scans the rows
+            holding the lowest entropy instead of the whole grid.
+        rng: Random number generator, e.g. an instance of random.Random
+            (default: the random module).
+        decisions: List of the coordinates and tile indices of the tiles
+            assigned by assign_tile in order.
+        wave_cache: WaveCache the initial wave and entropies are copied
+            from. If None, the rules are propagated over the whole grid
+            (default: None).
+        narrowed: List of the coordinates of the spaces whose possible
+            tiles were reduced by update_possible_tiles, recorded while it
+            is not None (default: None).
+    """
+
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        size: Tuple[int] = (20, 20),
+        rng: random.Random = None,
+        wave_cache: WaveCache = None,
+        periodic: bool = False,
+        borders: bool = True,
+    ):
+        self.compiled_tileset = compile_tileset(tileset)
+        self.tileset = self.compiled_tileset.tiles
+        self.size = size
+        self.periodic = periodic
+        self.borders = borders and not periodic
+        self.rng = random if rng is None else rng
+        self.decisions = []
+        self.wave_cache = wave_cache
+        self.narrowed = None
+
+        width, height = self.size
+        self.frequency_matrices = {
+            direction: np.array(
+                self.compiled_tileset.frequencies[direction], dtype=float
+            ).T
+            for direction in DIRECTIONS
+        }
+        self.wave = np.ones((height, width, len(self.tileset)), dtype=bool)
+        self.entropies = np.full((height, width), np.inf)
+        self.row_entropies = np.full(height, np.inf)
+
+        if wave_cache is None or (state := wave_cache.get(self)) is None:
+            if self.borders:
+                self.apply_border_rules()
+            self.update_possible_tiles((0, height, 0, width))
+            if wave_cache is not None:
+                wave_cache.put(self, self.get_state())
+        else:
+            self.set_state(state)
+
+    def __str__(self):
+        return Renderer(self.compiled_tileset).render(self.tile_indices)
+
+    @property
+    def tile_indices(self) -> np.ndarray:
+        """Integer array of shape (height, width) with the indices of the
+        assigned tiles and -1 for unassigned spaces.
+        """
+        return np.where(
+            self.wave.sum(axis=2) == 1, self.wave.argmax(axis=2), -1
+        )
+
+    def get_state(self) -> dict:
+        """Get a copy of the wave and the entropies, e.g. to be cached by
+        a WaveCache.
+        """
+        return {"wave": self.wave.copy(), "entropies": self.entropies.copy()}
+
+    def set_state(self, state: dict):
+        """Replaces the wave and the entropies with a copy of a state
+        returned by get_state. Nothing is propagated.
+        """
+        self.wave = state["wave"].copy()
+        self.entropies = state["entropies"].copy()
+        self.row_entropies = self.entropies.min(axis=1)
+
+    def apply_border_rules(self):
+        """Removes the tiles not allowed by the border rules from the
+        spaces along the edges. Nothing is propagated.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        n_tiles = len(self.tileset)
+        for (x, y), mask in self.compiled_tileset.get_border_masks(
+            self.size
+        ).items():
+            self.wave[y, x] &= [bool(mask >> i & 1) for i in range(n_tiles)]
+            if not self.wave[y, x].any():
+                raise WaveFunctionCollapseException(
+                    "No options remaining for this space. "
+                    "This should not happen. "
+                    "Please check the rules.",
+                    coords=(x, y),
+                )
+
+    def restrict_spaces(self, masks: Dict[Tuple[int], int]):
+        """Restricts the possible tiles of spaces and updates the other
+        spaces accordingly in a single propagation.
+
+        Arguments:
+            masks: Dictionary of coordinates to bitmasks of the allowed
+                tiles.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        n_tiles = len(self.tileset)
+        changed = []
+        for (x, y), mask in masks.items():
+            old = self.wave[y, x]
+            new = old & [bool(mask >> i & 1) for i in range(n_tiles)]
+            if not new.any():
+                raise WaveFunctionCollapseException(
+                    "No options remaining for this space. "
+                    "This should not happen. "
+                    "Please check the rules.",
+                    coords=(x, y),
+                )
+
+            if (new != old).any():
+                self.wave[y, x] = new
+                changed.append((x, y))
+
+        if not changed:
+            return
+
+        xs, ys = zip(*changed)
+        self.update_possible_tiles(
+            self._get_bounds(min(ys) - 1, max(ys) + 2, 0)
+            + self._get_bounds(min(xs) - 1, max(xs) + 2, 1)
+        )
+
+    def _get_bounds(self, start: int, stop: int, axis: int) -> Tuple[int]:
+        """Clips a range of rows (axis 0) or columns (axis 1) to the
+        grid. On periodic grids, a range that crosses an edge wraps
+        around, so the whole axis is returned instead.
+        """
+        length = self.wave.shape[axis]
+        if self.periodic and (start < 0 or stop > length):
+            return 0, length
+
+        return max(start, 0), min(stop, length)
+
+    def get_tile(self, coords: Tuple[int]) -> Tile:
+        """Get the tile assigned to a space or None if not assigned."""
+        possible_tiles = np.flatnonzero(self.wave[coords[1], coords[0]])
+        if len(possible_tiles) != 1:
+            return None
+
+        return self.tileset[possible_tiles[0]]
+
+    def get_possible_tiles(self, coords: Tuple[int]) -> List[Tile]:
+        """Get the list of tiles that are possible for a space."""
+        return [
+            self.tileset[i]
+            for i in np.flatnonzero(self.wave[coords[1], coords[0]])
+        ]
+
+    def _get_supports(self, window: Tuple[int]):
+        """Yields the frequencies of all tiles contributed by the
+        neighbors in each direction for the spaces in a window.
+
+        Arguments:
+            window: Tuple (y_min, y_max, x_min, x_max) of the spaces to be
+                checked, upper bounds exclusive.
+
+        Yields:
+            Tuples of the target slices within the window and the float
+            array of frequencies for these spaces.
+        """
+        height, width = self.wave.shape[:2]
+        y_min, y_max, x_min, x_max = window
+        for direction, (dy, dx) in OFFSETS.items():
+            if self.periodic:
+                neighbors = self.wave[
+                    np.ix_(
+                        np.arange(y_min + dy, y_max + dy) % height,
+                        np.arange(x_min + dx, x_max + dx) % width,
+                    )
+                ]
+                target = (slice(None), slice(None))
+                yield target, neighbors @ self.frequency_matrices[direction]
+                continue
+
+            # Neighbor rows and columns that lie within the grid.
+            ny_min, ny_max = max(y_min + dy, 0), min(y_max + dy, height)
+            nx_min, nx_max = max(x_min + dx, 0), min(x_max + dx, width)
+            if ny_min >= ny_max or nx_min >= nx_max:
+                continue
+
+            neighbors = self.wave[ny_min:ny_max, nx_min:nx_max]
+            target = (
+                slice(ny_min - dy - y_min, ny_max - dy - y_min),
+                slice(nx_min - dx - x_min, nx_max - dx - x_min),
+            )
+            yield target, neighbors @ self.frequency_matrices[direction]
+
+    def get_frequencies(self, window: Tuple[int]) -> np.ndarray:
+        """Determines the frequencies of all tiles for the spaces in a
+        window. Tiles that are not possible have a frequency of 0.
+
+        Arguments:
+            window: Tuple (y_min, y_max, x_min, x_max) of the spaces,
+                upper bounds exclusive.
+
+        Returns:
+            Float array of shape (rows, columns, n_tiles).
+        """
+        y_min, y_max, x_min, x_max = window
+        frequencies = np.zeros(
+            (y_max - y_min, x_max - x_min, len(self.tileset))
+        )
+        for target, supports in self._get_supports(window):
+            frequencies[target] += supports
+
+        return frequencies * self.wave[y_min:y_max, x_min:x_max]
+
+    def update_entropies(self, window: Tuple[int]):
+        """Recalculates the entropies of the spaces in a window."""
+        y_min, y_max, x_min, x_max = window
+        frequencies = self.get_frequencies(window)
+        totals = frequencies.sum(axis=2)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_frequencies = np.where(
+                frequencies > 0, np.log2(frequencies), 0
+            )
+            entropies = (
+                np.log2(totals)
+                - (frequencies * log_frequencies).sum(axis=2) / totals
+            )
+
+        unassigned = self.wave[y_min:y_max, x_min:x_max].sum(axis=2) > 1
+        self.entropies[y_min:y_max, x_min:x_max] = np.where(
+            unassigned, entropies, np.inf
+        )
+        self.row_entropies[y_min:y_max] = self.entropies[y_min:y_max].min(
+            axis=1
+        )
+
+    def update_possible_tiles(
+        self, window: Tuple[int], calculate_entropies: bool = True
+    ):
+        """Updates the possible tiles for the spaces in a window and keeps
+        propagating changes until no more spaces change. Afterwards the
+        entropies of all affected spaces are recalculated.
+
+        Arguments:
+            window: Tuple (y_min, y_max, x_min, x_max) of the spaces to be
+                checked, upper bounds exclusive.
+            calculate_entropies: Flag whether to recalculate the entropies
+                of the affected spaces (default: True).
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        height, width = self.wave.shape[:2]
+        touched = window
+
+        while window:
+            y_min, y_max, x_min, x_max = window
+            allowed = np.ones(
+                (y_max - y_min, x_max - x_min, len(self.tileset)), dtype=bool
+            )
+            for target, supports in self._get_supports(window):
+                allowed[target] &= supports > 0
+
+            old = self.wave[y_min:y_max, x_min:x_max]
+            new = old & allowed
+            if not new.any(axis=2).all():
+                raise WaveFunctionCollapseException(
+                    "No options remaining for this space. "
+                    "This should not happen. "
+                    "Please check the rules."
+                )
+
+            changed_rows, changed_columns = np.nonzero(
+                (new != old).any(axis=2)
+            )
+            if not len(changed_rows):
+                break
+
+            self.wave[y_min:y_max, x_min:x_max] = new
+            if self.narrowed is not None:
+                self.narrowed.extend(
+                    zip(
+                        (x_min + changed_columns).tolist(),
+                        (y_min + changed_rows).tolist(),
+                    )
+                )
+            window = self._get_bounds(
+                y_min + changed_rows.min() - 1,
+                y_min + changed_rows.max() + 2,
+                0,
+            ) + self._get_bounds(
+                x_min + changed_columns.min() - 1,
+                x_min + changed_columns.max() + 2,
+                1,
+            )
+            touched = (
+                min(touched[0], window[0]),
+                max(touched[1], window[1]),
+                min(touched[2], window[2]),
+                max(touched[3], window[3]),
+            )
+
+        if not calculate_entropies:
+            return
+
+        # The windows contain every changed space and its neighbors.
+        self.update_entropies(touched)
+
+    def get_next_space(self) -> Tuple[int]:
+        """Get the coordinates of a random unassigned space with the
+        lowest entropy or None if all spaces are assigned. Only the rows
+        holding the lowest entropy are scanned.
+        """
+        if (min_entropy := self.row_entropies.min()) == np.inf:
+            return None
+
+        rows = np.flatnonzero(self.row_entropies == min_entropy)
+        candidates = np.flatnonzero(self.entropies[rows] == min_entropy)
+        row, x = divmod(
+            int(candidates[self.rng.randrange(len(candidates))]),
+            self.wave.shape[1],
+        )
+        return x, int(rows[row])
+
+    @property
+    def lowest_entropy_spaces(self) -> List[Tuple[int]]:
+        min_entropy = self.entropies.min()
+        if min_entropy == np.inf:
+            return []
+
+        ys, xs = np.nonzero(self.entropies == min_entropy)
+        return sorted(zip(xs.tolist(), ys.tolist()))
+
+    def get_space_frequencies(
+        self, coords_list: List[Tuple[int]]
+    ) -> np.ndarray:
+        """Determines the frequencies of all tiles for arbitrary spaces
+        like get_frequencies does for a window.
+
+        Arguments:
+            coords_list: List of the spaces' coordinates.
+
+        Returns:
+            Float array of shape (len(coords_list), n_tiles).
+        """
+        height, width = self.wave.shape[:2]
+        xs, ys = np.array(coords_list, dtype=np.intp).reshape(-1, 2).T
+        frequencies = np.zeros((len(xs), len(self.tileset)))
+        for direction, (dy, dx) in OFFSETS.items():
+            neighbor_ys, neighbor_xs = ys + dy, xs + dx
+            if self.periodic:
+                neighbor_ys %= height
+                neighbor_xs %= width
+            inside = (
+                (neighbor_ys >= 0)
+                & (neighbor_ys < height)
+                & (neighbor_xs >= 0)
+                & (neighbor_xs < width)
+            )
+            frequencies[inside] += (
+                self.wave[neighbor_ys[inside], neighbor_xs[inside]]
+                @ self.frequency_matrices[direction]
+            )
+
+        return frequencies * self.wave[ys, xs]
+
+    def choose_tiles(self, coords_list: List[Tuple[int]]) -> np.ndarray:
+        """Chooses tiles for several spaces at once based on the tiles'
+        frequencies. Nothing is assigned.
+
+        Arguments:
+            coords_list: List of the spaces' coordinates.
+
+        Returns:
+            Integer array of the chosen tile indices.
+        """
+        return choose_indices(
+            self.get_space_frequencies(coords_list), self.rng
+        )
+
+    def assign_tile(self, coords: Tuple[int], tile_index: int = None):
+        """Assigns a tile to a space.
+
+        Arguments:
+            coords: The space's coordinates.
+            tile_index: Index of the tile to be assigned. If None, it is
+                chosen based on the tiles' frequencies (default: None).
+
+        Raises:
+            WaveFunctionCollapseException if already assigned.
+        """
+        x, y = coords
+        if self.wave[y, x].sum() == 1:
+            raise WaveFunctionCollapseException(
+                "This space has already been assigned a tile."
+            )
+
+        if tile_index is None:
+            # Slicing a single space is cheaper than the fancy indexing
+            # of choose_tiles.
+            tile_index = choose_index(
+                self.get_frequencies((y, y + 1, x, x + 1))[0, 0].tolist(),
+                self.rng,
+            )
+
+        self.wave[y, x] = False
+        self.wave[y, x, tile_index] = True
+        self.entropies[y, x] = np.inf
+        self.row_entropies[y] = self.entropies[y].min()
+        self.decisions.append((coords, int(tile_index)))
+
+    def _update_around(
+        self, coords: Tuple[int], calculate_entropies: bool = True
+    ):
+        x, y = coords
+        self.update_possible_tiles(
+            self._get_bounds(y - 1, y + 2, 0)
+            + self._get_bounds(x - 1, x + 2, 1),
+            calculate_entropies,
+        )
+
+    def assign_next_tile(self):
+        """Assigns a tile to the next space.
+
+        Raises:
+            WaveFunctionCollapseException if not spaces left.
+        """
+        if (coords := self.get_next_space()) is None:
+            raise WaveFunctionCollapseException(
+                "All spaces have been assigned a tile."
+            )
+
+        self.assign_tile(coords)
+        self._update_around(coords)
+
+    def assign_next_tiles(self, count: int) -> List[Tuple[int]]:
+        """Assigns tiles to several spaces at once and propagates the
+        changes in a single pass.
+
+        Spaces are taken in order of entropy, ties broken randomly, and
+        skipped if they neighbor a space taken before. All tiles are
+        drawn in one batch from the frequencies before any of them is
+        assigned, so contradictions are more likely than when assigning
+        tiles one by one.
+
+        Arguments:
+            count: Maximum number of spaces to be assigned.
+
+        Returns:
+            List of the coordinates of the assigned spaces.
+
+        Raises:
+            WaveFunctionCollapseException if not spaces left or no tiles
+            remain for a space.
+        """
+        entropies = self.entropies.ravel()
+        candidates = np.flatnonzero(entropies < np.inf)
+        if not len(candidates):
+            raise WaveFunctionCollapseException(
+                "All spaces have been assigned a tile."
+            )
+
+        tie_breakers = np.random.default_rng(self.rng.getrandbits(64)).random(
+            len(candidates)
+        )
+        candidates = candidates[
+            np.lexsort((tie_breakers, entropies[candidates]))
+        ]
+
+        height, width = self.wave.shape[:2]
+        blocked = set()
+        coords_list = []
+        for index in candidates.tolist():
+            if index in blocked:
+                continue
+
+            y, x = divmod(index, width)
+            coords_list.append((x, y))
+            if len(coords_list) == count:
+                break
+
+            blocked.add(index)
+            for neighbor_y, neighbor_x in (
+                (y - 1, x),
+                (y, x + 1),
+                (y + 1, x),
+                (y, x - 1),
+            ):
+                if self.periodic:
+                    neighbor_y %= height
+                    neighbor_x %= width
+                elif not (
+                    0 <= neighbor_y < height and 0 <= neighbor_x < width
+                ):
+                    continue
+                blocked.add(neighbor_y * width + neighbor_x)
+
+        for coords, tile_index in zip(
+            coords_list, self.choose_tiles(coords_list).tolist()
+        ):
+            self.assign_tile(coords, tile_index)
+
+        xs, ys = zip(*coords_list)
+        self.update_possible_tiles(
+            self._get_bounds(min(ys) - 1, max(ys) + 2, 0)
+            + self._get_bounds(min(xs) - 1, max(xs) + 2, 1)
+        )
+
+        return coords_list
+
+    def assign_all_tiles(self):
+        """Assigns tiles to spaces until there are none left."""
+        while self.row_entropies.min() < np.inf:
+            self.assign_next_tile()
+
+    def iter_solve(self) -> Iterator[CollapseEvent]:
+        """Assigns tiles to spaces until there are none left like
+        assign_all_tiles, but yields after every assigned tile.
+
+        Yields:
+            CollapseEvent for every assigned tile.
+
+        Raises:
+            WaveFunctionCollapseException if no tiles remain for a space.
+        """
+        while self.row_entropies.min() < np.inf:
+            self.narrowed = []
+            try:
+                self.assign_next_tile()
+            finally:
+                narrowed, self.narrowed = self.narrowed, None
+
+            coords, tile_index = self.decisions[-1]
+            yield CollapseEvent(
+                coords,
+                tile_index,
+                [c_ for c_ in dict.fromkeys(narrowed) if c_ != coords],
+            )
+
+    def replay(self, decisions: List[Tuple[Tuple[int], int]]):
+        """Assigns tiles from a decision log, e.g. the decisions of
+        another grid of the same tileset and size. The entropies are
+        recalculated once at the end.
+
+        Arguments:
+            decisions: List of coordinates and tile indices.
+
+        Raises:
+            WaveFunctionCollapseException if a space is already assigned,
+            a tile is not possible or no tiles remain for a space.
+        """
+        for coords, tile_index in decisions:
+            if not self.wave[coords[1], coords[0], tile_index]:
+                raise WaveFunctionCollapseException(
+                    "This tile is not possible for this space.",
+                    coords=coords,
+                )
+
+            self.assign_tile(coords, tile_index)
+            self._update_around(coords, calculate_entropies=False)
+
+        self.update_entropies((0, self.wave.shape[0], 0, self.wave.shape[1]))
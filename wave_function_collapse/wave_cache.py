@@ -0,0 +1,111 @@
+import os
+import pickle
+from collections import OrderedDict
+
+
+class WaveCache:
+    """Cache of the possible tiles of all spaces of a new grid after the
+    initial propagation.
+
+    The initial state only depends on the engine, the tileset and the
+    size of the grid. Grids created with a cache copy it instead of
+    propagating the rules over the whole grid. The least recently used
+    states are evicted from memory once more than max_size are cached.
+
+    Attributes:
+        max_size: Maximum number of states kept in memory (default: 16).
+        directory: Directory the states are additionally stored in and
+            loaded from, so that they survive the process. If None,
+            states are only kept in memory (default: None).
+        states: OrderedDict of keys to states, least recently used
+            first.
+        hits: Number of states found in memory or in the directory.
+        misses: Number of states that had to be calculated.
+    """
+
+    def __init__(self, max_size: int = 16, directory: str = None):
+        self.max_size = max_size
+        self.directory = directory
+        self.states = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, grid) -> str:
+        """Get the key of a grid's initial state from the engine, the
+        fingerprint of the tileset, the size and how the edges are
+        handled.
+        """
+        width, height = grid.size
+        if grid.periodic:
+            edges = "_periodic"
+        elif not grid.borders and grid.compiled_tileset.has_borders:
+            edges = "_open"
+        else:
+            edges = ""
+        return (
+            f"{type(grid).__name__}_"
+            f"{grid.compiled_tileset.fingerprint[:16]}_{width}x{height}"
+            f"{edges}"
+        )
+
+    def get_path(self, key: str) -> str:
+        """Get the path of the file a state is stored in."""
+        return os.path.join(self.directory, f"wave_{key}.pickle")
+
+    def get(self, grid) -> dict:
+        """Get the initial state of a grid.
+
+        Arguments:
+            grid: A new grid, see get_key.
+
+        Returns:
+            The state as returned by the grid's get_state or None if it
+            is neither in memory nor in the directory. The state is
+            shared and must not be modified.
+        """
+        key = self.get_key(grid)
+        if (state := self.states.get(key)) is not None:
+            self.states.move_to_end(key)
+        elif self.directory is not None and os.path.exists(
+            path := self.get_path(key)
+        ):
+            with open(path, "rb") as file_:
+                state = pickle.load(file_)
+            self._cache(key, state)
+
+        if state is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return state
+
+    def put(self, grid, state: dict):
+        """Stores the initial state of a grid.
+
+        Arguments:
+            grid: A new grid, see get_key.
+            state: The state as returned by the grid's get_state.
+        """
+        key = self.get_key(grid)
+        if self.directory is not None:
+            # Write to a temporary file first, so that other processes
+            # never load an incomplete state.
+            path = self.get_path(key)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file_:
+                pickle.dump(state, file_, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        self._cache(key, state)
+
+    def clear(self):
+        """Removes all states from memory."""
+        self.states.clear()
+
+    def _cache(self, key: str, state: dict):
+        self.states[key] = state
+        while len(self.states) > self.max_size:
+            self.states.popitem(last=False)
@@ -0,0 +1,450 @@
+import hashlib
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from copy import copy
+from enum import Enum
+from typing import Dict, Iterable, List, Tuple, Type, Union
+
+import numpy as np
+
+from wave_function_collapse.compact_grid import CompactGrid
+from wave_function_collapse.constants import ADJACENT_BORDERS
+from wave_function_collapse.solver import ContradictionStrategy, Solver
+from wave_function_collapse.tile import RuleDirection, Tile
+from wave_function_collapse.tileset import Tileset, compile_tileset
+from wave_function_collapse.wave_cache import WaveCache
+
+
+class ChunkOrder(str, Enum):
+    CHECKERBOARD = "CHECKERBOARD"
+    WAVEFRONT = "WAVEFRONT"
+
+
+# World of the current worker process, set up once by _init_worker.
+_world = None
+
+
+def _init_worker(world: "World"):
+    global _world
+    _world = world
+
+
+def _generate_chunk(
+    chunk_coords: Tuple[int], masks: Dict[Tuple[int], int]
+) -> Tuple[Tuple[int], np.ndarray]:
+    return chunk_coords, _world.generate_chunk(chunk_coords, masks)
+
+
+class World:
+    """Unbounded world that is generated in chunks on demand.
+
+    Each chunk is solved on its own grid. The edges of neighboring chunks
+    that were already generated restrict the tiles along the new chunk's
+    borders, so that the chunks fit together seamlessly.
+
+    A chunk's content depends on the chunks that existed when it was
+    generated. Chunks evicted from the cache are therefore only
+    guaranteed to come back unchanged if they are stored in a directory.
+
+    Several chunks are generated in phases given by the chunk order,
+    either in parallel or one after another. Each chunk is only
+    restricted by its neighbors from earlier phases and solved once they
+    are finished, so the result does not depend on the number of workers.
+
+    CHECKERBOARD: Four phases by the parity of the chunk coordinates.
+        Most chunks can be solved at once, but the last phase is
+        restricted on all four sides.
+    WAVEFRONT: One phase per diagonal, x + y. Chunks are only restricted
+        by their northern and western neighbors.
+
+    Attributes:
+        compiled_tileset: Tileset with the precompiled adjacency
+            frequencies of the tiles.
+        chunk_size: Size of the chunks (width x height, default: 32x32).
+        seed: Seed of the world. Every chunk is solved with a seed
+            derived from it and the chunk's coordinates (default: 0).
+        engine: Compact grid class to be used (default: CompactGrid).
+        strategy: ContradictionStrategy of the solver
+            (default: REPAIR).
+        cache_size: Maximum number of chunks kept in memory
+            (default: 256).
+        directory: Directory in which generated chunks are stored and
+            looked up as .npy files. If None, chunks are only kept in
+            memory (default: None).
+        chunks: Ordered dictionary of chunk coordinates to the integer
+            arrays of shape (height, width) with the tile indices of the
+            cached chunks, least recently used first.
+        order: ChunkOrder in which several chunks are generated
+            (default: WAVEFRONT).
+        wave_cache: WaveCache shared by the solvers of all chunks. If
+            None, the world creates its own (default: None).
+        solver_options: Further keyword arguments passed to Solver.
+            Chunks are never restricted by border rules, as the world has
+            no edges.
+    """
+
+    def __init__(
+        self,
+        tileset: Union[List[Tile], Tileset],
+        chunk_size: Tuple[int] = (32, 32),
+        seed: int = 0,
+        engine: Type = CompactGrid,
+        strategy: ContradictionStrategy = ContradictionStrategy.REPAIR,
+        cache_size: int = 256,
+        directory: str = None,
+        order: ChunkOrder = ChunkOrder.WAVEFRONT,
+        wave_cache: WaveCache = None,
+        **solver_options,
+    ):
+        self.compiled_tileset = compile_tileset(tileset)
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.engine = engine
+        self.strategy = strategy
+        self.cache_size = cache_size
+        self.directory = directory
+        self.chunks = OrderedDict()
+        self.order = ChunkOrder(order)
+        self.solver_options = solver_options
+        self.wave_cache = WaveCache() if wave_cache is None else wave_cache
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_chunk_seed(self, chunk_coords: Tuple[int]) -> int:
+        """Get the seed of a chunk from the world's seed and the chunk's
+        coordinates. The seed does not depend on the Python process.
+        """
+        key = f"{self.seed},{chunk_coords[0]},{chunk_coords[1]}".encode()
+        return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+    def get_chunk_path(self, chunk_coords: Tuple[int]) -> str:
+        """Get the path of the file a chunk is stored in."""
+        return os.path.join(
+            self.directory, f"chunk_{chunk_coords[0]}_{chunk_coords[1]}.npy"
+        )
+
+    def get_chunk(self, chunk_coords: Tuple[int]) -> np.ndarray:
+        """Get the tile indices of a chunk. The chunk is looked up in the
+        cache and the directory before it is generated.
+
+        Arguments:
+            chunk_coords: The chunk's coordinates (x, y). Chunk (0, 0)
+                covers the spaces from (0, 0) to the chunk size.
+
+        Returns:
+            Integer array of shape (height, width).
+
+        Raises:
+            WaveFunctionCollapseException if the chunk cannot be solved.
+        """
+        chunk_coords = tuple(chunk_coords)
+        if (chunk := self.find_chunk(chunk_coords)) is None:
+            chunk = self.generate_chunk(chunk_coords)
+            self._store(chunk_coords, chunk)
+
+        return chunk
+
+    def get_phase(self, chunk_coords: Tuple[int]) -> int:
+        """Get the phase in which a chunk is generated according to the
+        chunk order.
+        """
+        x, y = chunk_coords
+        if self.order == ChunkOrder.CHECKERBOARD:
+            return x % 2 + 2 * (y % 2)
+
+        return x + y
+
+    def generate_chunks(
+        self, chunk_coords: Iterable[Tuple[int]], workers: int = 1
+    ) -> Dict[Tuple[int], np.ndarray]:
+        """Get several chunks, generating the missing ones in the phases
+        of the chunk order. Chunks whose earlier neighbors are finished
+        are solved in parallel.
+
+        Arguments:
+            chunk_coords: Coordinates of the chunks.
+            workers: Number of worker processes. If 1, the chunks are
+                generated in the current process (default: 1).
+
+        Returns:
+            Dictionary of the chunk coordinates to the integer arrays of
+            shape (height, width).
+
+        Raises:
+            WaveFunctionCollapseException if a chunk cannot be solved.
+        """
+        chunks = {}
+        missing = set()
+        for coords in map(tuple, chunk_coords):
+            if (chunk := self.find_chunk(coords)) is None:
+                missing.add(coords)
+            else:
+                chunks[coords] = chunk
+
+        # Chunks wait for their missing neighbors from earlier phases.
+        dependencies = {
+            coords: {
+                neighbor
+                for neighbor in self._get_neighbor_coords(coords)
+                if neighbor in missing
+                and self.get_phase(neighbor) < self.get_phase(coords)
+            }
+            for coords in missing
+        }
+        ready = deque(
+            sorted(
+                (coords for coords, d_ in dependencies.items() if not d_),
+                key=lambda c: (self.get_phase(c), c[1], c[0]),
+            )
+        )
+
+        def finish(coords: Tuple[int], chunk: np.ndarray):
+            chunks[coords] = chunk
+            self._store(coords, chunk)
+            for neighbor in self._get_neighbor_coords(coords):
+                if coords in dependencies.get(neighbor, ()):
+                    dependencies[neighbor].remove(coords)
+                    if not dependencies[neighbor]:
+                        ready.append(neighbor)
+
+        if workers == 1:
+            while ready:
+                coords = ready.popleft()
+                finish(
+                    coords,
+                    self.generate_chunk(
+                        coords, self.get_seam_masks(coords, chunks)
+                    ),
+                )
+            return chunks
+
+        # Workers get a copy of the world without its cache and directory.
+        world = copy(self)
+        world.chunks = OrderedDict()
+        world.directory = None
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(world,),
+        ) as executor:
+            pending = set()
+            while ready or pending:
+                while ready:
+                    coords = ready.popleft()
+                    pending.add(
+                        executor.submit(
+                            _generate_chunk,
+                            coords,
+                            self.get_seam_masks(coords, chunks),
+                        )
+                    )
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(*future.result())
+
+        return chunks
+
+    def find_chunk(self, chunk_coords: Tuple[int]) -> np.ndarray:
+        """Get the tile indices of a chunk from the cache or directory,
+        or None if the chunk has not been generated.
+        """
+        if (chunk := self.chunks.get(chunk_coords)) is not None:
+            self.chunks.move_to_end(chunk_coords)
+            return chunk
+
+        if self.directory is not None and os.path.exists(
+            path := self.get_chunk_path(chunk_coords)
+        ):
+            chunk = np.load(path)
+            self._cache(chunk_coords, chunk)
+            return chunk
+
+        return None
+
+    def _store(self, chunk_coords: Tuple[int], chunk: np.ndarray):
+        if self.directory is not None:
+            np.save(self.get_chunk_path(chunk_coords), chunk)
+        self._cache(chunk_coords, chunk)
+
+    def _get_neighbor_coords(
+        self, chunk_coords: Tuple[int]
+    ) -> List[Tuple[int]]:
+        x, y = chunk_coords
+        return [(x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)]
+
+    def _cache(self, chunk_coords: Tuple[int], chunk: np.ndarray):
+        self.chunks[chunk_coords] = chunk
+        while len(self.chunks) > self.cache_size:
+            self.chunks.popitem(last=False)
+
+    def get_seam_masks(
+        self,
+        chunk_coords: Tuple[int],
+        chunks: Dict[Tuple[int], np.ndarray] = None,
+    ) -> Dict[Tuple[int], int]:
+        """Get the bitmasks of the tiles allowed along the borders of a
+        chunk next to the neighboring chunks that were already generated.
+
+        Arguments:
+            chunk_coords: The chunk's coordinates (x, y).
+            chunks: Dictionary of chunks to look up neighbors in before
+                the cache and directory (default: None).
+
+        Returns:
+            Dictionary of coordinates within the chunk to bitmasks.
+        """
+        width, height = self.chunk_size
+        x, y = chunk_coords
+        # Direction from the chunk to its neighbor, the neighbor's edge
+        # adjacent to the chunk and the chunk's spaces along that edge.
+        seams = {
+            RuleDirection.NORTH: (
+                (x, y - 1),
+                lambda chunk: chunk[-1, :],
+                [(i, 0) for i in range(width)],
+            ),
+            RuleDirection.EAST: (
+                (x + 1, y),
+                lambda chunk: chunk[:, 0],
+                [(width - 1, i) for i in range(height)],
+            ),
+            RuleDirection.SOUTH: (
+                (x, y + 1),
+                lambda chunk: chunk[0, :],
+                [(i, height - 1) for i in range(width)],
+            ),
+            RuleDirection.WEST: (
+                (x - 1, y),
+                lambda chunk: chunk[:, -1],
+                [(0, i) for i in range(height)],
+            ),
+        }
+
+        masks = {}
+        for direction, (neighbor_coords, get_edge, spaces) in seams.items():
+            neighbor = (chunks or {}).get(neighbor_coords)
+            if neighbor is None:
+                neighbor = self.find_chunk(neighbor_coords)
+            if neighbor is None:
+                continue
+
+            # The chunks are not propagated into each other, so the
+            # neighbor's tiles have to allow the new tiles as well.
+            opposite = self.compiled_tileset.frequencies[
+                ADJACENT_BORDERS[direction]
+            ]
+            for coords, tile_index in zip(spaces, get_edge(neighbor)):
+                tile_index = int(tile_index)
+                mask = self.compiled_tileset.get_allowed_mask(
+                    direction, 1 << tile_index
+                ) & sum(
+                    1 << i
+                    for i, frequency in enumerate(opposite[tile_index])
+                    if frequency > 0
+                )
+                masks[coords] = masks.get(coords, mask) & mask
+
+        return masks
+
+    def generate_chunk(
+        self, chunk_coords: Tuple[int], masks: Dict[Tuple[int], int] = None
+    ) -> np.ndarray:
+        """Solves a chunk that fits to the neighboring chunks that were
+        already generated. The chunk is not cached.
+
+        Arguments:
+            chunk_coords: The chunk's coordinates (x, y).
+            masks: Bitmasks of the allowed tiles along the chunk's
+                borders. If None, they are determined from the existing
+                neighbors (default: None).
+
+        Returns:
+            Integer array of shape (height, width).
+
+        Raises:
+            WaveFunctionCollapseException if the chunk cannot be solved.
+        """
+        solver = Solver(
+            self.compiled_tileset,
+            size=self.chunk_size,
+            engine=self.engine,
+            strategy=self.strategy,
+            seed=self.get_chunk_seed(chunk_coords),
+            masks=(
+                self.get_seam_masks(chunk_coords) if masks is None else masks
+            ),
+            wave_cache=self.wave_cache,
+            borders=False,
+            **self.solver_options,
+        )
+        grid = solver.solve()
+
+        width, height = self.chunk_size
+        return np.asarray(grid.tile_indices, dtype=np.int32).reshape(
+            height, width
+        )
+
+    def get_region(
+        self, coords: Tuple[int], size: Tuple[int], workers: int = 1
+    ) -> np.ndarray:
+        """Get the tile indices of a rectangular region of the world,
+        generating the chunks it overlaps as needed.
+
+        Arguments:
+            coords: Coordinates (x, y) of the region's top left space.
+            size: Size of the region (width x height).
+            workers: Number of worker processes used to generate the
+                chunks (default: 1).
+
+        Returns:
+            Integer array of shape (height, width).
+        """
+        x_min, y_min = coords
+        width, height = size
+        chunk_width, chunk_height = self.chunk_size
+
+        chunks = self.generate_chunks(
+            [
+                (chunk_x, chunk_y)
+                for chunk_y in range(
+                    y_min // chunk_height,
+                    (y_min + height - 1) // chunk_height + 1,
+                )
+                for chunk_x in range(
+                    x_min // chunk_width,
+                    (x_min + width - 1) // chunk_width + 1,
+                )
+            ],
+            workers,
+        )
+
+        region = np.empty((height, width), dtype=np.int32)
+        for (chunk_x, chunk_y), chunk in chunks.items():
+            # Overlap of the chunk and the region in world coordinates.
+            x_0, y_0 = chunk_x * chunk_width, chunk_y * chunk_height
+            x_start = max(x_min, x_0)
+            x_end = min(x_min + width, x_0 + chunk_width)
+            y_start = max(y_min, y_0)
+            y_end = min(y_min + height, y_0 + chunk_height)
+
+            target = (
+                slice(y_start - y_min, y_end - y_min),
+                slice(x_start - x_min, x_end - x_min),
+            )
+            source = (
+                slice(y_start - y_0, y_end - y_0),
+                slice(x_start - x_0, x_end - x_0),
+            )
+            region[target] = chunk[source]
+
+        return region
+
+    def get_tile(self, coords: Tuple[int]) -> Tile:
+        """Get the tile at a space of the world."""
+        x, y = coords
+        width, height = self.chunk_size
+        chunk = self.get_chunk((x // width, y // height))
+        return self.compiled_tileset.tiles[chunk[y % height, x % width]]